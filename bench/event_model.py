@@ -0,0 +1,94 @@
+import argparse
+import gc
+import hashlib
+import time
+import tracemalloc
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import Optional
+
+from src.model import Event
+from .fixtures import make_events
+
+# Event-mallin muisti ja läpäisy: nykyinen (slots, välimuistettu id,
+# internoidut merkkijonot, suora to_dict) vs. aiempi tavallinen dataclass.
+#
+#   python -m bench.event_model --n 100000
+
+
+@dataclass
+class LegacyEvent:
+    # Aiempi toteutus vertailukohdaksi
+    title: str
+    start: datetime
+    end: Optional[datetime] = None
+    location: Optional[str] = None
+    url: Optional[str] = None
+    organizer: Optional[str] = None
+    source_url: Optional[str] = None
+
+    @property
+    def id(self) -> str:
+        base = f"{self.title}|{self.start.isoformat()}|{self.location or ''}"
+        return hashlib.sha1(base.encode('utf-8')).hexdigest()
+
+    def to_dict(self):
+        d = asdict(self)
+        d['id'] = self.id
+        for k in ['start', 'end']:
+            if d.get(k):
+                d[k] = d[k].isoformat()
+        return d
+
+
+def _rows(n):
+    # Kerääjät rakentavat merkkijonot uudelleen jokaiselle osumalle, joten
+    # kopioidaan ne jotta internoinnin vaikutus näkyy kuten oikeassa ajossa
+    rows = []
+    for e in make_events(n):
+        rows.append(dict(
+            title=e.title, start=e.start, end=e.end,
+            location="".join(e.location) if e.location else None,
+            url=e.url, organizer="".join(e.organizer), source_url=e.source_url,
+        ))
+    return rows
+
+
+def _measure(cls, rows):
+    gc.collect()
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    events = [cls(**r) for r in rows]
+    build_s = time.perf_counter() - t0
+    mem, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # id luetaan käytännössä kahdesti (to_dict + ICS)
+    t0 = time.perf_counter()
+    for e in events:
+        e.id
+        e.id
+    id_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for e in events:
+        e.to_dict()
+    to_dict_s = time.perf_counter() - t0
+    return {"build_s": build_s, "mem_bytes": mem, "id_x2_s": id_s, "to_dict_s": to_dict_s}
+
+
+def run(n: int) -> dict:
+    rows = _rows(n)
+    return {"events": n, "legacy": _measure(LegacyEvent, rows), "current": _measure(Event, rows)}
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--n', type=int, default=100000)
+    args = ap.parse_args()
+    r = run(args.n)
+    print(f"{r['events']} events")
+    for key in ("mem_bytes", "build_s", "id_x2_s", "to_dict_s"):
+        old, new = r["legacy"][key], r["current"][key]
+        unit = f"{old / 1e6:.1f} MB -> {new / 1e6:.1f} MB" if key == "mem_bytes" else f"{old:.3f}s -> {new:.3f}s"
+        print(f"  {key:<10} {unit}  (x{old / new:.1f})")
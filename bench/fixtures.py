@@ -0,0 +1,40 @@
+import random
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from src.model import Event
+
+# Synteettiset testiaineistot benchmarkeille. Sama siemen -> sama aineisto.
+
+LOCAL_TZ = ZoneInfo("Europe/Helsinki")
+
+SCHOOLS = [
+    "Alppilan lukio", "Kallion lukio", "Ressun lukio", "Mäkelänrinteen lukio",
+    "Etu-Töölön lukio", "Helsingin medialukio", "Lumon lukio", "Tikkurilan lukio",
+    "Keuda", "Careeria", "Perho Liiketalousopisto", "Stadin AO",
+]
+
+
+def make_events(n: int, seed: int = 1) -> list:
+    rnd = random.Random(seed)
+    base = datetime(2025, 8, 1, 8, 0, tzinfo=LOCAL_TZ)
+    out = []
+    for i in range(n):
+        school = rnd.choice(SCHOOLS)
+        start = base + timedelta(days=rnd.randrange(0, 700), minutes=15 * rnd.randrange(0, 48))
+        # naiivi paikallinen aika + LOCAL_TZ, kuten main.normalize_events tekee
+        start = start.replace(tzinfo=None).replace(tzinfo=LOCAL_TZ)
+        end = start + timedelta(minutes=30 * rnd.randrange(1, 6)) if rnd.random() < 0.8 else None
+        title = f"Avoimet ovet – {school}"
+        if rnd.random() < 0.2:
+            title += " (huoltajille; ilta, klo 18)"
+        out.append(Event(
+            title=title,
+            start=start,
+            end=end,
+            location=f"{school}, Esimerkkikatu {i % 97}, Helsinki" if rnd.random() < 0.9 else None,
+            url=f"https://www.hel.fi/fi/kasvatus-ja-koulutus/{i}/tutustu-ja-hae" if rnd.random() < 0.7 else None,
+            organizer=school,
+            source_url=None,
+        ))
+    return out
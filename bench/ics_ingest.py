@@ -0,0 +1,168 @@
+import argparse
+import io
+import random
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+from icalendar import Calendar
+
+from src.collectors.ics import parse_ics
+from src.ical import escape_text
+from src.main import ensure_datetime
+from .fixtures import LOCAL_TZ, SCHOOLS
+
+# ICS-syötteen luku: rivipohjainen, aikaikkunaan rajattu jäsennin
+# (src/collectors/ics.py) vs. aiempi Calendar.from_ical + Event jokaisesta
+# VEVENTistä. Aineisto muistuttaa vuosia vanhaa julkista Google-kalenteria:
+# suurin osa tapahtumista on menneisyydessä.
+#
+#   python -m bench.ics_ingest --sizes 1000 10000 50000
+
+NOW = datetime(2026, 1, 10, 12, 0, tzinfo=LOCAL_TZ)
+SINCE = NOW - timedelta(days=31)
+
+
+def make_calendar(n: int, seed: int = 1) -> bytes:
+    rnd = random.Random(seed)
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//bench//EN"]
+    base = datetime(2016, 1, 1, 8, 0)
+    for i in range(n):
+        school = rnd.choice(SCHOOLS)
+        start = base + timedelta(days=rnd.randrange(0, 3800), minutes=15 * rnd.randrange(0, 40))
+        end = start + timedelta(minutes=30 * rnd.randrange(1, 6))
+        lines += [
+            "BEGIN:VEVENT",
+            f"UID:ev{i}@bench",
+            f"DTSTART;TZID=Europe/Helsinki:{start:%Y%m%dT%H%M%S}",
+            f"DTEND;TZID=Europe/Helsinki:{end:%Y%m%dT%H%M%S}",
+            "SUMMARY:" + escape_text(f"Avoimet ovet – {school}"),
+            "LOCATION:" + escape_text(f"{school}, Esimerkkikatu {i % 97}, Helsinki"),
+            "DESCRIPTION:" + "Tervetuloa tutustumaan\\, " * 8,
+            "BEGIN:VALARM", "ACTION:DISPLAY", "TRIGGER:-PT30M", "END:VALARM",
+            "END:VEVENT",
+        ]
+    lines.append("END:VCALENDAR")
+    return ("\r\n".join(lines) + "\r\n").encode("utf-8")
+
+
+def parse_ics_icalendar(content: bytes) -> list:
+    # Aiempi toteutus vertailukohdaksi (+ main.run:n aikasuodatus)
+    from src.model import Event
+    out = []
+    for comp in Calendar.from_ical(content).walk('VEVENT'):
+        start = comp.get('DTSTART').dt
+        end = comp.get('DTEND').dt if comp.get('DTEND') else None
+        out.append(Event(
+            title=str(comp.get('SUMMARY')), start=start, end=end,
+            location=str(comp.get('LOCATION') or '') or None,
+            url=str(comp.get('URL') or '') or None,
+        ))
+    return out
+
+
+def _window(events) -> list:
+    out = []
+    for e in events:
+        start = ensure_datetime(e.start)
+        if start >= SINCE:
+            out.append((e.title, start, ensure_datetime(e.end) if e.end else None, e.location, e.url))
+    return sorted(out, key=lambda t: (t[1], t[0]))
+
+
+def check_parity(content: bytes) -> None:
+    """Ikkunan sisällä molemmat tuottavat samat tapahtumat."""
+    expected = _window(parse_ics_icalendar(content))
+    actual = _window(parse_ics(io.BytesIO(content), since=SINCE))
+    assert expected == actual, (len(expected), len(actual))
+
+
+RECURRING = b"""BEGIN:VCALENDAR\r
+BEGIN:VEVENT\r
+UID:weekly@bench\r
+DTSTART;TZID=Europe/Helsinki:20250901T180000\r
+DTEND;TZID=Europe/Helsinki:20250901T190000\r
+RRULE:FREQ=WEEKLY;UNTIL=20260301T000000Z\r
+EXDATE;TZID=Europe/Helsinki:20260112T180000,20260119T180000\r
+SUMMARY:Viikoittainen\\, ilta\r
+END:VEVENT\r
+BEGIN:VEVENT\r
+UID:weekly@bench\r
+RECURRENCE-ID;TZID=Europe/Helsinki:20260126T180000\r
+DTSTART;TZID=Europe/Helsinki:20260127T170000\r
+DTEND;TZID=Europe/Helsinki:20260127T180000\r
+SUMMARY:Siirretty\r
+END:VEVENT\r
+BEGIN:VEVENT\r
+UID:weekly@bench\r
+RECURRENCE-ID;TZID=Europe/Helsinki:20260202T180000\r
+DTSTART;TZID=Europe/Helsinki:20260202T180000\r
+STATUS:CANCELLED\r
+END:VEVENT\r
+BEGIN:VEVENT\r
+UID:daily@bench\r
+DTSTART;VALUE=DATE:20000101\r
+DTEND;VALUE=DATE:20000102\r
+RRULE:FREQ=DAILY\r
+SUMMARY:Loputon\r
+END:VEVENT\r
+END:VCALENDAR\r
+"""
+
+
+def check_recurrence() -> None:
+    events = parse_ics(io.BytesIO(RECURRING), since=SINCE, until=SINCE + timedelta(days=60))
+    weekly = sorted(e.start for e in events if e.title.startswith("Viikoittainen"))
+    # ikkunan 8 maanantaista pois 2 EXDATEa, siirretty ja peruttu
+    assert weekly[0] == datetime(2025, 12, 15, 18, 0, tzinfo=LOCAL_TZ), weekly[0]
+    assert datetime(2026, 1, 12, 18, 0, tzinfo=LOCAL_TZ) not in weekly
+    assert datetime(2026, 1, 26, 18, 0, tzinfo=LOCAL_TZ) not in weekly
+    assert datetime(2026, 2, 2, 18, 0, tzinfo=LOCAL_TZ) not in weekly
+    assert len(weekly) == 4, weekly
+    assert [e.title for e in events].count("Siirretty") == 1
+    daily = [e for e in events if e.title == "Loputon"]
+    assert len(daily) == 60 and daily[0].start == date(2025, 12, 11), (len(daily), daily[0].start)
+    assert daily[0].end == date(2025, 12, 12)
+
+
+def _measure(fn, content, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(content)
+        best = min(best, time.perf_counter() - t0)
+    tracemalloc.start()
+    result = fn(content)
+    _cur, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, len(result)
+
+
+def run(sizes, repeat=3) -> list:
+    results = []
+    for n in sizes:
+        content = make_calendar(n)
+        ref_s, ref_peak, ref_n = _measure(parse_ics_icalendar, content, repeat)
+        new_s, new_peak, new_n = _measure(
+            lambda c: parse_ics(io.BytesIO(c), since=SINCE), content, repeat)
+        results.append({
+            "vevents": n, "icalendar_s": ref_s, "stream_s": new_s, "speedup": ref_s / new_s,
+            "icalendar_peak_mb": ref_peak / 1e6, "stream_peak_mb": new_peak / 1e6,
+            "icalendar_events": ref_n, "stream_events": new_n,
+        })
+    return results
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000])
+    ap.add_argument('--repeat', type=int, default=3)
+    args = ap.parse_args()
+
+    check_parity(make_calendar(3000, seed=7))
+    check_recurrence()
+    print("parity OK")
+    for r in run(args.sizes, args.repeat):
+        print(f"{r['vevents']:>6} VEVENTs  icalendar {r['icalendar_s']:.3f}s / {r['icalendar_peak_mb']:.1f}MB "
+              f"({r['icalendar_events']} events)  stream {r['stream_s']:.3f}s / {r['stream_peak_mb']:.1f}MB "
+              f"({r['stream_events']} events)  x{r['speedup']:.1f}")
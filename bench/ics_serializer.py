@@ -0,0 +1,107 @@
+import argparse
+import time
+
+from icalendar import Calendar, Event as ICalEvent, vText
+
+from src.model import dump_events_ics
+from .fixtures import make_events
+
+# Natiivin ICS-kirjoittimen (src/ical.py) vertailu icalendar-kirjastoon:
+# ensin tarkistetaan että tulos on semanttisesti sama, sitten mitataan.
+#
+#   python -m bench.ics_serializer --sizes 1000 10000 100000
+
+
+def dump_events_ics_icalendar(events) -> bytes:
+    # Aiempi toteutus (icalendar-oliopuu), vertailukohdaksi
+    cal = Calendar()
+    cal.add('prodid', '-//OpenDoorsBot//EN')
+    cal.add('version', '2.0')
+    for e in events:
+        ve = ICalEvent()
+        ve.add('uid', e.id + '@opendoors.bot')
+        ve.add('summary', vText(e.title))
+        ve.add('dtstart', e.start)
+        if e.end:
+            ve.add('dtend', e.end)
+        if e.location:
+            ve.add('location', vText(e.location))
+        if e.url:
+            ve.add('url', vText(e.url))
+        cal.add_component(ve)
+    return cal.to_ical()
+
+
+def _semantic(ics: bytes) -> list:
+    out = []
+    for comp in Calendar.from_ical(ics).walk('VEVENT'):
+        end = comp.get('DTEND')
+        out.append((
+            str(comp.get('UID')),
+            str(comp.get('SUMMARY')),
+            comp.get('DTSTART').dt,
+            end.dt if end else None,
+            str(comp.get('LOCATION') or ''),
+            str(comp.get('URL') or ''),
+        ))
+    return out
+
+
+def edge_events() -> list:
+    # Escapet, pitkät UTF-8-rivit, naiivit ajat, päivämäärät ja UTC
+    from datetime import date, datetime, timezone
+    from src.model import Event
+    from .fixtures import LOCAL_TZ
+    return [
+        Event('Avoimet "ovet", ä; x\\y\ntoinen rivi', datetime(2026, 1, 15, 18, 0, tzinfo=LOCAL_TZ),
+              datetime(2026, 1, 15, 19, 30, tzinfo=LOCAL_TZ), 'Kallion lukio, Helsinki', 'https://x.fi/a'),
+        Event('Ä' * 120, datetime(2026, 3, 29, 4, 0, tzinfo=LOCAL_TZ), location='ö' * 77),
+        Event('Naiivi', datetime(2026, 2, 1, 9, 0), datetime(2026, 2, 1, 10, 0)),
+        Event('Koko päivä', date(2026, 5, 4), date(2026, 5, 5)),
+        Event('UTC', datetime(2026, 10, 25, 1, 30, tzinfo=timezone.utc)),
+    ]
+
+
+def check_parity(events) -> None:
+    """Molemmat kirjoittimet tuottavat samat tapahtumat samoilla arvoilla."""
+    expected = _semantic(dump_events_ics_icalendar(events))
+    actual = _semantic(dump_events_ics(events))
+    assert len(expected) == len(actual), (len(expected), len(actual))
+    for a, b in zip(expected, actual):
+        assert a == b, f"mismatch:\n  icalendar: {a}\n  native:    {b}"
+    # rivit enintään 75 oktettia
+    for line in dump_events_ics(events).split(b"\r\n"):
+        assert len(line) <= 75, line
+
+
+def _time(fn, events, repeat=3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(events)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def run(sizes, repeat=3) -> list:
+    results = []
+    for n in sizes:
+        events = make_events(n)
+        ref = _time(dump_events_ics_icalendar, events, repeat)
+        native = _time(dump_events_ics, events, repeat)
+        results.append({"events": n, "icalendar_s": ref, "native_s": native, "speedup": ref / native})
+    return results
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    ap.add_argument('--repeat', type=int, default=3)
+    args = ap.parse_args()
+
+    check_parity(edge_events())
+    check_parity(make_events(2000, seed=7))
+    print("parity OK")
+    for r in run(args.sizes, args.repeat):
+        print(f"{r['events']:>7} events  icalendar {r['icalendar_s']:.3f}s  "
+              f"native {r['native_s']:.3f}s  x{r['speedup']:.1f}")
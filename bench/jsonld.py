@@ -0,0 +1,148 @@
+import argparse
+import json
+import random
+import time
+from typing import List
+
+from bs4 import BeautifulSoup
+from dateutil import parser as dtparser
+
+from src.collectors.jsonld import parse_jsonld_events
+from src.model import Event
+from .fixtures import SCHOOLS
+
+# JSON-LD-kerääjä: regex-skanneri + fromisoformat (src/collectors/jsonld.py)
+# vs. aiempi BeautifulSoup-DOM + dateutil. Aineistona suuria CMS-sivuja, joissa
+# on paljon merkintää, inline-skriptejä ja muutama JSON-LD-lohko.
+#
+#   python -m bench.jsonld --sizes 100 1000 5000
+
+URL = "https://example.fi/tapahtumat"
+
+
+def parse_jsonld_events_bs4(html: str, url: str, source_name: str = None) -> List[Event]:
+    # Aiempi toteutus vertailukohdaksi
+    soup = BeautifulSoup(html, 'html.parser')
+    out = []
+    for s in soup.find_all('script', attrs={'type': 'application/ld+json'}):
+        if not s.string:
+            continue
+        try:
+            data = json.loads(s.string)
+        except Exception:
+            continue
+        for node in (data if isinstance(data, list) else [data]):
+            t = node.get('@type')
+            if not ('Event' in t if isinstance(t, list) else t == 'Event'):
+                continue
+            name = node.get('name') or node.get('headline')
+            start = node.get('startDate')
+            end = node.get('endDate')
+            if not name or not start:
+                continue
+            try:
+                start_dt = dtparser.parse(start)
+                end_dt = dtparser.parse(end) if end else None
+            except Exception:
+                continue
+            loc = None
+            loc_node = node.get('location')
+            if isinstance(loc_node, dict):
+                loc = loc_node.get('name') or (loc_node.get('address') if isinstance(loc_node.get('address'), str) else None)
+            elif isinstance(loc_node, str):
+                loc = loc_node
+            out.append(Event(title=name, start=start_dt, end=end_dt, location=loc,
+                             url=node.get('url') or url, organizer=source_name, source_url=url))
+    return out
+
+
+def _event_node(rnd, i) -> dict:
+    school = rnd.choice(SCHOOLS)
+    day = 1 + i % 28
+    node = {
+        "@context": "https://schema.org",
+        "@type": "Event",
+        "name": f"Avoimet ovet – {school} #{i}",
+        "startDate": f"2026-02-{day:02d}T18:00:00+02:00",
+        "location": {"@type": "Place", "name": f"{school}, Helsinki"},
+        "url": f"https://example.fi/tapahtumat/{i}",
+    }
+    if rnd.random() < 0.7:
+        node["endDate"] = f"2026-02-{day:02d}T19:30:00+02:00"
+    if rnd.random() < 0.1:
+        node["startDate"] = f"Feb {day} 2026 17:00"  # ei-ISO, dateutil-polku
+    return node
+
+
+def make_page(n_events: int, seed: int = 1, nested: bool = False) -> str:
+    """Suuri CMS-sivu. nested=True käyttää @graph- ja subEvent-rakenteita."""
+    rnd = random.Random(seed)
+    parts = ["<!DOCTYPE html><html lang='fi'><head><meta charset='utf-8'><title>Tapahtumat</title>"]
+    parts.append("<script>window.dataLayer=window.dataLayer||[];function gtag(){dataLayer.push(arguments)}</script>")
+    parts.append('<script type="application/ld+json">{"@context":"https://schema.org","@type":"WebSite","name":"x"}</script>')
+    parts.append("</head><body><nav>" + "".join(
+        f"<ul class='menu'><li><a href='/fi/{j}' class='menu__link'>Valikko {j}</a></li></ul>" for j in range(300)
+    ) + "</nav><main>")
+    nodes = [_event_node(rnd, i) for i in range(n_events)]
+    for i, node in enumerate(nodes):
+        parts.append(
+            f"<article class='event-card'><h2>{node['name']}</h2><p>{'Lorem ipsum dolor sit amet. ' * 10}</p>"
+            f"<img src='/img/{i}.jpg' alt=''><a href='{node['url']}'>Lue lisää</a></article>"
+        )
+        if not nested:
+            quote = '"' if i % 2 else "'"
+            parts.append(f"<script type={quote}application/ld+json{quote}>{json.dumps(node, ensure_ascii=False)}</script>")
+    if nested:
+        parent = dict(nodes[0], subEvent=nodes[1:n_events // 2])
+        graph = {"@context": "https://schema.org", "@graph": [parent] + nodes[n_events // 2:]}
+        parts.append(f'<script type="application/ld+json">{json.dumps(graph, ensure_ascii=False)}</script>')
+    parts.append("<script>document.querySelectorAll('a').forEach(a => a.dataset.x = '</div>');</script>")
+    parts.append("</main><footer>" + "<p>Yhteystiedot</p>" * 200 + "</footer></body></html>")
+    return "".join(parts)
+
+
+def _rows(events) -> list:
+    return [(e.title, e.start, e.end, e.location, e.url) for e in events]
+
+
+def check_parity() -> None:
+    page = make_page(500, seed=7)
+    expected = _rows(parse_jsonld_events_bs4(page, URL))
+    actual = _rows(parse_jsonld_events(page, URL))
+    assert expected == actual, (len(expected), len(actual))
+    # @graph + subEvent: sama tapahtumajoukko, jota vanha toteutus ei löytänyt
+    nested = parse_jsonld_events(make_page(500, seed=7, nested=True), URL)
+    assert sorted(_rows(nested), key=str) == sorted(actual, key=str), (len(nested), len(actual))
+
+
+def _time(fn, page, repeat) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(page, URL)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def run(sizes, repeat=3) -> list:
+    results = []
+    for n in sizes:
+        page = make_page(n)
+        ref = _time(parse_jsonld_events_bs4, page, repeat)
+        new = _time(parse_jsonld_events, page, repeat)
+        results.append({"events": n, "page_kb": len(page) // 1024, "bs4_s": ref, "scanner_s": new,
+                        "speedup": ref / new})
+    return results
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 5000])
+    ap.add_argument('--repeat', type=int, default=3)
+    args = ap.parse_args()
+
+    check_parity()
+    print("parity OK")
+    for r in run(args.sizes, args.repeat):
+        print(f"{r['events']:>5} events ({r['page_kb']} kB)  bs4 {r['bs4_s']:.3f}s  "
+              f"scanner {r['scanner_s']:.3f}s  x{r['speedup']:.1f}")
@@ -0,0 +1,208 @@
+import argparse
+import contextlib
+import copy
+import io
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, List, NamedTuple, Optional
+
+from src.collectors.helfi_lukio import parse_helfi_lukio
+from src.collectors.ics import parse_ics
+from src.collectors.jsonld import parse_jsonld_events
+from src.collectors.stadinao import parse_stadinao_events
+from src.collectors.textscan import compile_pattern_sets
+from src.collectors.vantaa_lukio import parse_vantaa_lukio
+from src.dedupe import dedupe
+from src.main import normalize_events
+from src.model import iter_events_ics, iter_events_json
+from src.registry import load_pattern_specs
+from src.search import build_index
+from . import ics_ingest, jsonld, stadinao, textscan
+from .fixtures import make_events
+
+# Kuumien polkujen mittaussarja: regex-kerääjien sivujen jäsennys,
+# JSON-LD, ICS, aikavyöhykenormalisointi, duplikaattien poisto, molemmat
+# serialisoijat ja hakuindeksi synteettisellä aineistolla (1k/10k/100k eventtiä) sekä
+# tallennetuilla sivuilla (bench/pages/). Tulokset JSON-muodossa; toiseen
+# ajoon verrattaessa yli kynnyksen hidastunut tapaus kaataa sarjan.
+#
+#   python -m bench.run --json bench-baseline.json
+#   python -m bench.run --compare bench-baseline.json --threshold 0.25
+#   python -m bench.run --cases ics serialize --sizes 1000 10000
+
+PAGES = Path(__file__).parent / "pages"
+SETS = compile_pattern_sets(load_pattern_specs())
+DEFAULT_SIZES = [1000, 10000, 100000]
+DEFAULT_THRESHOLD = 0.25
+# näin nopeita tapauksia ei verrata (ajastimen ja ajoympäristön kohina)
+MIN_COMPARE_S = 0.01
+FORMAT_VERSION = 1
+
+
+class Case(NamedTuple):
+    name: str
+    setup: Callable[[int], object]             # n -> aineisto (ei mitata)
+    fn: Callable[[object], object]             # mitattava kutsu
+    fresh: Optional[Callable[[object], object]] = None  # uusi kopio ennen jokaista kierrosta
+    sizes: Optional[List[int]] = None          # kiinteät koot (tallennetut sivut)
+    loops: int = 1                             # kutsuja per kierros (pienet sivut)
+
+
+def make_helfi_page(n: int) -> str:
+    rows = [
+        f"<li><strong>{('ma', 'ti', 'ke', 'to', 'pe')[i % 5]} {1 + i % 28}.{1 + i % 12}.2026</strong> "
+        f"klo {8 + i % 8}.00–{10 + i % 8}.30{' huoltajille' if i % 7 == 0 else ''}</li>"
+        for i in range(n)
+    ]
+    return ("<html><body><main><h2>Avoimet ovet 2026</h2>"
+            + "<p>Tervetuloa tutustumaan lukioon!</p>" * 200
+            + "<ul>" + "".join(rows) + "</ul></main></body></html>")
+
+
+def _naive_events(n: int) -> list:
+    events = make_events(n)
+    for e in events:
+        e.start = e.start.replace(tzinfo=None)
+        if e.end:
+            e.end = e.end.replace(tzinfo=None)
+    return events
+
+
+def _dedupe_input(n: int) -> tuple:
+    events = make_events(n)
+    # kolme lähdettä vuorotellen; satunnaisaineistossa on luontaisia päällekkäisyyksiä
+    sources = [("helfi", "manual", "ics")[i % 3] for i in range(n)]
+    return events, sources
+
+
+def _page(filename: str) -> Callable[[int], str]:
+    return lambda _n: (PAGES / filename).read_text(encoding="utf-8")
+
+
+CASES = [
+    Case("helfi_regex", make_helfi_page,
+         lambda html: parse_helfi_lukio(html, "K", "u", "l", SETS["helfi"])),
+    Case("vantaa_regex", textscan.make_page,
+         lambda html: parse_vantaa_lukio(html, "K", "u", "l", SETS["vantaa"])),
+    Case("stadinao", stadinao.make_page,
+         lambda html: parse_stadinao_events(html, "S", "u", "l", SETS["stadinao"])),
+    Case("jsonld", jsonld.make_page,
+         lambda html: parse_jsonld_events(html, jsonld.URL)),
+    Case("ics_ingest", ics_ingest.make_calendar,
+         lambda content: parse_ics(io.BytesIO(content), since=ics_ingest.SINCE)),
+    Case("normalize", _naive_events, normalize_events, fresh=lambda evs: [copy.copy(e) for e in evs]),
+    Case("dedupe", _dedupe_input, lambda a: dedupe(a[0], a[1])),
+    Case("serialize_json", make_events, lambda evs: "".join(iter_events_json(evs))),
+    Case("serialize_ics", make_events, lambda evs: b"".join(iter_events_ics(evs))),
+    Case("search_index", make_events, lambda evs: build_index(evs)["tokens"]),
+    # tallennetut sivut: kiinteä koko (1 sivu)
+    Case("page:helfi_tutustu_ja_hae", _page("helfi_tutustu_ja_hae.html"),
+         lambda html: parse_helfi_lukio(html, "K", "u", "l", SETS["helfi"]), sizes=[1], loops=200),
+    Case("page:vantaa_lukio", _page("vantaa_lukio.html"),
+         lambda html: parse_vantaa_lukio(html, "K", "u", "l", SETS["vantaa"]), sizes=[1], loops=200),
+    Case("page:stadinao_avoimet_ovet", _page("stadinao_avoimet_ovet.html"),
+         lambda html: parse_stadinao_events(html, "S", "u", "l", SETS["stadinao"]), sizes=[1], loops=200),
+]
+
+
+def measure(case: Case, n: int, repeat: int, budget: float) -> dict:
+    """
+    Paras ja mediaani `repeat` kierroksesta (aika per kutsu); lopetetaan
+    aiemmin, jos aikabudjetti ylittyy. Kerääjien [WARN]-tulosteet vaimennetaan.
+    """
+    data = case.setup(n)
+    times = []
+    spent = 0.0
+    result = None
+    while len(times) < repeat and (not times or spent < budget):
+        arg = case.fresh(data) if case.fresh else data
+        with contextlib.redirect_stdout(io.StringIO()):
+            t0 = time.perf_counter()
+            for _ in range(case.loops):
+                result = case.fn(arg)
+            elapsed = time.perf_counter() - t0
+        times.append(elapsed / case.loops)
+        spent += elapsed
+    if isinstance(result, tuple):
+        result = result[0]
+    return {
+        "case": case.name,
+        "size": n,
+        "best_s": min(times),
+        "median_s": statistics.median(times),
+        "runs": len(times),
+        "loops": case.loops,
+        "output": len(result) if hasattr(result, "__len__") else None,
+    }
+
+
+def run(case_filter=None, sizes=DEFAULT_SIZES, repeat=5, budget=5.0, verbose=True) -> dict:
+    results = []
+    for case in CASES:
+        if case_filter and not any(f in case.name for f in case_filter):
+            continue
+        for n in case.sizes or sizes:
+            r = measure(case, n, repeat, budget)
+            results.append(r)
+            if verbose:
+                print(f"{r['case']:<28} {r['size']:>7}  best {r['best_s']:.4f}s  "
+                      f"median {r['median_s']:.4f}s  ({r['runs']} runs, {r['output']} out)", flush=True)
+    return {
+        "version": FORMAT_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> List[str]:
+    """Palauttaa hidastuneet tapaukset (best_s kasvanut yli kynnyksen)."""
+    base = {(r["case"], r["size"]): r for r in baseline["results"]}
+    regressions = []
+    for r in current["results"]:
+        b = base.get((r["case"], r["size"]))
+        if b is None or max(b["best_s"], r["best_s"]) * r.get("loops", 1) < MIN_COMPARE_S:
+            continue
+        ratio = r["best_s"] / b["best_s"]
+        line = f"{r['case']:<28} {r['size']:>7}  {b['best_s']:.4f}s -> {r['best_s']:.4f}s  x{ratio:.2f}"
+        if ratio > 1 + threshold:
+            regressions.append(line)
+            line += "  REGRESSION"
+        print(line)
+    return regressions
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--cases', nargs='+', default=None,
+                    help='aja vain tapaukset, joiden nimessä on jokin näistä')
+    ap.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    ap.add_argument('--repeat', type=int, default=5)
+    ap.add_argument('--budget', type=float, default=5.0,
+                    help='tapauksen ja koon aikabudjetti sekunteina (vähintään yksi kierros)')
+    ap.add_argument('--json', default=None, help='kirjoita tulokset tähän tiedostoon')
+    ap.add_argument('--compare', default=None, help='vertaa aiempaan tulostiedostoon')
+    ap.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                    help='sallittu hidastuminen (0.25 = 25 %%)')
+    args = ap.parse_args()
+
+    stadinao.check_pages()
+    textscan.check_pages()
+    print("pages OK")
+    current = run(args.cases, args.sizes, args.repeat, args.budget)
+    if args.json:
+        Path(args.json).write_text(json.dumps(current, indent=2) + "\n", encoding="utf-8")
+        print(f"Results → {args.json}")
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        regressions = compare(baseline, current, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) over {args.threshold:.0%}")
+            sys.exit(1)
+        print(f"No regressions over {args.threshold:.0%}")
@@ -0,0 +1,205 @@
+import argparse
+import gzip
+import http.client
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from src.model import iter_events_json
+from src.output import write_atomic
+from src.search import fold, tokenize
+from src.serve import EventServer, accepts_gzip, parse_query
+from .fixtures import LOCAL_TZ, make_events
+
+# serve-tilan tarkistus ja kuormatesti: palvelin käynnistetään samaan
+# prosessiin satunnaisportiin synteettisellä events.json:lla. Ensin
+# tarkistetaan kyselyjen tulokset suoraa läpikäyntiä vasten, ETag/304,
+# gzip ja indeksin vaihto; sitten ajetaan kyselyitä rinnakkaisilla
+# keep-alive-yhteyksillä. Kuormatesti epäonnistuu, jos mediaaniviive tai
+# läpäisy on rajojen ulkopuolella: Nagle + viivästetty ACK näkyy
+# keep-alive-yhteydellä ~40 ms:n mediaanina.
+#
+#   python -m bench.serve --events 100000 --clients 8 --requests 500
+
+# Accept-Encoding -> gzip?
+ACCEPT_CASES = [
+    ("gzip", True),
+    ("gzip;q=0.5", True),
+    ("gzip; q=0.8", True),
+    ("deflate, gzip;q=1.0", True),
+    ("br;q=1, GZIP;q=0.001", True),
+    ("*", True),
+    ("gzip;q=0", False),
+    ("gzip; q=0.000", False),
+    ("gzip;q=0, *", False),
+    ("*;q=0", False),
+    ("identity", False),
+    ("", False),
+]
+
+QUERIES = [
+    "/events?from=2026-03-01&to=2026-03-31",
+    "/events?from=2026-01-01&to=2026-06-30&organizer=lukio",
+    "/events?q=avoimet+kall",
+    "/events?from=2025-09-01&to=2025-09-07&q=ilta",
+    "/events.ics?from=2026-04-01&to=2026-04-14",
+    "/events.ics?organizer=stadin",
+]
+
+
+def _get(conn, path, headers=None):
+    conn.request("GET", path, headers=headers or {})
+    resp = conn.getresponse()
+    return resp.status, dict(resp.getheaders()), resp.read()
+
+
+def _reference(rows, since=None, until=None, organizer="", words=()):
+    out = []
+    for d in rows:
+        start = datetime.fromisoformat(d["start"])
+        if since is not None and start < since or until is not None and start >= until:
+            continue
+        if organizer and organizer not in fold(d.get("organizer") or ""):
+            continue
+        tokens = tokenize(" ".join(filter(None, (d["title"], d.get("organizer"), d.get("location"), d.get("url")))))
+        if not all(any(t.startswith(w) for t in tokens) for w in words):
+            continue
+        out.append(d["id"])
+    return sorted(out)
+
+
+def check(server, rows, events_path) -> None:
+    for header, expected in ACCEPT_CASES:
+        assert accepts_gzip(header) == expected, header
+    conn = http.client.HTTPConnection("127.0.0.1", server.server_port)
+    cases = [
+        ("/events?from=2026-03-01&to=2026-03-31",
+         dict(since=datetime(2026, 3, 1, tzinfo=LOCAL_TZ), until=datetime(2026, 4, 1, tzinfo=LOCAL_TZ))),
+        ("/events?organizer=L%C3%A4hde+kallion", dict(organizer="lahde kallion")),
+        ("/events?organizer=kallion&q=huoltaj+ilta", dict(organizer="kallion", words=("huoltaj", "ilta"))),
+        ("/events?from=2026-05-01T12:00&q=ressun", dict(since=datetime(2026, 5, 1, 12, tzinfo=LOCAL_TZ),
+                                                       words=("ressun",))),
+    ]
+    for path, ref in cases:
+        status, _headers, body = _get(conn, path)
+        assert status == 200, (path, status)
+        got = sorted(d["id"] for d in json.loads(body))
+        assert got == _reference(rows, **ref), (path, len(got))
+
+    # ETag, gzip ja 304
+    path = QUERIES[0]
+    status, h, plain = _get(conn, path)
+    status, hz, zipped = _get(conn, path, {"Accept-Encoding": "gzip"})
+    assert hz.get("Content-Encoding") == "gzip" and gzip.decompress(zipped) == plain
+    assert h["ETag"] != hz["ETag"] and h["Vary"] == "Accept-Encoding"
+    status, _h, body = _get(conn, path, {"If-None-Match": h["ETag"]})
+    assert status == 304 and body == b"", status
+    status, _h, body = _get(conn, path, {"If-None-Match": hz["ETag"], "Accept-Encoding": "gzip"})
+    assert status == 304, status
+    status, _h, _body = _get(conn, path, {"If-None-Match": hz["ETag"]})
+    assert status == 200, status
+    for header, expected in ACCEPT_CASES:
+        status, hq, body = _get(conn, path, {"Accept-Encoding": header})
+        assert (hq.get("Content-Encoding") == "gzip") == expected, header
+        assert hq["ETag"] == (hz if expected else h)["ETag"] and body == (zipped if expected else plain), header
+    status, _h, body = _get(conn, "/events?since=2026-01-01")
+    assert status == 400, status
+    status, _h, body = _get(conn, "/events.ics?organizer=kallion")
+    assert status == 200 and body.startswith(b"BEGIN:VCALENDAR"), status
+
+    # uusi events.json -> uusi indeksi, vanha ETag ei enää kelpaa
+    write_atomic(events_path, [json.dumps(rows[: len(rows) // 2], ensure_ascii=False)], compress=False)
+    assert server.reload_if_changed()
+    status, _h, body = _get(conn, "/status")
+    assert json.loads(body)["events"] == len(rows) // 2
+    status, _h, _body = _get(conn, path, {"If-None-Match": h["ETag"]})
+    assert status == 200, status
+    write_atomic(events_path, [json.dumps(rows, ensure_ascii=False)], compress=False)
+    assert server.reload_if_changed()
+    conn.close()
+
+
+def load_test(port: int, clients: int, requests: int, queries) -> dict:
+    latencies = []
+    lock = threading.Lock()
+    statuses = {}
+
+    def worker(k):
+        conn = http.client.HTTPConnection("127.0.0.1", port)
+        mine = []
+        for i in range(requests):
+            path = queries[(k + i) % len(queries)]
+            t0 = time.perf_counter()
+            status, _h, _body = _get(conn, path, {"Accept-Encoding": "gzip"})
+            mine.append(time.perf_counter() - t0)
+            with lock:
+                statuses[status] = statuses.get(status, 0) + 1
+        conn.close()
+        with lock:
+            latencies.extend(mine)
+
+    threads = [threading.Thread(target=worker, args=(k,)) for k in range(clients)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "statuses": statuses,
+    }
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--events', type=int, default=100000)
+    ap.add_argument('--clients', type=int, default=8)
+    ap.add_argument('--requests', type=int, default=300, help='pyyntöä per asiakas')
+    ap.add_argument('--max-p50-ms', type=float, default=20.0, help='kuormatestin mediaaniviiveen yläraja')
+    ap.add_argument('--min-rps', type=float, default=200.0, help='kuormatestin läpäisyn alaraja')
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        events_path = os.path.join(tmp, "events.json")
+        events = make_events(args.events)
+        for e in events[::50]:
+            e.organizer = f"Lähde {e.organizer}"
+        write_atomic(events_path, iter_events_json(events), compress=False)
+        with open(events_path, encoding="utf-8") as f:
+            rows = json.load(f)
+        t0 = time.perf_counter()
+        server = EventServer(("127.0.0.1", 0), events_path, poll=3600)
+        print(f"index {len(server.index)} events in {time.perf_counter() - t0:.2f}s")
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            check(server, rows, events_path)
+            print("checks OK")
+            # kysely ilman vastausvälimuistia (bisect + suodatus + serialisointi)
+            index = server.index
+            for path in QUERIES:
+                kind = "ics" if ".ics" in path else "json"
+                q = parse_query(path.partition("?")[2])
+                t0 = time.perf_counter()
+                resp = index.render(kind, q)
+                elapsed = time.perf_counter() - t0
+                index._cache.clear()
+                print(f"{path:<55} {elapsed * 1000:7.1f} ms  {len(resp.body):>8} B")
+            r = load_test(server.server_port, args.clients, args.requests, QUERIES)
+            print(f"load  {r['requests']} requests ({args.clients} clients)  {r['rps']:.0f} req/s  "
+                  f"p50 {r['p50_ms']:.1f} ms  p99 {r['p99_ms']:.1f} ms  {r['statuses']}")
+            assert r["statuses"] == {200: r["requests"]}, r["statuses"]
+            assert r["p50_ms"] <= args.max_p50_ms, f"p50 {r['p50_ms']:.1f} ms > {args.max_p50_ms} ms"
+            assert r["rps"] >= args.min_rps, f"{r['rps']:.0f} req/s < {args.min_rps}"
+            print("load OK")
+        finally:
+            server.shutdown()
+            server.server_close()
@@ -0,0 +1,108 @@
+import argparse
+import re
+import time
+from datetime import datetime
+from pathlib import Path
+
+from src.collectors.stadinao import parse_stadinao_events
+from src.collectors.textscan import compile_pattern_sets
+from src.registry import load_pattern_specs
+
+# Stadin AO -kerääjä: päivien ja aikojen paritus offset-indeksillä
+# (textscan.Scan.pairs) vs. aiempi toteutus, joka haki ajan koko sivulta
+# uudelleen jokaiselle päivälle (ja antoi kaikille päiville sivun
+# ensimmäisen ajan). Ensin tarkistetaan esimerkkisivun (bench/pages/)
+# tulos, sitten mitataan skaalautuminen. Sivu on synteettinen: käsin tehty
+# stadinao.fi:n rakenteen mukaan (accordion, alatunniste, hakuaikateksti),
+# ei tallennettu kopio.
+#
+#   python -m bench.stadinao --sizes 100 1000 5000
+
+PAGES = Path(__file__).parent / "pages"
+
+PATTERNS = compile_pattern_sets(load_pattern_specs())["stadinao"]
+
+# Aiemman toteutuksen kuviot (raaka HTML)
+DATE_PATTERN = re.compile(r"(?P<day>\d{1,2})\.(?P<month>\d{1,2})\.(?P<year>20\d{2})", re.IGNORECASE)
+TIME_PATTERN = re.compile(
+    r"klo\s+(?P<sh>\d{1,2})[.:](?P<sm>\d{2})\s*[–-]\s*(?P<eh>\d{1,2})[.:](?P<em>\d{2})",
+    re.IGNORECASE
+)
+
+# synteettinen sivu -> odotetut (alku, loppu)
+EXPECTED = {
+    "stadinao_avoimet_ovet.html": [
+        ("2025-11-25T09:00", "2025-11-25T14:30"),
+        ("2025-12-10T17:00", "2025-12-10T19:00"),
+        ("2026-02-03T10:00", "2026-02-03T13:00"),  # "3.2.2026 ja 4.2.2026 klo 10:00-13:00"
+        ("2026-02-04T10:00", "2026-02-04T13:00"),
+        ("2026-02-17T09:00", "2026-02-17T10:00"),  # ei omaa aikaa, oletus
+        # "yhteishaku päättyy 17.3.2026" ja "Sivua päivitetty 1.8.2025" ohitetaan
+    ],
+}
+
+
+def parse_stadinao_events_legacy(html: str) -> list:
+    # Aiempi toteutus vertailukohdaksi
+    out = []
+    for dm in DATE_PATTERN.finditer(html):
+        tm = TIME_PATTERN.search(html)
+        y, m, d = int(dm.group("year")), int(dm.group("month")), int(dm.group("day"))
+        if tm:
+            out.append((datetime(y, m, d, int(tm.group("sh")), int(tm.group("sm"))),
+                        datetime(y, m, d, int(tm.group("eh")), int(tm.group("em")))))
+        else:
+            out.append((datetime(y, m, d, 9, 0), datetime(y, m, d, 10, 0)))
+    return out
+
+
+def check_pages() -> None:
+    for filename, expected in EXPECTED.items():
+        html = (PAGES / filename).read_text(encoding="utf-8")
+        events = parse_stadinao_events(html, "Stadin AO", "https://stadinao.fi/", "Stadin AO, Helsinki", PATTERNS)
+        actual = [(e.start.isoformat(timespec="minutes"), e.end.isoformat(timespec="minutes")) for e in events]
+        assert actual == expected, f"{filename}:\n  expected {expected}\n  actual   {actual}"
+
+
+def make_page(n: int) -> str:
+    # suuri sivu: aikaa ei ole alussa, joten vanha haku käy koko sivun läpi
+    rows = []
+    for i in range(n):
+        rows.append(
+            f"<div class='card'><p>{'Lorem ipsum dolor sit amet. ' * 20}</p>"
+            f"<p><strong>{1 + i % 28}.{1 + i % 12}.2026</strong> klo {8 + i % 8}.00–{10 + i % 8}.30</p></div>"
+        )
+    return "<html><body>" + "<p>Ei aikoja täällä.</p>" * 5000 + "".join(rows) + "</body></html>"
+
+
+def _time(fn, html, repeat) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(html)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def run(sizes, repeat=3) -> list:
+    results = []
+    for n in sizes:
+        html = make_page(n)
+        legacy = _time(parse_stadinao_events_legacy, html, repeat)
+        indexed = _time(lambda h: parse_stadinao_events(h, "x", "u", "l", PATTERNS), html, repeat)
+        results.append({"dates": n, "page_kb": len(html) // 1024, "legacy_s": legacy,
+                        "indexed_s": indexed, "speedup": legacy / indexed})
+    return results
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 5000])
+    ap.add_argument('--repeat', type=int, default=3)
+    args = ap.parse_args()
+
+    check_pages()
+    print("pages OK")
+    for r in run(args.sizes, args.repeat):
+        print(f"{r['dates']:>5} dates ({r['page_kb']} kB)  legacy {r['legacy_s']:.3f}s  "
+              f"indexed {r['indexed_s']:.3f}s  x{r['speedup']:.1f}")
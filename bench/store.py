@@ -0,0 +1,86 @@
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from src.model import iter_events_json
+from src.store import EventStore
+from src.tz import normalize_events, table_for_window
+from src.window import BuildWindow
+from .fixtures import LOCAL_TZ, SCHOOLS, make_events
+
+# SQLite-tietovarasto (--store): buildin upsert ja ulostulojen kysely vs.
+# pelkkä listan järjestys. Tarkistaa, että varastosta luettu events.json on
+# sama kuin listasta kirjoitettu, ja mittaa toisen buildin (kaikki eventit
+# jo varastossa) sekä indeksoidut historiakyselyt.
+#
+#   python -m bench.store --sizes 10000 100000
+
+SEEN = datetime(2026, 10, 18, 6, 0, tzinfo=timezone.utc)
+WINDOW = BuildWindow(since=datetime(2025, 9, 1, tzinfo=LOCAL_TZ))
+
+QUERIES = {
+    "organizer": "SELECT count(*) FROM events WHERE organizer = ?",
+    "source": "SELECT count(*) FROM events WHERE source = ?",
+    "month": "SELECT count(*) FROM events WHERE start_ts >= ? AND start_ts < ?",
+}
+
+
+def _list_path(events):
+    kept = [e for e in events if WINDOW.contains(e.start)]
+    kept.sort(key=lambda e: e.start)
+    return kept
+
+
+def run(sizes) -> list:
+    results = []
+    table = table_for_window(WINDOW)
+    for n in sizes:
+        # buildissa varastoon menee dedupe-vaiheen tulos, jossa id:t ovat uniikit
+        events = list({e.id: e for e in reversed(make_events(n))}.values())[::-1]
+        n = len(events)
+        sources = [("helfi", "manual", "ics")[i % 3] for i in range(n)]
+        with tempfile.TemporaryDirectory() as tmp:
+            with EventStore(os.path.join(tmp, "events.db")) as store:
+                t0 = time.perf_counter()
+                expected = _list_path(events)
+                list_s = time.perf_counter() - t0
+
+                timings = []
+                for k in range(2):
+                    t0 = time.perf_counter()
+                    run_id = store.record(events, sources, SEEN + timedelta(days=k))
+                    got = store.current(run_id, WINDOW)
+                    normalize_events(got, table)
+                    timings.append(time.perf_counter() - t0)
+                assert "".join(iter_events_json(got)) == "".join(iter_events_json(expected)), n
+                summary = store.summary(run_id)
+                assert summary == {"total": n, "new": 0}, summary
+
+                query_ms = {}
+                month = datetime(2026, 3, 1, tzinfo=LOCAL_TZ).timestamp()
+                params = {"organizer": (SCHOOLS[0],), "source": ("manual",),
+                          "month": (month, month + 31 * 86400)}
+                for name, sql in QUERIES.items():
+                    t0 = time.perf_counter()
+                    store.conn.execute(sql, params[name]).fetchone()
+                    query_ms[name] = (time.perf_counter() - t0) * 1000
+                plan = " ".join(row[-1] for row in store.conn.execute(
+                    "EXPLAIN QUERY PLAN " + QUERIES["organizer"], params["organizer"]))
+                assert "USING" in plan and "INDEX" in plan, plan
+        results.append({"events": n, "list_s": list_s, "first_s": timings[0], "again_s": timings[1],
+                        "query_ms": query_ms})
+    return results
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000])
+    args = ap.parse_args()
+
+    for r in run(args.sizes):
+        queries = "  ".join(f"{k} {v:.1f}ms" for k, v in r["query_ms"].items())
+        print(f"{r['events']:>7} events  list {r['list_s']:.3f}s  store first {r['first_s']:.3f}s  "
+              f"again {r['again_s']:.3f}s  queries: {queries}")
+    print("parity OK")
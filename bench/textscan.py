@@ -0,0 +1,130 @@
+import argparse
+import re
+import time
+from datetime import datetime
+from pathlib import Path
+
+from src.collectors.helfi_lukio import parse_helfi_lukio
+from src.collectors.textscan import compile_pattern_sets, html_to_text
+from src.collectors.vantaa_lukio import parse_vantaa_lukio
+from src.registry import load_pattern_specs
+
+# Regex-kerääjien yhteinen tekstivaihe (src/collectors/textscan.py):
+# esimerkkisivujen (bench/pages/, käsin tehty hel.fi- ja Vantaa-sivujen
+# rakenteen mukaan) tulokset, HTML -> teksti -offsetit, sekä läpäisy vs.
+# aiempi Vantaan kerääjä, joka ajoi kuviot raakaan HTML:ään ja käänsi
+# otsikkohaun jokaiselle osumalle erikseen. Uusi polku tekee lisäksi
+# tekstimuunnoksen (noin puolet sen ajasta); kuviot ajetaan vain päivien ja
+# aikojen ympärillä.
+#
+#   python -m bench.textscan --sizes 100 1000 5000
+
+PAGES = Path(__file__).parent / "pages"
+SETS = compile_pattern_sets(load_pattern_specs())
+
+# sivu -> (kerääjä, kuviojoukko, odotetut (otsikko, alku, loppu))
+EXPECTED = {
+    "helfi_tutustu_ja_hae.html": (parse_helfi_lukio, "helfi", [
+        ("Avoimet ovet – K", "2026-01-14T10:30", "2026-01-14T12:00"),  # <strong> päivän ympärillä
+        ("Avoimet ovet – K", "2026-01-15T17:00", "2026-01-15T18:30"),  # vuosi "Avoimet ovet 2026"
+        ("Avoimet ovet (huoltajille) – K", "2026-01-27T19:00", "2026-01-27T21:00"),  # &ndash;
+        ("Avoimet ovet – K", "2026-01-30T18:00", "2026-01-30T19:00"),  # &nbsp;
+    ]),
+    "vantaa_lukio.html": (parse_vantaa_lukio, "vantaa", [
+        ("Avoimet ovet – K", "2026-01-20T17:30", "2026-01-20T19:00"),
+        ("Tutustumisilta 9ls-oppilaille ja huoltajille – K", "2026-02-12T18:00", "2026-02-12T19:30"),
+        ("Infoilta lukion erityislinjoista – K", "2026-03-03T18:00", "2026-03-03T19:00"),
+        # 31.2.2026 ohitetaan [WARN]-viestillä
+    ]),
+}
+
+
+def check_pages() -> None:
+    for filename, (parse, set_name, expected) in EXPECTED.items():
+        html = (PAGES / filename).read_text(encoding="utf-8")
+        events = parse(html, "K", "https://example.fi/", "K, Helsinki", SETS[set_name])
+        actual = [(e.title, e.start.isoformat(timespec="minutes"), e.end.isoformat(timespec="minutes"))
+                  for e in events]
+        assert actual == expected, f"{filename}:\n  expected {expected}\n  actual   {actual}"
+
+
+def check_offsets() -> None:
+    html = "<p>Avoimet&nbsp;ovet</p>\n<div>ke <b>14.1.</b>  klo&ndash;x</div><script>1.1.2026</script>"
+    page = html_to_text(html)
+    assert page.text == "Avoimet ovet\nke 14.1. klo–x\n", repr(page.text)
+    for i, ch in enumerate(page.text):
+        if ch.isalnum():
+            assert html[page.html_offset(i)] == ch, (i, ch)
+
+
+# Aiempi Vantaan toteutus vertailukohdaksi
+LEGACY_PATTERN = re.compile(
+    r"(?:(?P<weekday>ma|ti|ke|to|pe|la|su)\s+)?(?P<day>\d{1,2})\.(?P<month>\d{1,2})(?:\.(?P<year>20\d{2}))?"
+    r"[^k]{0,80}?klo\s+(?P<sh>\d{1,2})[.:](?P<sm>\d{2})\s*[–\-]\s*(?P<eh>\d{1,2})[.:](?P<em>\d{2})",
+    re.IGNORECASE,
+)
+
+
+def parse_vantaa_legacy(html: str) -> list:
+    ym = re.search(r"20\d{2}", html)
+    year_guess = int(ym.group(0)) if ym else None
+    out = []
+    for m in LEGACY_PATTERN.finditer(html):
+        year = int(m.group("year")) if m.group("year") else year_guess
+        try:
+            start = datetime(year, int(m.group("month")), int(m.group("day")), int(m.group("sh")), int(m.group("sm")))
+        except ValueError:
+            continue
+        context_before = html[max(0, m.start() - 200):m.start()]
+        title = re.search(r"(Avoimet ovet|Tutustumisilta|Infoilta|Esittelyilta)[^.<\n]{0,80}",
+                          context_before, re.IGNORECASE)
+        out.append((title.group(0).strip() if title else "Avoimet ovet", start))
+    return out
+
+
+def make_page(n: int) -> str:
+    rows = []
+    for i in range(n):
+        rows.append(
+            f"<div class='card'><h3>{'Avoimet ovet' if i % 2 else 'Tutustumisilta'}</h3>"
+            f"<p>{'Lorem ipsum dolor sit amet ' * 10}</p>"
+            f"<p><strong>ti {1 + i % 28}.{1 + i % 12}.2026</strong> <span>klo {8 + i % 8}.00–{10 + i % 8}.30</span></p>"
+            f"<script>var x{i} = '{i % 28 + 1}.1.2026';</script></div>"
+        )
+    return "<html><body>" + "".join(rows) + "</body></html>"
+
+
+def _time(fn, html, repeat) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(html)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def run(sizes, repeat=3) -> list:
+    results = []
+    for n in sizes:
+        html = make_page(n)
+        legacy = _time(parse_vantaa_legacy, html, repeat)
+        scanned = _time(lambda h: parse_vantaa_lukio(h, "x", "u", "l", SETS["vantaa"]), html, repeat)
+        to_text = _time(html_to_text, html, repeat)
+        results.append({"events": n, "page_kb": len(html) // 1024, "legacy_s": legacy,
+                        "textscan_s": scanned, "html_to_text_s": to_text})
+    return results
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 5000])
+    ap.add_argument('--repeat', type=int, default=3)
+    args = ap.parse_args()
+
+    check_offsets()
+    check_pages()
+    print("pages OK")
+    for r in run(args.sizes, args.repeat):
+        print(f"{r['events']:>5} events ({r['page_kb']} kB)  legacy {r['legacy_s']:.3f}s  "
+              f"textscan {r['textscan_s']:.3f}s (html->text {r['html_to_text_s']:.3f}s)  "
+              f"x{r['legacy_s'] / r['textscan_s']:.2f}")
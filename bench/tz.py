@@ -0,0 +1,112 @@
+import argparse
+import random
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from src.main import ensure_datetime
+from src.tz import TransitionTable, normalize_batch
+from .fixtures import LOCAL_TZ
+
+# Aikavyöhykenormalisointi: eränä siirtymätaulukon avulla (src/tz.py) vs.
+# aiempi ensure_datetime jokaiselle alulle ja lopulle. Aineistossa on
+# naiiveja paikallisia aikoja, UTC-aikoja (ICS, JSON-LD) ja pelkkiä päiviä.
+#
+#   python -m bench.tz --sizes 10000 100000
+
+TABLE = TransitionTable(2025, 2032)
+
+# kesäaikasiirtymät 2026-10-25 ja 2027-03-28 (klo 03-04 paikallista aikaa)
+EDGES = [
+    (datetime(2026, 10, 25, 3, 30), datetime(2026, 10, 25, 3, 30, tzinfo=LOCAL_TZ), "ambiguous"),
+    (datetime(2026, 10, 25, 3, 30, fold=1), datetime(2026, 10, 25, 3, 30, tzinfo=LOCAL_TZ, fold=1), "ambiguous"),
+    (datetime(2026, 10, 25, 4, 0), datetime(2026, 10, 25, 4, 0, tzinfo=LOCAL_TZ), None),
+    (datetime(2027, 3, 28, 2, 59), datetime(2027, 3, 28, 2, 59, tzinfo=LOCAL_TZ), None),
+    (datetime(2027, 3, 28, 3, 0), datetime(2027, 3, 28, 4, 0, tzinfo=LOCAL_TZ), "nonexistent"),
+    (datetime(2027, 3, 28, 3, 30), datetime(2027, 3, 28, 4, 30, tzinfo=LOCAL_TZ), "nonexistent"),
+    (datetime(2027, 3, 28, 3, 30, fold=1), datetime(2027, 3, 28, 2, 30, tzinfo=LOCAL_TZ), "nonexistent"),
+    (datetime(2027, 3, 28, 4, 0), datetime(2027, 3, 28, 4, 0, tzinfo=LOCAL_TZ), None),
+    # taulukon ulkopuolella sama tulos ZoneInfon kautta
+    (datetime(2040, 3, 25, 3, 15), datetime(2040, 3, 25, 4, 15, tzinfo=LOCAL_TZ), "nonexistent"),
+    (datetime(2026, 10, 25, 0, 30, tzinfo=timezone.utc), datetime(2026, 10, 25, 3, 30, tzinfo=LOCAL_TZ), None),
+    (datetime(2026, 10, 25, 1, 30, tzinfo=timezone.utc),
+     datetime(2026, 10, 25, 3, 30, tzinfo=LOCAL_TZ, fold=1), None),
+    (date(2027, 3, 28), datetime(2027, 3, 28, 0, 0, tzinfo=LOCAL_TZ), None),
+]
+
+
+def make_values(n: int, seed: int = 1) -> list:
+    rnd = random.Random(seed)
+    base = datetime(2026, 8, 1, 8, 0)
+    out = []
+    for _ in range(n):
+        local = base + timedelta(days=rnd.randrange(0, 700), minutes=15 * rnd.randrange(0, 96))
+        if TABLE.lookup(local):
+            continue  # siirtymäreunat erikseen (EDGES)
+        r = rnd.random()
+        if r < 0.75:
+            out.append(local)
+        elif r < 0.95:
+            out.append(local.replace(tzinfo=LOCAL_TZ).astimezone(timezone.utc))
+        else:
+            out.append(local.date())
+    return out
+
+
+def per_event(values: list) -> list:
+    return [ensure_datetime(v) for v in values]
+
+
+def batched(values: list) -> list:
+    return normalize_batch(values, TABLE)[0]
+
+
+def _same(a: datetime, b: datetime) -> bool:
+    # saman vyöhykkeen vertailu ei katso foldia, joten myös poikkeama
+    return a == b and a.utcoffset() == b.utcoffset() and a.tzinfo is b.tzinfo
+
+
+def check_parity(values: list) -> None:
+    """Siirtymien ulkopuolella sama tulos kuin ensure_datetime; reunat odotetusti."""
+    out, report = normalize_batch(values, TABLE)
+    assert not report, report
+    for v, a, b in zip(values, out, per_event(values)):
+        assert _same(a, b), (v, a, b)
+
+    out, report = normalize_batch([v for v, _, _ in EDGES], TABLE)
+    flagged = {id(raw): "nonexistent" for raw, _ in report.nonexistent}
+    flagged.update({id(raw): "ambiguous" for raw, _ in report.ambiguous})
+    for (raw, expected, kind), got in zip(EDGES, out):
+        assert _same(got, expected), (raw, got, expected)
+        assert flagged.get(id(raw)) == kind, (raw, flagged.get(id(raw)), kind)
+
+
+def _best(fn, values, repeat) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(values)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def run(sizes, repeat=5) -> list:
+    results = []
+    for n in sizes:
+        values = make_values(n)
+        ref_s = _best(per_event, values, repeat)
+        new_s = _best(batched, values, repeat)
+        results.append({"values": n, "per_event_s": ref_s, "batch_s": new_s, "speedup": ref_s / new_s})
+    return results
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000])
+    ap.add_argument('--repeat', type=int, default=5)
+    args = ap.parse_args()
+
+    check_parity(make_values(20000, seed=7))
+    print("parity OK")
+    for r in run(args.sizes, args.repeat):
+        print(f"{r['values']:>7} values  per-event {r['per_event_s']:.4f}s  "
+              f"batch {r['batch_s']:.4f}s  x{r['speedup']:.2f}")
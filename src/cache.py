@@ -0,0 +1,187 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Optional
+
+# Levylle tallennettava HTTP-välimuisti (ETag / Last-Modified).
+# Välimuistihakemisto voi säilyä CI-ajojen välillä (actions/cache), jolloin
+# muuttumattomat sivut saadaan 304-vastauksella ilman koko sivun latausta.
+
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+CACHE_DIR_ENV = "OPENDOORS_CACHE_DIR"
+
+
+class CachedResponse:
+    """Pieni requests.Response-tyyppinen olio välimuistista palautetulle sisällölle."""
+
+    def __init__(self, url: str, content: bytes, encoding: Optional[str], from_cache: bool):
+        self.url = url
+        self.content = content
+        self.encoding = encoding
+        self.status_code = 200
+        self.from_cache = from_cache
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding or "utf-8", errors="replace")
+
+    def raise_for_status(self):
+        # Välimuistiin tallennetaan vain onnistuneita vastauksia
+        return None
+
+
+class ResponseCache:
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._index_path = os.path.join(cache_dir, "index.json")
+        try:
+            with open(self._index_path, "r", encoding="utf-8") as f:
+                self._index = json.load(f)
+        except (FileNotFoundError, ValueError):
+            self._index = {}
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+    def _body_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + ".body")
+
+    def lookup(self, url: str) -> Optional[dict]:
+        key = self._key(url)
+        with self._lock:
+            entry = self._index.get(key)
+        if not entry or not os.path.exists(self._body_path(key)):
+            return None
+        return entry
+
+    def conditional_headers(self, entry: dict) -> dict:
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def load(self, url: str) -> Optional[CachedResponse]:
+        key = self._key(url)
+        try:
+            with open(self._body_path(key), "rb") as f:
+                content = f.read()
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None:
+                return None
+            entry["used"] = time.time()
+            self.hits += 1
+            self._save()
+        return CachedResponse(url, content, entry.get("encoding"), from_cache=True)
+
+    def store(self, url: str, resp, body_path: Optional[str] = None) -> None:
+        """
+        Tallentaa vastauksen. Striimatun vastauksen runko on jo kirjoitettu
+        tiedostoon `body_path` (ks. staging_file), joka siirretään paikalleen.
+        """
+        etag = resp.headers.get("ETag")
+        last_modified = resp.headers.get("Last-Modified")
+        with self._lock:
+            self.misses += 1
+        key = self._key(url)
+        if not etag and not last_modified:
+            # Ilman validaattoreita ehdollinen pyyntö ei ole mahdollinen. Vanha
+            # merkintä poistetaan, ettei sen validaattoreilla saada 304:ää ja
+            # vanhentunutta sisältöä.
+            self._forget(key)
+            if body_path is not None:
+                os.remove(body_path)
+            return
+        if body_path is None:
+            body_path = self._body_path(key) + ".tmp"
+            with open(body_path, "wb") as f:
+                f.write(resp.content)
+            encoding = resp.encoding or resp.apparent_encoding
+        else:
+            # apparent_encoding lukisi rungon uudestaan; striimatulla se on jo kulutettu
+            encoding = resp.encoding
+        os.replace(body_path, self._body_path(key))
+        size = os.path.getsize(self._body_path(key))
+        with self._lock:
+            self._index[key] = {
+                "url": url,
+                "etag": etag,
+                "last_modified": last_modified,
+                "encoding": encoding,
+                "size": size,
+                "used": time.time(),
+            }
+            self._evict()
+            self._save()
+
+    def staging_file(self):
+        """Väliaikainen tiedosto striimattavalle rungolle samassa hakemistossa (os.replace)."""
+        fd, path = tempfile.mkstemp(dir=self.cache_dir, suffix=".part")
+        return os.fdopen(fd, "wb"), path
+
+    def _forget(self, key: str) -> None:
+        with self._lock:
+            if self._index.pop(key, None) is not None:
+                self._save()
+        try:
+            os.remove(self._body_path(key))
+        except FileNotFoundError:
+            pass
+
+    def _evict(self):
+        # LRU: poistetaan vanhimmin käytetyt kunnes koko mahtuu rajaan
+        total = sum(e["size"] for e in self._index.values())
+        if total <= self.max_bytes:
+            return
+        for key, entry in sorted(self._index.items(), key=lambda kv: kv[1]["used"]):
+            if total <= self.max_bytes:
+                break
+            total -= entry["size"]
+            del self._index[key]
+            try:
+                os.remove(self._body_path(key))
+            except FileNotFoundError:
+                pass
+
+    def _save(self):
+        tmp = self._index_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._index, f, ensure_ascii=False, sort_keys=True)
+        os.replace(tmp, self._index_path)
+
+
+_cache: Optional[ResponseCache] = None
+_cache_dir: Optional[str] = None
+
+
+def configure(cache_dir: Optional[str], max_bytes: int = DEFAULT_MAX_BYTES) -> Optional[ResponseCache]:
+    """
+    Ottaa välimuistin käyttöön (tai pois, jos cache_dir on tyhjä).
+    HTTP-vastaukset menevät alihakemistoon `http/`; muut välimuistit
+    (esim. manuaalidatan snapshotit) käyttävät omia alihakemistojaan.
+    """
+    global _cache, _cache_dir
+    _cache_dir = cache_dir or None
+    _cache = ResponseCache(os.path.join(cache_dir, "http"), max_bytes) if cache_dir else None
+    return _cache
+
+
+def get_cache_dir() -> Optional[str]:
+    return _cache_dir
+
+
+def get_cache() -> Optional[ResponseCache]:
+    return _cache
@@ -0,0 +1,241 @@
+import io
+import os
+import threading
+import time
+from typing import BinaryIO, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from . import cache, metrics, recording
+
+# Yhteinen HTTP-asiakas kaikille kerääjille: yhteyksien uudelleenkäyttö
+# (keep-alive), uudelleenyritykset ja isäntäkohtainen rinnakkaisuusraja.
+
+USER_AGENT = "OpenDoorsBot/1.0 (+contact@example.com)"
+# Osa kuntien sivuista ei vastaa bottien User-Agentille
+BROWSER_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/123.0 Safari/537.36"
+)
+
+DEFAULT_PER_HOST = 4
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+DEFAULT_BACKOFF_JITTER = 0.5
+RETRY_STATUSES = (500, 502, 503, 504)
+STREAM_BUFFER = 64 * 1024
+
+_lock = threading.Lock()
+_session: Optional[requests.Session] = None
+_per_host = DEFAULT_PER_HOST
+_retries = DEFAULT_RETRIES
+_host_slots = {}
+# Saman buildin aikana samaa sivua ei haeta kahdesti (esim. inkrementaalisen
+# buildin sormenjälki + varsinainen kerääjä)
+_memo = {}
+
+
+def configure(per_host: int = DEFAULT_PER_HOST, retries: int = DEFAULT_RETRIES) -> None:
+    """Asettaa isäntäkohtaisen yhteysrajan ja uudelleenyritysten määrän."""
+    global _session, _per_host, _retries
+    with _lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+        _per_host = max(1, per_host)
+        _retries = retries
+        _host_slots.clear()
+        _memo.clear()
+
+
+def clear_memo() -> None:
+    with _lock:
+        _memo.clear()
+
+
+def _make_session() -> requests.Session:
+    retry = Retry(
+        total=_retries,
+        connect=_retries,
+        read=_retries,
+        status=_retries,
+        status_forcelist=RETRY_STATUSES,
+        backoff_factor=DEFAULT_BACKOFF,
+        backoff_jitter=DEFAULT_BACKOFF_JITTER,
+        raise_on_status=False,
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=_per_host, max_retries=retry)
+    s = requests.Session()
+    s.headers["User-Agent"] = USER_AGENT
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
+    return s
+
+
+def session() -> requests.Session:
+    global _session
+    with _lock:
+        if _session is None:
+            _session = _make_session()
+        return _session
+
+
+def _host_slot(url: str) -> threading.BoundedSemaphore:
+    host = urlsplit(url).netloc.lower()
+    with _lock:
+        slot = _host_slots.get(host)
+        if slot is None:
+            slot = _host_slots[host] = threading.BoundedSemaphore(_per_host)
+        return slot
+
+
+def _get(url: str, headers: Optional[dict], timeout: float, stream: bool = False):
+    s = session()
+    with _host_slot(url):
+        return s.get(url, timeout=timeout, headers=headers, stream=stream)
+
+
+class _StreamBody(io.RawIOBase):
+    """
+    Striimatun vastauksen runko tiedostona. Luetut tavut kopioidaan
+    välimuistin ja nauhan väliaikaisiin tiedostoihin, jotka siirretään
+    paikalleen vasta, kun runko on luettu loppuun.
+    """
+
+    def __init__(self, r, sinks):
+        super().__init__()
+        r.raw.decode_content = True  # gzip/deflate puretaan kuten r.content
+        self._r = r
+        self._sinks = sinks  # [(staging_file, commit(path))]
+        self._files = None
+        self._bytes = 0
+        self._finished = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        if self._files is None:
+            self._files = [staging() for staging, _commit in self._sinks]
+        n = self._r.raw.readinto(b)
+        if n:
+            self._bytes += n
+            for f, _path in self._files:
+                f.write(memoryview(b)[:n])
+        else:
+            self._finish(complete=True)
+        return n
+
+    def _finish(self, complete: bool) -> None:
+        if self._finished:
+            return
+        self._finished = True
+        self._r.close()
+        metrics.count_bytes(self._bytes)
+        for (f, path), (_staging, commit) in zip(self._files or (), self._sinks):
+            f.close()
+            if complete:
+                commit(path)
+            else:
+                # kesken jäänyttä runkoa ei tallenneta
+                os.remove(path)
+
+    def close(self) -> None:
+        if not self.closed:
+            self._finish(complete=False)
+        super().close()
+
+
+def _stream_sinks(url: str, headers: Optional[dict], r, tape) -> list:
+    sinks = []
+    http_cache = cache.get_cache()
+    if http_cache is not None:
+        sinks.append((http_cache.staging_file, lambda path: http_cache.store(url, r, body_path=path)))
+    if tape is not None:
+        sinks.append((tape.staging_file, lambda path: tape.save(url, headers, r, body_path=path)))
+    return sinks
+
+
+def open_body(r) -> BinaryIO:
+    """
+    Vastauksen runko binääritiedostona. fetch(stream=True):n verkosta
+    hakema runko luetaan sitä mukaa kuin se saapuu; muistetut, välimuistista
+    ja nauhalta tulleet vastaukset luetaan muistista samalla rajapinnalla.
+    """
+    body = getattr(r, "_stream_body", None)
+    if body is not None:
+        return body
+    return io.BytesIO(r.content)
+
+
+def fetch(url: str, headers: Optional[dict] = None, timeout: float = 30, stream: bool = False):
+    """
+    GET-pyyntö jaetun sessionin kautta. Jos HTTP-välimuisti on päällä,
+    lähetetään ehdolliset otsakkeet ja 304-vastauksella palautetaan
+    välimuistissa oleva sisältö. Saman buildin aikana vastaus muistetaan
+    (ks. clear_memo). --record/--replay: ks. recording.py.
+
+    stream=True: verkosta haettua runkoa ei ladata muistiin, vaan se luetaan
+    open_body(r):llä. Välimuistiin ja nauhalle runko tallennetaan, kun se on
+    luettu loppuun; striimattua vastausta ei muisteta.
+    """
+    memo_key = (url, (headers or {}).get("User-Agent"))
+    with _lock:
+        memoized = _memo.get(memo_key)
+    if memoized is not None:
+        metrics.record_fetch(0.0, memoized, memo=True)
+        return memoized
+    t0 = time.perf_counter()
+    r = None
+    streamed = False
+    tape = recording.get_tape()
+    try:
+        if tape is not None and tape.replay:
+            r = tape.load(url, headers)
+        else:
+            r = _fetch(url, headers, timeout, stream)
+            # 304:llä välimuistista tullut vastaus on jo muistissa
+            streamed = stream and isinstance(r, requests.Response)
+            if streamed:
+                r._stream_body = io.BufferedReader(
+                    _StreamBody(r, _stream_sinks(url, headers, r, tape)), STREAM_BUFFER)
+            elif tape is not None:
+                tape.save(url, headers, r)
+    finally:
+        metrics.record_fetch(time.perf_counter() - t0, r, streamed=streamed)
+    if not streamed:
+        with _lock:
+            _memo[memo_key] = r
+    return r
+
+
+def _fetch(url: str, headers: Optional[dict], timeout: float, stream: bool = False):
+    http_cache = cache.get_cache()
+    if http_cache is None:
+        return _get(url, headers, timeout, stream)
+
+    req_headers = dict(headers or {})
+    entry = http_cache.lookup(url)
+    if entry:
+        req_headers.update(http_cache.conditional_headers(entry))
+
+    r = _get(url, req_headers, timeout, stream)
+    if r.status_code == 304 and entry:
+        cached = http_cache.load(url)
+        if cached is not None:
+            r.close()
+            return cached
+        # Runko kadonnut välissä -> haetaan kokonaan uudestaan
+        r.close()
+        r = _get(url, headers, timeout, stream)
+    if not r.ok:
+        r.close()
+    r.raise_for_status()
+    if not stream:
+        http_cache.store(url, r)  # striimattu tallennetaan rungon luvun jälkeen (_StreamBody)
+    return r
@@ -1,150 +1,77 @@
-import requests
-import re
 from datetime import datetime, timezone
+from typing import Optional
+from .. import metrics
+from ..client import fetch
 from ..model import Event
+from ..window import BuildWindow
+from .textscan import PatternSet, scan
 
-HEADERS = {'User-Agent': 'OpenDoorsBot/1.0 (+contact@example.com)'}
-
-# Lista lukioista, joita halutaan seurata.
-# Lisää tänne kaikki Helsingin lukiot, joilla on vastaava "Tutustu ja hae" / avoimet ovet -sivu.
-LUKIOT = [
-    {
-        "name": "Alppilan lukio",
-        "url": "https://www.hel.fi/fi/kasvatus-ja-koulutus/alppilan-lukio/tutustu-ja-hae",
-        "location": "Alppilan lukio, Viipurinkatu 21, Helsinki"
-    },
-    {
-        "name": "Kallion lukio",
-        "url": "https://www.hel.fi/fi/kasvatus-ja-koulutus/kallion-lukio/tutustu-ja-hae",
-        "location": "Kallion lukio, Helsinki"
-    },
-    {
-        "name": "Ressun lukio",
-        "url": "https://www.hel.fi/fi/kasvatus-ja-koulutus/ressun-lukio/tutustu-ja-hae/nain-haet",
-        "location": "Ressun lukio, Helsinki"
-    },
-    {
-        "name": "Mäkelänrinteen lukio",
-        "url": "https://www.hel.fi/fi/kasvatus-ja-koulutus/makelanrinteen-lukio/tutustu-ja-hae/makelanrinteen-lukion-esittelyt-kevaalla-2026",
-        "location": "Mäkelänrinteen lukio, Helsinki"
-    },
-    {
-        "name": "Etu-Töölön lukio",
-        "url": "https://www.hel.fi/fi/kasvatus-ja-koulutus/etu-toolon-lukio/tutustu-tylyyn",
-        "location": "Etu-Töölön lukio, Helsinki"
-    },
-    {
-        "name": "Helsingin luonnontiedelukio",
-        "url": "https://www.hel.fi/fi/kasvatus-ja-koulutus/helsingin-luonnontiedelukio/tutustu-ja-hae",
-        "location": "Helsingin luonnontiedelukio, Helsinki"
-    },
-    {
-        "name": "Helsingin medialukio",
-        "url": "https://www.hel.fi/fi/kasvatus-ja-koulutus/helsingin-medialukio/tutustu-ja-hae",
-        "location": "Helsingin medialukio, Helsinki"
-    },
-
-    {
-        "name": "SYK",
-        "url": "https://syk.fi/lukio/hakeminen/",
-        "location": "Suomalais-venäläinen koulu / SYK, Helsinki"
-    },
-    {
-        "name": "Helsingin kielilukio",
-        "url": "https://www.hel.fi/fi/kasvatus-ja-koulutus/helsingin-kielilukion-esittelytilaisuudet-9-luokkalaisille-seka-huoltajille-alkavat-marraskuussa",
-        "location": "Helsingin kielilukio, Helsinki"
-    },
-     {
-        "name": "Konepajan lukio",
-        "url": "https://www.hel.fi/fi/kasvatus-ja-koulutus/konepajan-lukio/tutustu-konepajan-lukioon",
-        "location": "Konepajan lukio, Helsinki"
-    },
-     {
-        "name": "Viikin normaalikoulun lukio",
-        "url": "https://www.helsinki.fi/fi/harjoittelukoulut/viikin-normaalikoulu/opetus/lukio/opiskelijaksi-viikin-normaalikoulun-lukioon",
-        "location": "Viikin normaalikoulun lukio, Helsinki"
-    },
-    # Lisää tähän loput lukioista samalla kaavalla
-]
-
-
-# regex:
+# Seurattavat lukiot määritellään sources.yaml:ssa (type: helfi_regex),
+# yksi lähde per "Tutustu ja hae" / avoimet ovet -sivu. Kuviot ovat
+# patterns.yaml:n joukossa "helfi":
 #   ke 14.1.2026 klo 10.30–12.00
 #   ti 27.1.2026 klo 19.00–21.00 on lisäksi avoimien ovien tilaisuus huoltajille
-PATTERN = re.compile(
-    r"(?P<weekday>ma|ti|ke|to|pe|la|su)\s+"
-    r"(?P<day>\d{1,2})\.(?P<month>\d{1,2})(?:\.(?P<year>20\d{2}))?\s+"
-    r"klo\s+"
-    r"(?P<start_h>\d{1,2})[.:](?P<start_m>\d{2})"
-    r"\s*[-–]\s*"
-    r"(?P<end_h>\d{1,2})[.:](?P<end_m>\d{2})"
-    r"(?P<extra>[^<\n]*)",
-    re.IGNORECASE
-)
 
-# Etsitään ensin mikä vuosi on kyseessä, esim. "Avoimet ovet 2026"
-YEAR_FALLBACK = re.compile(r"Avoimet\s+ovet\s+(20\d{2})", re.IGNORECASE)
 
 def _ensure_datetime(y, month, day, hour, minute):
     # Rakentaa timezone-naive datetimein paikalliseen aikaan (Helsinki),
     # UTC-annotointi tehdään myöhemmin main.py:ssä ensure_datetime-funktiossa.
     return datetime(y, month, day, hour, minute)
 
-def fetch_all_helfi_lukio() -> list[Event]:
-    events = []
-
-    for school in LUKIOT:
-        name = school["name"]
-        url = school["url"]
-        location = school["location"]
 
-        try:
-            r = requests.get(url, timeout=30, headers=HEADERS)
-            r.raise_for_status()
-            html = r.text
-        except Exception as e:
-            print(f"[WARN] Failed to load {name} ({url}): {e}")
-            continue
+def fetch_helfi_lukio(name: str, url: str, location: str, patterns: PatternSet,
+                      window: Optional[BuildWindow] = None) -> list[Event]:
+    """
+    Kaivaa yhden lukion sivulta "ke 14.1.2026 klo 10.30–12.00" -muotoiset ajat.
+    Latausvirhe nostetaan kutsujalle (orkestroija tulostaa [WARN]).
+    """
+    r = fetch(url, timeout=30)
+    r.raise_for_status()
+    return parse_helfi_lukio(r.text, name, url, location, patterns, window)
 
-        # Arvaa vuosi "Avoimet ovet 2026" -osiosta
-        m_year = YEAR_FALLBACK.search(html)
-        if m_year:
-            default_year = int(m_year.group(1))
-        else:
-            default_year = datetime.now(timezone.utc).year
 
-        # Etsi kaikki ottelut
-        for m in PATTERN.finditer(html):
-            day = int(m.group("day"))
-            month = int(m.group("month"))
-            year = int(m.group("year")) if m.group("year") else default_year
-
-            sh = int(m.group("start_h"))
-            sm = int(m.group("start_m"))
-            eh = int(m.group("end_h"))
-            em = int(m.group("end_m"))
+def parse_helfi_lukio(html: str, name: str, url: str, location: str, patterns: PatternSet,
+                      window: Optional[BuildWindow] = None) -> list[Event]:
+    events = []
+    page = scan(html, patterns)
 
-            extra = (m.group("extra") or "").strip()
+    # Arvaa vuosi esim. "Avoimet ovet 2026" -osiosta
+    default_year = page.default_year() or datetime.now(timezone.utc).year
 
-            # Esim "Avoimet ovet (huoltajille)" jos tekstissä mainitaan huoltajista
-            title = f"Avoimet ovet – {name}"
-            if "huoltaj" in extra.lower():
-                title = f"Avoimet ovet (huoltajille) – {name}"
+    pruned = 0
+    for dm, tm in page.pairs():
+        if tm is None:
+            continue
+        year = int(dm.group("year")) if dm.group("year") else default_year
+        if window and not window.admits(year, int(dm.group("month")), int(dm.group("day")),
+                                        int(tm.group("sh")), int(tm.group("sm"))):
+            pruned += 1
+            continue
 
-            start_dt_local = _ensure_datetime(year, month, day, sh, sm)
-            end_dt_local = _ensure_datetime(year, month, day, eh, em)
+        # Esim "Avoimet ovet (huoltajille)" jos tekstissä mainitaan huoltajista
+        title = f"Avoimet ovet – {name}"
+        if "huoltaj" in page.line_after(tm).lower():
+            title = f"Avoimet ovet (huoltajille) – {name}"
 
-            events.append(Event(
-                title=title,
-                start=start_dt_local,
-                end=end_dt_local,
-                location=location,
-                url=url,
-                organizer=name,
-                source_url=url
-            ))
+        try:
+            start_dt_local = _ensure_datetime(year, int(dm.group("month")), int(dm.group("day")),
+                                              int(tm.group("sh")), int(tm.group("sm")))
+            end_dt_local = _ensure_datetime(year, int(dm.group("month")), int(dm.group("day")),
+                                            int(tm.group("eh")), int(tm.group("em")))
+        except ValueError:
+            print(f"[WARN] {name}: invalid date '{dm.group()} {tm.group()}' "
+                  f"at offset {page.page.html_offset(dm.start())}")
+            continue
 
+        events.append(Event(
+            title=title,
+            start=start_dt_local,
+            end=end_dt_local,
+            location=location,
+            url=url,
+            organizer=name,
+            source_url=url
+        ))
+
+    metrics.count_pruned(pruned)
     return events
-
-        
-        
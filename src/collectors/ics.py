@@ -1,25 +1,278 @@
+import re
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
-import requests
-from icalendar import Calendar
-from datetime import datetime
-from typing import List
+from dateutil.rrule import rrulestr
+
+from .. import metrics
+from ..client import fetch, open_body
 from ..model import Event
+from ..window import BuildWindow
+
+# ICS-syötteet luetaan rivi kerrallaan: jokaisesta VEVENTistä kerätään vain
+# raakarivit, ja aikaikkunan ulkopuoliset hylätään ennen kuin tekstiä
+# puretaan tai Event-olioita luodaan. Toistuvat tapahtumat (RRULE/RDATE,
+# EXDATE, RECURRENCE-ID) avataan vain ikkunan sisältä ja enintään
+# MAX_OCCURRENCES kertaa, joten vuosia vanhat julkiset Google-kalenterit
+# pysyvät halpoina.
+
+LOCAL_TZ = ZoneInfo("Europe/Helsinki")
+
+# Toistuvia tapahtumia avataan enintään näin pitkälle, jos ikkunalla ei ole loppua
+DEFAULT_HORIZON = timedelta(days=365)
+# inkrementaalinen build: loputtoman ikkunan tulos kattaa vain since + horizon
+WINDOW_HORIZON = DEFAULT_HORIZON
+MAX_OCCURRENCES = 500
+
+_UNTIL_Z = re.compile(r"(UNTIL=\d{8}(?:T\d{6})?)Z")
+_zones: Dict[str, Optional[ZoneInfo]] = {}
+
+
+def _unfold(lines: Iterable[bytes]) -> Iterator[str]:
+    """RFC 5545 3.1: välilyönnillä tai tabilla alkava rivi jatkaa edellistä."""
+    current = None
+    for raw in lines:
+        line = raw.rstrip(b"\r\n")
+        if line[:1] in (b" ", b"\t"):
+            if current is not None:
+                current += line[1:]
+            continue
+        if current is not None:
+            yield current.decode("utf-8", errors="replace")
+        current = line
+    if current:
+        yield current.decode("utf-8", errors="replace")
+
+
+def _split_property(line: str) -> Tuple[str, Dict[str, str], str]:
+    # NIMI;PARAM=arvo;PARAM="a:b":ARVO — kaksoispiste voi olla lainausmerkeissä
+    quoted = False
+    for i, ch in enumerate(line):
+        if ch == '"':
+            quoted = not quoted
+        elif ch == ":" and not quoted:
+            head, value = line[:i], line[i + 1:]
+            break
+    else:
+        return line.upper(), {}, ""
+    name, *params = head.split(";")
+    parsed = {}
+    for p in params:
+        key, _, val = p.partition("=")
+        parsed[key.upper()] = val.strip('"')
+    return name.upper(), parsed, value
+
+
+def iter_vevents(lines: Iterable[bytes]) -> Iterator[Dict[str, list]]:
+    """
+    Tuottaa jokaisen VEVENTin ominaisuudet muodossa {NIMI: [(params, arvo), ...]}.
+    Sisäkkäiset komponentit (VALARM) ohitetaan.
+    """
+    props = None
+    depth = 0
+    for line in _unfold(lines):
+        if line.startswith("BEGIN:"):
+            if props is None:
+                if line[6:].strip().upper() == "VEVENT":
+                    props, depth = {}, 0
+            else:
+                depth += 1
+            continue
+        if line.startswith("END:") and props is not None:
+            if depth:
+                depth -= 1
+            else:
+                yield props
+                props = None
+            continue
+        if props is None or depth:
+            continue
+        name, params, value = _split_property(line)
+        props.setdefault(name, []).append((params, value))
+
+
+def _zone(tzid: str) -> Optional[ZoneInfo]:
+    if tzid not in _zones:
+        try:
+            _zones[tzid] = ZoneInfo(tzid.lstrip("/"))
+        except (ZoneInfoNotFoundError, ValueError):
+            print(f"[WARN] ICS: unknown TZID {tzid!r}, using floating time")
+            _zones[tzid] = None
+    return _zones[tzid]
+
+
+def parse_dt(params: Dict[str, str], value: str):
+    """DATE, kelluva paikallinen aika, UTC (Z) tai TZID-aika."""
+    value = value.strip()
+    if params.get("VALUE") == "DATE" or len(value) == 8:
+        return date(int(value[:4]), int(value[4:6]), int(value[6:8]))
+    dt = datetime(
+        int(value[:4]), int(value[4:6]), int(value[6:8]),
+        int(value[9:11]), int(value[11:13]), int(value[13:15] or 0),
+    )
+    if value.endswith("Z"):
+        return dt.replace(tzinfo=timezone.utc)
+    tzid = params.get("TZID")
+    if tzid:
+        tz = _zone(tzid)
+        if tz is not None:
+            return dt.replace(tzinfo=tz)
+    return dt
+
+
+def _instant(value) -> datetime:
+    # vertailuarvo: date ja kelluva aika tulkitaan Helsingin ajaksi
+    if not isinstance(value, datetime):
+        return datetime(value.year, value.month, value.day, tzinfo=LOCAL_TZ)
+    if value.tzinfo is None:
+        return value.replace(tzinfo=LOCAL_TZ)
+    return value
+
 
-HEADERS = {'User-Agent': 'OpenDoorsBot/1.0 (+contact@example.com)'}
+def unescape_text(value: str) -> str:
+    out = []
+    i = 0
+    while True:
+        j = value.find("\\", i)
+        if j < 0 or j == len(value) - 1:
+            out.append(value[i:])
+            return "".join(out)
+        out.append(value[i:j])
+        nxt = value[j + 1]
+        out.append("\n" if nxt in "nN" else nxt)
+        i = j + 2
 
-def fetch_ics(url: str, source_name: str = None) -> List[Event]:
-    r = requests.get(url, timeout=30, headers=HEADERS)
-    r.raise_for_status()
-    cal = Calendar.from_ical(r.content)
+
+def _text(props, name) -> Optional[str]:
+    values = props.get(name)
+    return unescape_text(values[0][1]) if values else None
+
+
+def _dates(props, name) -> list:
+    out = []
+    for params, value in props.get(name, ()):
+        out.extend(parse_dt(params, v) for v in value.split(",") if v.strip())
+    return out
+
+
+def _occurrences(props, start, since: datetime, until: datetime) -> list:
+    """RRULE + RDATE - EXDATE puoliavoimella välillä [since, until), enintään MAX_OCCURRENCES."""
+    is_date = not isinstance(start, datetime)
+    dtstart = datetime(start.year, start.month, start.day) if is_date else start
+    aware = dtstart.tzinfo is not None
+
+    def local(dt):
+        # rrule vertaa samanlaisia aikoja: aware <-> aware, naiivi <-> naiivi
+        return dt.astimezone(dtstart.tzinfo) if aware else dt.astimezone(LOCAL_TZ).replace(tzinfo=None)
+
+    lo, hi = local(since), local(until)
+    found = []
+    for _params, rule in props.get("RRULE", ()):
+        if not aware:
+            rule = _UNTIL_Z.sub(r"\1", rule)
+        try:
+            rr = rrulestr(rule, dtstart=dtstart)
+        except (ValueError, TypeError) as e:
+            print(f"[WARN] ICS: bad RRULE {rule!r} ({e}), using first occurrence only")
+            found.append(dtstart)
+            continue
+        for occ in rr.xafter(lo, count=MAX_OCCURRENCES, inc=True):
+            if occ >= hi:
+                break
+            found.append(occ)
+    for extra in _dates(props, "RDATE"):
+        found.append(datetime(extra.year, extra.month, extra.day) if not isinstance(extra, datetime) else extra)
+
+    excluded = {_instant(x) for x in _dates(props, "EXDATE")}
+    out = []
+    seen = set()
+    for occ in sorted(found, key=_instant):
+        key = _instant(occ)
+        if key in excluded or key in seen or not (since <= key < until):
+            continue
+        seen.add(key)
+        out.append(occ.date() if is_date else occ)
+        if len(out) >= MAX_OCCURRENCES:
+            break
+    return out
+
+
+def parse_ics(
+    lines: Iterable[bytes],
+    source_name: str = None,
+    source_url: str = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    horizon: timedelta = DEFAULT_HORIZON,
+) -> List[Event]:
+    """
+    Jäsentää ICS-rivit Eventeiksi. Tapahtumat, jotka alkavat ennen `since`
+    tai `until`-hetkellä tai sen jälkeen, ohitetaan (BuildWindow on
+    puoliavoin). Toistuvat avataan välille [since, until), tai jos `until`
+    puuttuu, `horizon`:n päähän.
+    """
+    rec_since = since or datetime.now(LOCAL_TZ)
+    rec_until = until or rec_since + horizon
     out: List[Event] = []
-    for comp in cal.walk('VEVENT'):
-        start = comp.get('DTSTART').dt
-        end = comp.get('DTEND').dt if comp.get('DTEND') else None
-        title = str(comp.get('SUMMARY'))
-        loc = str(comp.get('LOCATION') or '') or None
-        link = str(comp.get('URL') or '') or None
-        out.append(Event(
-            title=title, start=start, end=end, location=loc,
-            url=link, organizer=source_name, source_url=url
-        ))
+    occurrences: List[Tuple[str, datetime, Event]] = []
+    overridden = set()
+    pruned = 0
+
+    for props in iter_vevents(lines):
+        if "DTSTART" not in props:
+            continue
+        start = parse_dt(*props["DTSTART"][0])
+        uid = _text(props, "UID")
+        if "RECURRENCE-ID" in props:
+            # yksittäisen toistokerran korvaava (tai peruva) versio
+            overridden.add((uid, _instant(parse_dt(*props["RECURRENCE-ID"][0]))))
+        status = props.get("STATUS")
+        if status and status[0][1].strip().upper() == "CANCELLED":
+            continue
+
+        recurring = "RRULE" in props or "RDATE" in props
+        if not recurring:
+            key = _instant(start)
+            if (since and key < since) or (until and key >= until):
+                pruned += 1
+                continue
+            starts = [start]
+        else:
+            starts = _occurrences(props, start, rec_since, rec_until)
+            if not starts:
+                pruned += 1
+                continue
+
+        end = parse_dt(*props["DTEND"][0]) if "DTEND" in props else None
+        duration = end - start if end is not None else None
+        title = _text(props, "SUMMARY") or ""
+        loc = _text(props, "LOCATION") or None
+        link = (props["URL"][0][1].strip() or None) if "URL" in props else None
+        for occ in starts:
+            e = Event(
+                title=title, start=occ, end=occ + duration if duration is not None else None,
+                location=loc, url=link, organizer=source_name, source_url=source_url,
+            )
+            if recurring:
+                occurrences.append((uid, _instant(occ), e))
+            else:
+                out.append(e)
+
+    out.extend(e for uid, key, e in occurrences if (uid, key) not in overridden)
+    metrics.count_pruned(pruned)
     return out
+
+
+def fetch_ics(
+    url: str,
+    source_name: str = None,
+    window: Optional[BuildWindow] = None,
+) -> List[Event]:
+    # Runko jäsennetään sitä mukaa kuin se saapuu; välimuistista/nauhalta
+    # tuleva vastaus luetaan samalla rajapinnalla (ks. client.open_body)
+    r = fetch(url, timeout=30, stream=True)
+    window = window or BuildWindow()
+    with open_body(r) as body:
+        r.raise_for_status()
+        return parse_ics(body, source_name, url, since=window.since, until=window.until)
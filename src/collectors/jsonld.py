@@ -1,59 +1,109 @@
-
-import requests, json
-from bs4 import BeautifulSoup
+import json
+import re
+from datetime import datetime
 from dateutil import parser as dtparser
-from typing import List
+from typing import Iterator, List, Optional
+from .. import metrics
+from ..client import fetch
 from ..model import Event
+from ..window import BuildWindow
+
+# JSON-LD-lohkot poimitaan suoraan HTML:stä säännöllisellä lausekkeella
+# rakentamatta DOM-puuta. <script>-elementin sisältö on HTML:ssä raakatekstiä
+# (ei entiteettejä eikä sisäkkäisiä tageja), joten ensimmäinen </script>
+# päättää lohkon aina.
+
+_SCRIPT = re.compile(
+    r"<script\b[^>]*?\btype\s*=\s*([\"']?)\s*application/ld\+json\s*\1[^>]*>(.*?)</script\s*>",
+    re.IGNORECASE | re.DOTALL,
+)
+# jotkin CMS:t käärivät sisällön <!-- --> tai CDATA-merkintöihin
+_WRAPPER = re.compile(r"^\s*(?:<!--|//\s*<!\[CDATA\[|<!\[CDATA\[)|(?:-->|//\s*\]\]>|\]\]>)\s*$")
 
-HEADERS = {'User-Agent': 'OpenDoorsBot/1.0 (+contact@example.com)'}
 
-def _iter_jsonld(html: str):
-    soup = BeautifulSoup(html, 'html.parser')
-    for s in soup.find_all('script', attrs={'type':'application/ld+json'}):
-        if not s.string:
+def _iter_jsonld(html: str) -> Iterator[dict]:
+    for m in _SCRIPT.finditer(html):
+        body = _WRAPPER.sub("", m.group(2)).strip()
+        if not body:
             continue
         try:
-            data = json.loads(s.string)
-        except Exception:
+            data = json.loads(body)
+        except ValueError:
             continue
-        if isinstance(data, list):
-            for d in data:
-                yield d
-        else:
-            yield data
-
-def fetch_jsonld_events(url: str, source_name: str = None) -> List[Event]:
-    r = requests.get(url, timeout=30, headers=HEADERS)
-    r.raise_for_status()
+        yield from _walk(data)
+
+
+def _is_event(node: dict) -> bool:
+    # Event tai sen schema.org-alatyyppi (EducationEvent, SocialEvent, ...)
+    t = node.get('@type')
+    types = t if isinstance(t, list) else [t]
+    return any(isinstance(x, str) and x.rsplit('/', 1)[-1].endswith('Event') for x in types)
+
+
+def _walk(data) -> Iterator[dict]:
+    """Tapahtumasolmut listoista, @graph-säiliöistä ja subEvent-rakenteista."""
+    if isinstance(data, list):
+        for d in data:
+            yield from _walk(d)
+        return
+    if not isinstance(data, dict):
+        return
+    if '@graph' in data:
+        yield from _walk(data['@graph'])
+    if _is_event(data):
+        yield data
+        sub = data.get('subEvent') or data.get('subEvents')
+        if sub:
+            yield from _walk(sub)
+
+
+def parse_date(value: str) -> datetime:
+    """ISO 8601 nopeasti, muut muodot dateutililla."""
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return dtparser.parse(value)
+
+
+def _location(loc_node) -> Optional[str]:
+    # location can be string or object (or a list of them)
+    if isinstance(loc_node, list):
+        loc_node = loc_node[0] if loc_node else None
+    if isinstance(loc_node, dict):
+        return loc_node.get('name') or (loc_node.get('address') if isinstance(loc_node.get('address'), str) else None)
+    if isinstance(loc_node, str):
+        return loc_node
+    return None
+
+
+def parse_jsonld_events(html: str, url: str, source_name: str = None,
+                        window: Optional[BuildWindow] = None) -> List[Event]:
     out: List[Event] = []
-    for node in _iter_jsonld(r.text):
-        t = node.get('@type')
-        if isinstance(t, list):
-            is_event = 'Event' in t
-        else:
-            is_event = (t == 'Event')
-        if not is_event:
-            continue
+    pruned = 0
+    for node in _iter_jsonld(html):
         name = node.get('name') or node.get('headline')
         start = node.get('startDate')
         end = node.get('endDate')
-        if not name or not start:
+        if not name or not start or not isinstance(start, str):
             continue
         try:
-            start_dt = dtparser.parse(start)
-            end_dt = dtparser.parse(end) if end else None
-        except Exception:
+            start_dt = parse_date(start)
+            if window and not window.contains(start_dt):
+                pruned += 1
+                continue
+            end_dt = parse_date(end) if isinstance(end, str) and end else None
+        except (ValueError, OverflowError):
             continue
-        # location can be string or object
-        loc = None
-        loc_node = node.get('location')
-        if isinstance(loc_node, dict):
-            loc = loc_node.get('name') or (loc_node.get('address') if isinstance(loc_node.get('address'), str) else None)
-        elif isinstance(loc_node, str):
-            loc = loc_node
         event_url = node.get('url') or url
         out.append(Event(
-            title=name, start=start_dt, end=end_dt, location=loc,
+            title=name, start=start_dt, end=end_dt, location=_location(node.get('location')),
             url=event_url, organizer=source_name, source_url=url
         ))
+    metrics.count_pruned(pruned)
     return out
+
+
+def fetch_jsonld_events(url: str, source_name: str = None, window: Optional[BuildWindow] = None) -> List[Event]:
+    r = fetch(url, timeout=30)
+    r.raise_for_status()
+    return parse_jsonld_events(r.text, url, source_name, window)
@@ -0,0 +1,226 @@
+import glob
+import hashlib
+import json
+import os
+import threading
+from datetime import date, datetime
+from pathlib import Path
+from typing import List, Optional
+
+import yaml
+
+from .. import cache, metrics
+from ..model import Event
+from ..window import BuildWindow
+
+# Yksi lataaja kaikille käsin ylläpidetyille data/*.yaml-tiedostoille.
+#
+# Rivit tarkistetaan skeemaa vasten ja tarkistettu tulos tallennetaan
+# snapshotiksi (muistiin ja välimuistihakemistoon), avaimena tiedoston
+# mtime + sisällön sha256. Muuttumatonta tiedostoa ei jäsennetä uudelleen.
+
+ROOT = Path(__file__).resolve().parents[2]
+
+# C-kiihdytetty lataaja jos PyYAML on käännetty libyamlin kanssa
+Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+SNAPSHOT_VERSION = 2
+
+# kenttä -> (pakollinen, muoto)
+SCHEMA = {
+    "date": (True, "date"),
+    "start": (True, "time"),
+    "end": (False, "time"),
+    "title": (False, "str"),
+    "location": (False, "str"),
+    "organizer": (False, "str"),
+    "url": (False, "str"),
+}
+
+_memory = {}
+_lock = threading.Lock()
+
+
+def resolve_path(path: str) -> Path:
+    """Suhteelliset polut tulkitaan repon juuresta, ei työhakemistosta."""
+    p = Path(path)
+    return p if p.is_absolute() else ROOT / p
+
+
+def expand_paths(path: str) -> List[Path]:
+    pattern = resolve_path(path)
+    if glob.has_magic(str(pattern)):
+        return [Path(p) for p in sorted(glob.glob(str(pattern)))]
+    return [pattern]
+
+
+def _parse_date(value) -> str:
+    if isinstance(value, date):
+        return value.isoformat()
+    if not isinstance(value, str):
+        raise ValueError(f"expected YYYY-MM-DD, got {value!r}")
+    return date.fromisoformat(value.strip()).isoformat()
+
+
+def _parse_time(value) -> str:
+    # HUOM: lainaamaton 18:00 on YAML 1.1:ssä kokonaisluku (1080)
+    if not isinstance(value, str):
+        raise ValueError(f"expected quoted HH:MM, got {value!r}")
+    hh, mm = [int(x) for x in value.strip().split(":")]
+    return f"{hh:02d}:{mm:02d}"
+
+
+def _parse_field(kind: str, value, day: Optional[str] = None) -> str:
+    if kind == "date":
+        return _parse_date(value)
+    if kind == "time":
+        parsed = _parse_time(value)
+        if day is not None:
+            # tarkistetaan että aika on oikeasti olemassa (esim. 24:61)
+            datetime.fromisoformat(f"{day}T{parsed}")
+        return parsed
+    return str(value)
+
+
+def validate_row(row, warnings: Optional[List[str]] = None) -> dict:
+    """
+    Palauttaa normalisoidun rivin tai nostaa ValueErrorin (rivi ohitetaan).
+    Virheellinen valinnainen kenttä (esim. end) jätetään pois ja siitä
+    lisätään varoitus `warnings`-listaan, kuten vanhat lataajat tekivät.
+    """
+    if not isinstance(row, dict):
+        raise ValueError("row is not a mapping")
+    out = {}
+    for key, (required, kind) in SCHEMA.items():
+        value = row.get(key)
+        if value is None or value == "":
+            if required:
+                raise ValueError(f"missing {key!r}")
+            continue
+        try:
+            out[key] = _parse_field(kind, value, out.get("date"))
+        except ValueError as e:
+            if required:
+                raise
+            if warnings is not None:
+                warnings.append(f"invalid {key!r} dropped ({e})")
+    return out
+
+
+def _compile(raw: bytes, label: str) -> dict:
+    data = yaml.load(raw, Loader=Loader) or {}
+    rows, warnings = [], []
+    for row in (data.get("events") or []):
+        dropped: List[str] = []
+        try:
+            rows.append(validate_row(row, dropped))
+        except Exception as e:
+            warnings.append(f"[WARN] {label}: row skipped ({e}): {row}")
+            continue
+        warnings.extend(f"[WARN] {label}: {msg}: {row}" for msg in dropped)
+    return {"rows": rows, "warnings": warnings}
+
+
+def _snapshot_path(path: Path) -> Optional[str]:
+    root = cache.get_cache_dir()
+    if not root:
+        return None
+    key = hashlib.sha1(str(path).encode("utf-8")).hexdigest()
+    return os.path.join(root, "manual", key + ".json")
+
+
+def _read_snapshot(snap_path: Optional[str]) -> Optional[dict]:
+    if not snap_path:
+        return None
+    try:
+        with open(snap_path, "r", encoding="utf-8") as f:
+            snap = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    return snap if snap.get("version") == SNAPSHOT_VERSION else None
+
+
+def _write_snapshot(snap_path: Optional[str], snap: dict) -> None:
+    if not snap_path:
+        return
+    os.makedirs(os.path.dirname(snap_path), exist_ok=True)
+    tmp = snap_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(snap, f, ensure_ascii=False)
+    os.replace(tmp, snap_path)
+
+
+def load_rows(path: Path) -> dict:
+    """
+    Palauttaa tiedoston tarkistetut rivit snapshotista, jos tiedosto ei ole
+    muuttunut (mtime tai viimeistään sisällön hash), muuten jäsentää sen.
+    """
+    st = path.stat()
+    with _lock:
+        snap = _memory.get(path)
+    snap_path = _snapshot_path(path)
+    if snap is None:
+        snap = _read_snapshot(snap_path)
+    if snap and snap["mtime_ns"] == st.st_mtime_ns and snap["size"] == st.st_size:
+        with _lock:
+            _memory[path] = snap
+        return snap
+
+    raw = path.read_bytes()
+    digest = hashlib.sha256(raw).hexdigest()
+    if snap and snap["sha256"] == digest:
+        # vain mtime muuttui (esim. git checkout)
+        snap = {**snap, "mtime_ns": st.st_mtime_ns, "size": st.st_size}
+    else:
+        snap = {
+            "version": SNAPSHOT_VERSION,
+            "sha256": digest,
+            "mtime_ns": st.st_mtime_ns,
+            "size": st.st_size,
+            **_compile(raw, path.name),
+        }
+    with _lock:
+        _memory[path] = snap
+    _write_snapshot(snap_path, snap)
+    return snap
+
+
+def fetch_manual_yaml(
+    path: str,
+    default_title: Optional[str] = None,
+    default_organizer: Optional[str] = None,
+    window: Optional[BuildWindow] = None,
+) -> List[Event]:
+    """
+    Lataa yhden tai useamman (glob, esim. "data/*.yaml") manuaalitiedoston.
+    Puuttuva tiedosto ei kaada buildia.
+    """
+    events = []
+    pruned = 0
+    for p in expand_paths(path):
+        try:
+            snap = load_rows(p)
+        except FileNotFoundError:
+            continue
+        for w in snap["warnings"]:
+            print(w)
+        for row in snap["rows"]:
+            # rivit on normalisoitu (YYYY-MM-DD, HH:MM), joten vertailu onnistuu merkkijonoina
+            if window and not window.admits_iso(f"{row['date']}T{row['start']}"):
+                pruned += 1
+                continue
+            start_dt = datetime.fromisoformat(f"{row['date']}T{row['start']}")
+            end_dt = None
+            if row.get("end"):
+                end_dt = datetime.fromisoformat(f"{row['date']}T{row['end']}")
+            events.append(Event(
+                title=row.get("title", default_title or "Avoimet ovet"),
+                start=start_dt,
+                end=end_dt,
+                location=row.get("location"),
+                url=row.get("url"),
+                organizer=row.get("organizer", default_organizer),
+                source_url=row.get("url"),
+            ))
+    metrics.count_pruned(pruned)
+    return events
@@ -0,0 +1,328 @@
+import html as htmllib
+import json
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+# Regex-kerääjien yhteinen esikäsittely: sivu muutetaan kerran näkyväksi
+# tekstiksi (tagit pois, entiteetit auki, välilyönnit yhdeksi, lohkotagit
+# rivinvaihdoiksi), ja tekstin kohdat voi kääntää takaisin HTML:n
+# kohdiksi (PageText.html_offset). Sivukohtaiset kuviot (patterns.yaml)
+# ajetaan vain päivien ja kellonaikojen lähellä: nopea esisuodatin (anchor,
+# esim. "4.1") löytää ehdokaskohdat, ja päivä-, aika- ja skip-kuvioiden
+# yhdistetty lauseke ajetaan vain niiden ympärillä. Otsikkoa haetaan vasta
+# löydetyn päivän edeltä ja vuosivihjettä sivun alusta ensimmäiseen osumaan.
+
+_MARKUP = re.compile(
+    r"<!--.*?-->"
+    r"|<[!?][^>]*>"
+    r"|<(script|style|noscript|template)\b[^>]*>.*?</\1\s*>"
+    r"|<(/?)([a-zA-Z][a-zA-Z0-9]*)\b[^>]*>"
+    r"|&(?:#[0-9]+|#[xX][0-9a-fA-F]+|[a-zA-Z][a-zA-Z0-9]*);?",
+    re.DOTALL | re.IGNORECASE,
+)
+# Yksittäinen välilyönti kopioidaan sellaisenaan; vain nämä käsitellään
+_ODD_SPACE = re.compile(r"\s{2,}|[^\S ]")
+
+BLOCK_TAGS = frozenset("""
+    address article aside blockquote br dd details div dl dt fieldset figcaption figure
+    footer form h1 h2 h3 h4 h5 h6 header hr li main nav ol option p pre section summary
+    table tbody td tfoot th thead title tr ul
+""".split())
+
+
+@dataclass
+class PageText:
+    text: str
+    # Offset-kartta harvana: tekstin kohdasta text_starts[j] alkaen merkit
+    # ovat HTML:ssä peräkkäin kohdasta html_starts[j] alkaen.
+    text_starts: array
+    html_starts: array
+
+    def html_offset(self, i: int) -> int:
+        """Tekstin merkin i kohta alkuperäisessä HTML:ssä."""
+        j = bisect_right(self.text_starts, i) - 1
+        if j < 0:
+            return 0
+        return self.html_starts[j] + (i - self.text_starts[j])
+
+
+def html_to_text(html: str) -> PageText:
+    out: List[str] = []
+    text_starts = array("l")
+    html_starts = array("l")
+    size = 0
+    last = "\n"
+
+    def emit(s: str, at: int) -> None:
+        nonlocal size, last
+        if last in " \n" and s[0] == " ":
+            s, at = s[1:], at + 1
+            if not s:
+                return
+        out.append(s)
+        text_starts.append(size)
+        html_starts.append(at)
+        size += len(s)
+        last = s[-1]
+
+    def newline(at: int) -> None:
+        nonlocal size, last
+        if last == " ":
+            # rivin lopun välilyönti pois
+            out[-1] = out[-1][:-1]
+            size -= 1
+            if not out[-1]:
+                out.pop()
+                text_starts.pop()
+                html_starts.pop()
+            last = out[-1][-1] if out else "\n"
+        if last != "\n":
+            emit("\n", at)
+
+    def text(start: int, end: int) -> None:
+        pos = start
+        for w in _ODD_SPACE.finditer(html, start, end):
+            if w.start() > pos:
+                emit(html[pos:w.start()], pos)
+            emit(" ", w.start())
+            pos = w.end()
+        if pos < end:
+            emit(html[pos:end], pos)
+
+    pos = 0
+    for m in _MARKUP.finditer(html):
+        if m.start() > pos:
+            text(pos, m.start())
+        pos = m.end()
+        if html[m.start()] == "&":
+            ch = htmllib.unescape(m.group())
+            emit(" " if ch.isspace() else ch, m.start())
+            continue
+        name = m.group(3)
+        if name and name.lower() in BLOCK_TAGS:
+            newline(m.start())
+    if pos < len(html):
+        text(pos, len(html))
+    return PageText("".join(out), text_starts, html_starts)
+
+
+# --- kuviojoukot ---
+
+KINDS = ("date", "time", "title", "year", "skip")
+NEAR_KINDS = ("date", "time", "skip")
+# jokainen päivä ja kellonaika sisältää esisuodattimen osuman ("14.1.", "klo 10:30")
+DEFAULT_ANCHOR = r"\d[.:]\d"
+# ehdokaskohdan ympäriltä käytävä alue; kattaa viikonpäivän, "klo" ja vuoden
+ANCHOR_MARGIN = 64
+REQUIRED_GROUPS = {
+    "date": ("day", "month"),
+    "time": ("sh", "sm", "eh", "em"),
+    "year": ("fy",),
+}
+
+
+@dataclass(frozen=True)
+class PatternSet:
+    name: str
+    spec: dict = field(hash=False, compare=False)
+    anchor: re.Pattern = field(hash=False, compare=False)
+    near: re.Pattern = field(hash=False, compare=False)          # date|time|skip
+    title: Optional[re.Pattern] = field(default=None, hash=False, compare=False)
+    year: Optional[re.Pattern] = field(default=None, hash=False, compare=False)
+    max_gap: int = 80         # päivän ja kellonajan suurin etäisyys (merkkejä)
+    list_gap: int = 0         # näin lähekkäiset päivät jakavat seuraavan ajan
+    title_window: int = 0     # otsikkoa etsitään näin kaukaa ennen päivää
+    skip_window: int = 0      # skip-fraasi näin lähellä ennen päivää -> ei tapahtuma
+
+
+def compile_pattern_set(name: str, spec: dict) -> PatternSet:
+    for kind in ("date", "time"):
+        if not spec.get(kind):
+            raise ValueError(f"pattern set {name!r}: missing {kind!r}")
+    parts = []
+    single = {}
+    for kind in KINDS:
+        if not spec.get(kind):
+            continue
+        sub = re.compile(spec[kind])
+        for group in REQUIRED_GROUPS.get(kind, ()):
+            if group not in sub.groupindex:
+                raise ValueError(f"pattern set {name!r}: {kind} needs group (?P<{group}>...)")
+        # Osumat alkavat aina sanan rajalta; \b karsii suurimman osan kohdista
+        # ennen kuin vaihtoehtoja kokeillaan.
+        single[kind] = re.compile(r"\b(?:" + spec[kind] + ")", re.IGNORECASE)
+        if kind in NEAR_KINDS:
+            # ryhmän nimessä etuliite, koska esim. päivän sisällä on jo (?P<year>)
+            parts.append(f"(?P<k_{kind}>{spec[kind]})")
+    # järjestys ratkaisee: samasta kohdasta alkavista voittaa ensimmäinen
+    near = re.compile(r"\b(?:" + "|".join(parts) + ")", re.IGNORECASE)
+    return PatternSet(
+        name=name,
+        spec=dict(spec),
+        anchor=re.compile(spec.get("anchor", DEFAULT_ANCHOR)),
+        near=near,
+        title=single.get("title"),
+        year=single.get("year"),
+        max_gap=int(spec.get("max_gap", 80)),
+        list_gap=int(spec.get("list_gap", 0)),
+        title_window=int(spec.get("title_window", 0)),
+        skip_window=int(spec.get("skip_window", 0)),
+    )
+
+
+_compiled: Dict[str, PatternSet] = {}
+
+
+def compile_pattern_sets(specs: Dict[str, dict]) -> Dict[str, PatternSet]:
+    """Kääntää joukot kerran; sama määrittely palauttaa saman olion."""
+    out = {}
+    for name, spec in specs.items():
+        key = json.dumps([name, spec], sort_keys=True)
+        if key not in _compiled:
+            _compiled[key] = compile_pattern_set(name, spec)
+        out[name] = _compiled[key]
+    return out
+
+
+@dataclass
+class Scan:
+    page: PageText
+    patterns: PatternSet
+    dates: List[re.Match] = field(default_factory=list)
+    times: List[re.Match] = field(default_factory=list)
+    years: List[re.Match] = field(default_factory=list)     # vain ensimmäinen
+    skips: List[re.Match] = field(default_factory=list)
+    skipped: List[re.Match] = field(default_factory=list)   # skip-fraasin jälkeiset päivät
+
+    def pairs(self) -> List[Tuple[re.Match, Optional[re.Match]]]:
+        """
+        (päivä, aika tai None) -parit: jokaiselle päivälle lähin sen jälkeen
+        alkava aika, jos se on max_gap:n sisällä eikä välissä ole toista
+        päivää (myös ohitettu päivä katkaisee). Luettelon päivät ("3.2.2026 ja 4.2.2026 klo ...") perivät
+        seuraavan päivän ajan, jos niiden väli on enintään list_gap. Jos
+        päivän ja lähimmän ajan välissä on skip-fraasi ("14.1.2026. Haku
+        päättyy klo 15.00–16.00"), aika kuuluu määräaikaan, ja päivä jätetään
+        kokonaan pois (ei oletusaikaa).
+        """
+        dates, times = self.dates, self.times
+        starts = [tm.start() for tm in times]
+        skip_starts = [m.start() for m in self.skips]
+        skipped_starts = [m.start() for m in self.skipped]
+        paired: List[Optional[re.Match]] = [None] * len(dates)
+        rejected = [False] * len(dates)
+        # takaperin, jotta luettelon päivä voi periä seuraavan päivän ajan
+        for k in range(len(dates) - 1, -1, -1):
+            dm = dates[k]
+            i = bisect_left(starts, dm.end())
+            tm = times[i] if i < len(times) and starts[i] - dm.end() <= self.patterns.max_gap else None
+            if tm is not None and _between(skipped_starts, dm.end(), tm.start()):
+                # "17.2.2026 verkossa. Haku päättyy 17.3.2026. ... klo 8.00–16.00"
+                tm = None
+            elif tm is not None and _between(skip_starts, dm.end(), tm.start()):
+                rejected[k] = True
+                continue
+            if k + 1 < len(dates) and tm is not None and dates[k + 1].start() < tm.start():
+                nxt = dates[k + 1]
+                if nxt.start() - dm.end() <= self.patterns.list_gap:
+                    tm, rejected[k] = paired[k + 1], rejected[k + 1]
+                else:
+                    tm = None
+            paired[k] = tm
+        return [(dm, tm) for dm, tm, drop in zip(dates, paired, rejected) if not drop]
+
+    def title_before(self, pos: int) -> Optional[str]:
+        """Lähin otsikkofraasi ennen kohtaa pos (enintään title_window merkkiä)."""
+        if self.patterns.title is None or not self.patterns.title_window:
+            return None
+        t = None
+        for t in self.patterns.title.finditer(self.page.text, max(0, pos - self.patterns.title_window), pos):
+            pass
+        if t is None:
+            return None
+        # fraasi jatkuu enintään 80 merkkiä, kunnes tulee piste tai rivinvaihto
+        tail = self.page.text[t.start():min(t.end() + 80, pos)]
+        return re.split(r"[.\n]", tail, maxsplit=1)[0].strip()
+
+    def default_year(self) -> Optional[int]:
+        """Ensimmäinen sivulla mainittu vuosi (year-kuvio tai päivän vuosi)."""
+        candidates = [(m.start(), m.group("fy")) for m in self.years[:1]]
+        candidates += [(m.start(), m.group("year")) for m in self.dates if _group(m, "year")][:1]
+        if not candidates:
+            return None
+        return int(min(candidates)[1])
+
+    def line_after(self, m: re.Match) -> str:
+        """Teksti osuman perästä rivin loppuun."""
+        text = self.page.text
+        end = text.find("\n", m.end())
+        return text[m.end():end if end >= 0 else len(text)]
+
+
+def _drop_skipped(result: Scan) -> None:
+    """
+    Poistaa päivät, joita edeltää samalla rivillä skip-fraasi enintään
+    skip_window merkin päässä ("haku päättyy 17.3.2026", "Sivua päivitetty
+    1.8.2025"). Ne ovat määräaikoja ja päiväyksiä, eivät tapahtumia.
+    """
+    window = result.patterns.skip_window
+    if not result.skips or not window:
+        return
+    text = result.page.text
+    ends = [m.end() for m in result.skips]
+    kept = []
+    for dm in result.dates:
+        i = bisect_right(ends, dm.start()) - 1
+        if i >= 0 and dm.start() - ends[i] <= window and "\n" not in text[ends[i]:dm.start()]:
+            result.skipped.append(dm)
+            continue
+        kept.append(dm)
+    result.dates = kept
+
+
+def _between(starts: List[int], lo: int, hi: int) -> bool:
+    """Onko järjestetyssä listassa kohta välillä [lo, hi)."""
+    return bisect_left(starts, lo) < bisect_left(starts, hi)
+
+
+def _group(m: re.Match, name: str) -> Optional[str]:
+    try:
+        return m.group(name)
+    except IndexError:
+        return None
+
+
+def _regions(text: str, patterns: PatternSet):
+    """Esisuodattimen osumien ympäristöt yhdistettyinä (alku, loppu) -väleiksi."""
+    before = ANCHOR_MARGIN + patterns.skip_window
+    lo = hi = None
+    for a in patterns.anchor.finditer(text):
+        start, end = max(0, a.start() - before), a.end() + ANCHOR_MARGIN
+        if hi is not None and start <= hi:
+            hi = end
+            continue
+        if hi is not None:
+            yield lo, hi
+        lo, hi = start, end
+    if hi is not None:
+        yield lo, hi
+
+
+def scan(html: str, patterns: PatternSet) -> Scan:
+    """Muuttaa sivun tekstiksi ja etsii päivät ja ajat esisuodattimen osumien ympäriltä."""
+    page = html_to_text(html)
+    text = page.text
+    result = Scan(page, patterns)
+    buckets = {"date": result.dates, "time": result.times, "skip": result.skips}
+    for lo, hi in _regions(text, patterns):
+        for m in patterns.near.finditer(text, lo, hi):
+            # lastgroup on uloin ryhmä, eli k_<laji>
+            buckets[m.lastgroup[2:]].append(m)
+    if patterns.year is not None:
+        m = patterns.year.search(text)
+        if m:
+            result.years.append(m)
+    _drop_skipped(result)
+    return result
@@ -1,134 +1,92 @@
-import requests
-import re
 from datetime import datetime
+from typing import Optional
+from .. import metrics
+from ..client import fetch, BROWSER_USER_AGENT
 from ..model import Event
+from ..window import BuildWindow
+from .textscan import PatternSet, scan
 
-HEADERS = {
-    "User-Agent": (
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) "
-        "Chrome/123.0 Safari/537.36"
-    )
-}
+# Vantaan sivut eivät vastaa bottien User-Agentille
+FETCH_HEADERS = {"User-Agent": BROWSER_USER_AGENT}
 
-# 🔴 TÄRKEÄ: laita oikea URL tänne Lumon lukiolle,
-# kunhan sellainen on (nyt laitetaan se, jonka annoit).
-# Voit lisätä muitakin lukioita myöhemmin.
-VANTAA_LUKIOT = [
-    {
-        "name": "Lumon lukio",
-        "url": "https://lumonlukio.vantaa.fi/fi/ajankohtaista",
-        "location": "Lumon lukio, Urpiaisentie 14, 01450 Vantaa"
-    },
-    # Lisää myöhemmin esim. Tikkurilan lukio, Vaskivuoren lukio, jne.
-    # {
-    #     "name": "Tikkurilan lukio",
-    #     "url": "https://tikkurilanlukio.vantaa.fi/.../hakijainfo",
-    #     "location": "Tikkurilan lukio, Vantaa"
-    # },
-]
-
-# Esimerkkejä muodoista joita haluamme nappailla:
-#  - "Avoimet ovet ti 23.1.2026 klo 17.30–19.00"
-#  - "Tutustumisilta 14.11. klo 18-19"
-#  - "20.1.2026 klo 13–15"
+# Vantaan lukiot (ja Varia) määritellään sources.yaml:ssa (type: vantaa_regex).
+# Lisää myöhemmin esim. Tikkurilan lukio, Vaskivuoren lukio, jne.
 #
-# Sallitaan:
-#  - viikonpäivä vapaaehtoinen (ma/ti/ke/...)
-#  - päivä.kuukausi.(vuosi optional)
-#  - "klo HH.MM–HH.MM" tai "klo HH:MM-HH:MM"
-DATE_TIME_PATTERN = re.compile(
-    r"(?:(?P<weekday>ma|ti|ke|to|pe|la|su)\s+)?"
-    r"(?P<day>\d{1,2})\.(?P<month>\d{1,2})"
-    r"(?:\.(?P<year>20\d{2}))?"
-    r"[^k]{0,80}?"       # vähän joustoa ennen "klo"
-    r"klo\s+"
-    r"(?P<sh>\d{1,2})[.:](?P<sm>\d{2})"
-    r"\s*[–\-]\s*"
-    r"(?P<eh>\d{1,2})[.:](?P<em>\d{2})",
-    re.IGNORECASE,
-)
+# Kuviot ovat patterns.yaml:n joukossa "vantaa". Esimerkkejä:
+#  - "Avoimet ovet ti 23.1.2026 klo 17.30–19.00"
+#  - "Tutustumisilta 14.11. klo 18.00-19.00"
+#  - "20.1.2026 klo 13.00–15.00"
+# Viikonpäivä ja vuosi ovat vapaaehtoisia, ja päivän ja "klo":n välissä saa
+# olla vähän tekstiä (max_gap).
+
 
 def _mk_dt(y, m, d, hh, mm):
     # main.py huolehtii aikavyöhykkeestä ja filtteröinnistä myöhemmin
     return datetime(y, m, d, hh, mm)
 
-def fetch_vantaa_lukio():
+
+def fetch_vantaa_lukio(name: str, url: str, location: str, patterns: PatternSet,
+                       window: Optional[BuildWindow] = None):
     """
-    Palauttaa listan Event-olioita Vantaan lukioiden (ja Varian)
-    sivuilta kaivetun tekstin perusteella.
-    Jos sivu ei aukea GitHub Actionsissa (timeout tms),
-    kyseisen lukion kohdalta mennään vain ohitse, eikä kaadeta koko ajoa.
+    Palauttaa listan Event-olioita yhden Vantaan lukion (tai Varian)
+    sivulta kaivetun tekstin perusteella.
+    Jos sivu ei aukea GitHub Actionsissa (timeout tms), virhe nousee
+    orkestroijalle, joka ohittaa vain tämän lähteen eikä kaada koko ajoa.
     """
-    events = []
-
-    for school in VANTAA_LUKIOT:
-        school_name = school["name"]
-        url = school["url"]
-        location = school["location"]
-
-        try:
-            resp = requests.get(url, timeout=30, headers=HEADERS)
-            resp.raise_for_status()
-        except Exception as e:
-            print(f"[WARN] Vantaa lukio fetch failed {school_name} {url}: {e}")
-            continue
-
-        html = resp.text
+    resp = fetch(url, timeout=30, headers=FETCH_HEADERS)
+    resp.raise_for_status()
+    return parse_vantaa_lukio(resp.text, name, url, location, patterns, window)
 
-        # Arvaa vuosi sivun sisällöstä (jos päivämäärässä ei erikseen lue vuotta)
-        year_guess = None
-        ym = re.search(r"20\d{2}", html)
-        if ym:
-            year_guess = int(ym.group(0))
 
-        # Käydään läpi kaikki "päivä.kk.(vvvv) klo HH:MM–HH:MM" -osumat
-        for m in DATE_TIME_PATTERN.finditer(html):
-            day = int(m.group("day"))
-            month = int(m.group("month"))
-
-            year = m.group("year")
-            if year:
-                year = int(year)
-            else:
-                year = year_guess
-
-            sh = int(m.group("sh"))
-            sm = int(m.group("sm"))
-            eh = int(m.group("eh"))
-            em = int(m.group("em"))
-
-            # Jos emme tiedä vuotta, ei voida tehdä validia datetimeä
-            if year is None:
-                continue
+def parse_vantaa_lukio(html: str, name: str, url: str, location: str, patterns: PatternSet,
+                       window: Optional[BuildWindow] = None):
+    events = []
+    school_name = name
+    page = scan(html, patterns)
 
-            start_local = _mk_dt(year, month, day, sh, sm)
-            end_local   = _mk_dt(year, month, day, eh, em)
+    # Arvaa vuosi sivun sisällöstä (jos päivämäärässä ei erikseen lue vuotta)
+    year_guess = page.default_year()
 
-            # Otsikko: yritetään ottaa kontekstista joku kuvaava fraasi
-            # ennen osumaa, esim. "Avoimet ovet", "Tutustumisilta"
-            context_before = html[max(0, m.start()-200):m.start()]
-            title_match = re.search(
-                r"(Avoimet ovet|Tutustumisilta|Infoilta|Esittelyilta)[^.<\n]{0,80}",
-                context_before,
-                re.IGNORECASE
-            )
-            if title_match:
-                raw_title = title_match.group(0).strip()
-            else:
-                raw_title = "Avoimet ovet"
+    # Käydään läpi kaikki "päivä.kk.(vvvv) klo HH:MM–HH:MM" -parit;
+    # aikaikkunan ulkopuoliset ohitetaan ennen datetimeä
+    pruned = 0
+    for dm, tm in page.pairs():
+        if tm is None:
+            continue
+        year = int(dm.group("year")) if dm.group("year") else year_guess
 
-            title = f"{raw_title} – {school_name}"
+        # Jos emme tiedä vuotta, ei voida tehdä validia datetimeä
+        if year is None:
+            continue
+        if window and not window.admits(year, int(dm.group("month")), int(dm.group("day")),
+                                        int(tm.group("sh")), int(tm.group("sm"))):
+            pruned += 1
+            continue
 
-            events.append(Event(
-                title=title,
-                start=start_local,
-                end=end_local,
-                location=location,
-                url=url,
-                organizer=school_name,
-                source_url=url,
-            ))
+        try:
+            start_local = _mk_dt(year, int(dm.group("month")), int(dm.group("day")),
+                                 int(tm.group("sh")), int(tm.group("sm")))
+            end_local = _mk_dt(year, int(dm.group("month")), int(dm.group("day")),
+                               int(tm.group("eh")), int(tm.group("em")))
+        except ValueError:
+            print(f"[WARN] {name}: invalid date '{dm.group()} {tm.group()}' "
+                  f"at offset {page.page.html_offset(dm.start())}")
+            continue
 
+        # Otsikko: lähin kuvaava fraasi ennen osumaa, esim. "Avoimet ovet",
+        # "Tutustumisilta"
+        raw_title = page.title_before(dm.start()) or "Avoimet ovet"
+        title = f"{raw_title} – {school_name}"
+
+        events.append(Event(
+            title=title,
+            start=start_local,
+            end=end_local,
+            location=location,
+            url=url,
+            organizer=school_name,
+            source_url=url,
+        ))
+
+    metrics.count_pruned(pruned)
     return events
-
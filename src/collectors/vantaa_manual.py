@@ -1,38 +0,0 @@
-import yaml
-from datetime import datetime
-from ..model import Event
-
-def _parse_dt(date_str: str, time_str: str):
-    # esim. "2025-01-22" + "12:00"
-    year, month, day = [int(x) for x in date_str.split("-")]
-    hh, mm = [int(x) for x in time_str.split(":")]
-    return datetime(year, month, day, hh, mm)
-
-def fetch_vantaa_manual():
-    events = []
-    try:
-        with open("data/vantaa_manual.yaml", "r", encoding="utf-8") as f:
-            data = yaml.safe_load(f) or {}
-    except FileNotFoundError:
-        # Ei manuaalista dataa? Ei haittaa, palauta tyhjä lista.
-        return events
-
-    for row in data.get("events", []):
-        try:
-            start_dt = _parse_dt(row["date"], row["start"])
-            end_dt = _parse_dt(row["date"], row["end"])
-        except Exception as e:
-            print(f"[WARN] Vantaa manual time parse failed for {row}: {e}")
-            continue
-
-        events.append(Event(
-            title=row.get("title", "Avoimet ovet"),
-            start=start_dt,
-            end=end_dt,
-            location=row.get("location"),
-            url=row.get("url"),
-            organizer=row.get("organizer"),
-            source_url=row.get("url"),
-        ))
-
-    return events
@@ -0,0 +1,135 @@
+import re
+import unicodedata
+from dataclasses import dataclass
+from datetime import timedelta
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .model import Event
+
+# Lähteiden välinen sumea duplikaattien poisto.
+#
+# Sama tilaisuus voi tulla sekä kaavinnasta ("Avoimet ovet – Kallion lukio",
+# helfi) että manuaalidatasta hieman eri sanoin. Ehdokkaat ryhmitellään
+# päivän ja järjestäjän mukaan (blocking), joten vertailuja tehdään vain
+# ryhmien sisällä eikä kaikkien parien kesken. Ryhmän sisällä kaksi eventtiä
+# ovat sama, jos alkuajat ovat toleranssin sisällä ja otsikot ovat riittävän
+# samankaltaiset. Säilytetään korkeamman prioriteetin lähteen eventti.
+
+DEFAULT_TOLERANCE = timedelta(minutes=30)
+DEFAULT_TITLE_SIMILARITY = 0.85
+
+_DASHES = str.maketrans({"–": " ", "—": " ", "-": " "})
+_NON_WORD = re.compile(r"[^\w]+")
+
+
+def normalize_text(value: Optional[str]) -> str:
+    if not value:
+        return ""
+    value = unicodedata.normalize("NFC", value).casefold().translate(_DASHES)
+    return " ".join(_NON_WORD.sub(" ", value).split())
+
+
+def normalize_location(value: Optional[str]) -> str:
+    # "Alppilan lukio, Viipurinkatu 21, Helsinki" ~ "Alppilan lukio, Helsinki"
+    return normalize_text((value or "").split(",")[0])
+
+
+@dataclass
+class Merge:
+    kept: Event
+    dropped: Event
+    kept_source: Optional[str]
+    dropped_source: Optional[str]
+    reason: str
+
+    def to_dict(self) -> dict:
+        return {
+            "kept": {"id": self.kept.id, "title": self.kept.title, "source": self.kept_source},
+            "dropped": {"id": self.dropped.id, "title": self.dropped.title, "source": self.dropped_source},
+            "reason": self.reason,
+        }
+
+
+class _Candidate:
+    __slots__ = ("index", "event", "source", "priority", "title", "location")
+
+    def __init__(self, index, event, source, priority):
+        self.index = index
+        self.event = event
+        self.source = source
+        self.priority = priority
+        self.title = normalize_text(event.title)
+        self.location = normalize_location(event.location)
+
+
+def _match(a: _Candidate, b: _Candidate, tolerance: timedelta, threshold: float) -> Optional[str]:
+    delta = abs(a.event.start - b.event.start)
+    if delta > tolerance:
+        return None
+    minutes = int(delta.total_seconds() // 60)
+    if a.title == b.title and a.location == b.location:
+        return f"same title and location, start Δ{minutes}min"
+    ratio = SequenceMatcher(None, a.title, b.title).ratio()
+    if ratio >= threshold:
+        return f"title similarity {ratio:.2f}, start Δ{minutes}min"
+    return None
+
+
+def dedupe(
+    events: Sequence[Event],
+    sources: Optional[Sequence[Optional[str]]] = None,
+    priorities: Optional[Dict[str, int]] = None,
+    tolerance: timedelta = DEFAULT_TOLERANCE,
+    title_similarity: float = DEFAULT_TITLE_SIMILARITY,
+) -> Tuple[List[Event], List[Merge]]:
+    """
+    Palauttaa (säilytetyt eventit alkuperäisessä järjestyksessä, yhdistämiset).
+    `sources` kertoo kunkin eventin lähteen nimen ja `priorities` lähteiden
+    prioriteetit (suurempi voittaa; tasapelissä aiempi eventti voittaa).
+    """
+    priorities = priorities or {}
+    candidates = []
+    for i, e in enumerate(events):
+        source = sources[i] if sources is not None else None
+        candidates.append(_Candidate(i, e, source, priorities.get(source, 0)))
+    rank = lambda c: (-c.priority, c.index)
+    merges: List[Merge] = []
+
+    # 1) Täsmälleen samat (otsikko, alku, paikka) lähteestä riippumatta
+    exact: Dict[tuple, List[_Candidate]] = {}
+    for c in candidates:
+        e = c.event
+        key = (e.title.strip().lower(), e.start.isoformat(), (e.location or "").strip().lower())
+        exact.setdefault(key, []).append(c)
+    survivors = []
+    for group in exact.values():
+        group.sort(key=rank)
+        survivors.append(group[0])
+        for c in group[1:]:
+            merges.append(Merge(group[0].event, c.event, group[0].source, c.source, "exact"))
+
+    # 2) Sumea vertailu. Blocking: sama päivä + järjestäjä (tai paikka jos
+    #    järjestäjä puuttuu), joten työ kasvaa lähes lineaarisesti.
+    blocks: Dict[tuple, List[_Candidate]] = {}
+    for c in survivors:
+        key = (c.event.start.date(), normalize_text(c.event.organizer) or c.location)
+        blocks.setdefault(key, []).append(c)
+
+    kept_idx = []
+    for block in blocks.values():
+        block.sort(key=rank)
+        kept: List[_Candidate] = []
+        for c in block:
+            for k in kept:
+                reason = _match(k, c, tolerance, title_similarity)
+                if reason:
+                    merges.append(Merge(k.event, c.event, k.source, c.source, reason))
+                    break
+            else:
+                kept.append(c)
+        kept_idx.extend(k.index for k in kept)
+
+    kept_idx.sort()
+    merges.sort(key=lambda m: (m.kept.start, m.kept.title, m.dropped.title))
+    return [events[i] for i in kept_idx], merges
@@ -0,0 +1,115 @@
+from datetime import date, datetime, timezone
+from typing import Iterable, Iterator
+
+# Kevyt RFC 5545 -kirjoitin: VEVENT-lohkot kirjoitetaan suoraan tavuiksi
+# ilman icalendar-oliopuuta. Hoitaa tekstin escapet, 75 oktetin rivien
+# taiton (UTF-8-merkkejä katkaisematta) sekä UTC/TZID-ajat.
+
+PRODID = "-//OpenDoorsBot//EN"
+TZID = "Europe/Helsinki"
+UID_DOMAIN = "opendoors.bot"
+CRLF = "\r\n"
+
+# Europe/Helsinki: EET/EEST, vaihto maalis- ja lokakuun viimeisenä
+# sunnuntaina klo 01:00 UTC
+VTIMEZONE = CRLF.join([
+    "BEGIN:VTIMEZONE",
+    f"TZID:{TZID}",
+    "BEGIN:DAYLIGHT",
+    "TZOFFSETFROM:+0200",
+    "TZOFFSETTO:+0300",
+    "TZNAME:EEST",
+    "DTSTART:19700329T030000",
+    "RRULE:FREQ=YEARLY;BYMONTH=3;BYDAY=-1SU",
+    "END:DAYLIGHT",
+    "BEGIN:STANDARD",
+    "TZOFFSETFROM:+0300",
+    "TZOFFSETTO:+0200",
+    "TZNAME:EET",
+    "DTSTART:19701025T040000",
+    "RRULE:FREQ=YEARLY;BYMONTH=10;BYDAY=-1SU",
+    "END:STANDARD",
+    "END:VTIMEZONE",
+]) + CRLF
+
+
+def escape_text(value: str) -> str:
+    # RFC 5545 3.3.11: \ ; , ja rivinvaihdot
+    return (
+        value.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+        .replace("\r", "\\n")
+    )
+
+
+def fold(line: str) -> bytes:
+    """Taittaa rivin 75 oktetin paloihin (RFC 5545 3.1)."""
+    data = line.encode("utf-8")
+    if len(data) <= 75:
+        return data + b"\r\n"
+    parts = []
+    start = 0
+    limit = 75
+    while len(data) - start > limit:
+        end = start + limit
+        # ei katkaista monitavuista UTF-8-merkkiä (jatkotavut 10xxxxxx)
+        while data[end] & 0xC0 == 0x80:
+            end -= 1
+        parts.append(data[start:end])
+        start = end
+        limit = 74  # jatkorivin alussa on välilyönti
+    parts.append(data[start:])
+    return b"\r\n ".join(parts) + b"\r\n"
+
+
+def _fmt_local(dt: datetime) -> str:
+    return (
+        f"{dt.year:04d}{dt.month:02d}{dt.day:02d}"
+        f"T{dt.hour:02d}{dt.minute:02d}{dt.second:02d}"
+    )
+
+
+def format_dt(name: str, value) -> str:
+    """DTSTART/DTEND: Helsingin aika TZID:llä, muut UTC:nä, date VALUE=DATE."""
+    if not isinstance(value, datetime):
+        if isinstance(value, date):
+            return f"{name};VALUE=DATE:{value.year:04d}{value.month:02d}{value.day:02d}"
+        raise TypeError(f"{name}: unsupported value {value!r}")
+    tz = value.tzinfo
+    if tz is None:
+        # kelluva paikallinen aika
+        return f"{name}:{_fmt_local(value)}"
+    if getattr(tz, "key", None) == TZID:
+        return f"{name};TZID={TZID}:{_fmt_local(value)}"
+    return f"{name}:{_fmt_local(value.astimezone(timezone.utc))}Z"
+
+
+def vevent(e) -> bytes:
+    out = [b"BEGIN:VEVENT\r\n"]
+    out.append(fold("SUMMARY:" + escape_text(e.title)))
+    out.append(fold(format_dt("DTSTART", e.start)))
+    if e.end:
+        out.append(fold(format_dt("DTEND", e.end)))
+    out.append(fold(f"UID:{e.id}@{UID_DOMAIN}"))
+    if e.location:
+        out.append(fold("LOCATION:" + escape_text(e.location)))
+    if e.url:
+        # URL on URI-tyyppinen arvo, sitä ei escapata
+        out.append(fold("URL:" + e.url))
+    out.append(b"END:VEVENT\r\n")
+    return b"".join(out)
+
+
+def iter_calendar(events: Iterable) -> Iterator[bytes]:
+    yield (
+        "BEGIN:VCALENDAR" + CRLF
+        + "VERSION:2.0" + CRLF
+        + f"PRODID:{PRODID}" + CRLF
+        + VTIMEZONE
+    ).encode("ascii")
+    for e in events:
+        yield vevent(e)
+    yield b"END:VCALENDAR\r\n"
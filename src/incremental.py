@@ -0,0 +1,183 @@
+import hashlib
+import json
+import os
+import threading
+from functools import partial
+from typing import List, Optional
+
+from . import client
+from .model import Event
+from .orchestrator import Job
+from .output import write_atomic
+from .registry import Source, collector_context, collector_module
+from .window import BuildWindow
+
+# Inkrementaalinen build: jokaisen lähteen normalisoidut eventit tallennetaan
+# yhdessä syötteen sormenjäljen ja sen aikaikkunan kanssa, jolle tulos
+# tehtiin. Jos syöte (sivu tai data/*.yaml) ei ole muuttunut ja tallennettu
+# ikkuna kattaa nykyisen, käytetään tallennettua tulosta eikä lähdettä
+# käsitellä uudelleen (main suodattaa sen vielä nykyisellä ikkunalla).
+# Ulostulot kirjoitetaan vain kun niiden sisältö muuttuu.
+
+# Kasvata kun kerääjien tulkinta muuttuu, jotta vanhat tulokset hylätään
+STATE_VERSION = 2
+
+
+def source_fingerprint(source: Source, context: Optional[dict] = None) -> str:
+    # buildin yhteiset argumentit vaikuttavat tulokseen; aikaikkuna ei ole
+    # mukana, koska oletusikkuna siirtyy joka päivä (ks. source_window)
+    h = hashlib.sha256()
+    patterns = source.pattern_set.spec if source.pattern_set is not None else None
+    shared = {k: v for k, v in collector_context(source, context).items() if k != "window"}
+    h.update(json.dumps(
+        {"v": STATE_VERSION, "type": source.type, "params": source.params,
+         "patterns": patterns, "context": shared},
+        sort_keys=True, ensure_ascii=False, default=str,
+    ).encode("utf-8"))
+
+    if source.type == "manual_yaml":
+        from .collectors.manual_yaml import expand_paths, load_rows
+        for path in expand_paths(source.params["path"]):
+            h.update(str(path).encode("utf-8"))
+            try:
+                h.update(load_rows(path)["sha256"].encode("ascii"))
+            except FileNotFoundError:
+                h.update(b"-")
+    elif "url" in source.params:
+        # Haku menee HTTP-välimuistin kautta (yleensä 304) ja muistetaan,
+        # joten kerääjä saa saman vastauksen ilman uutta pyyntöä.
+        headers = getattr(collector_module(source), "FETCH_HEADERS", None)
+        r = client.fetch(source.params["url"], headers=headers, timeout=30)
+        r.raise_for_status()
+        h.update(r.content)
+    return h.hexdigest()
+
+
+def source_window(source: Source, context: Optional[dict] = None) -> Optional[BuildWindow]:
+    """
+    Aikaväli, jonka lähteen tulos kattaa; None, jos kerääjä ei ota ikkunaa.
+    Kerääjä voi rajata loputtoman ikkunan (WINDOW_HORIZON, esim. ICS:n
+    toistuvat tapahtumat avataan vain vuoden päähän).
+    """
+    window = collector_context(source, context).get("window")
+    if window is None:
+        return None
+    horizon = getattr(collector_module(source), "WINDOW_HORIZON", None)
+    if horizon is not None and window.since is not None and window.until is None:
+        window = BuildWindow(since=window.since, until=window.since + horizon)
+    return window
+
+
+def _covers(prev: dict, window: Optional[BuildWindow]) -> bool:
+    if window is None:
+        return True
+    bounds = prev.get("window")
+    return bounds is not None and BuildWindow.from_json(bounds).covers(window)
+
+
+class BuildState:
+    def __init__(self, state_dir: str, restore=None, context: Optional[dict] = None):
+        # restore: ajetaan tallennetuille eventeille (esim. aikavyöhykkeen
+        # palautus, koska ISO-muodosta saadaan vain kiinteä UTC-offset)
+        # context: sama kuin registry.build_jobs:lle annettu
+        self.state_dir = state_dir
+        self.restore = restore
+        self.context = context
+        self.reused: List[str] = []
+        self.rebuilt: List[str] = []
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(state_dir, "sources"), exist_ok=True)
+        self._outputs_path = os.path.join(state_dir, "outputs.json")
+        try:
+            with open(self._outputs_path, "r", encoding="utf-8") as f:
+                self.outputs = json.load(f)
+        except (FileNotFoundError, ValueError):
+            self.outputs = {}
+
+    def _source_path(self, name: str) -> str:
+        key = hashlib.sha1(name.encode("utf-8")).hexdigest()
+        return os.path.join(self.state_dir, "sources", key + ".json")
+
+    def load_source(self, name: str) -> Optional[dict]:
+        try:
+            with open(self._source_path(name), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def save_source(self, name: str, fingerprint: str, events: List[Event],
+                    window: Optional[BuildWindow] = None) -> None:
+        path = self._source_path(name)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({
+                "name": name,
+                "fingerprint": fingerprint,
+                "window": window.to_json() if window is not None else None,
+                "events": [e.to_dict() for e in events],
+            }, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def _reuse(self, name: str, prev: dict) -> List[Event]:
+        with self._lock:
+            self.reused.append(name)
+        events = [Event.from_dict(d) for d in prev["events"]]
+        return self.restore(events) if self.restore else events
+
+    def run_source(self, source: Source, job: Job) -> List[Event]:
+        fingerprint = source_fingerprint(source, self.context)
+        window = source_window(source, self.context)
+        prev = self.load_source(source.name)
+        if prev and prev.get("fingerprint") == fingerprint and _covers(prev, window):
+            return self._reuse(source.name, prev)
+
+        events = job.fn()
+        self.save_source(source.name, fingerprint, events, window)
+        with self._lock:
+            self.rebuilt.append(source.name)
+        return events
+
+    def keep_source(self, source: Source, job: Job) -> List[Event]:
+        """Tallennettu tulos sormenjälkeä laskematta (ei hakuja); ks. wrap_jobs."""
+        prev = self.load_source(source.name)
+        if prev is None or not _covers(prev, source_window(source, self.context)):
+            return self.run_source(source, job)
+        return self._reuse(source.name, prev)
+
+    def wrap_jobs(self, sources: List[Source], jobs: List[Job], refresh=None) -> List[Job]:
+        """
+        refresh: jos annettu, vain nämä lähteet tarkistetaan (watch-tila);
+        muille käytetään tallennettua tulosta sellaisenaan.
+        """
+        return [
+            job._replace(fn=partial(
+                self.run_source if refresh is None or source.name in refresh else self.keep_source,
+                source, job))
+            for source, job in zip(sources, jobs)
+        ]
+
+    def write_output(self, path: str, chunks) -> bool:
+        """
+        Kirjoittaa tiedoston (atomisesti, ks. output.write_atomic) vain jos
+        sisältö poikkeaa levyllä olevasta. Palauttaa True jos sisältö
+        muuttui edelliseen buildiin nähden.
+        """
+        digest, _written = write_atomic(path, chunks)
+        name = os.path.basename(path)
+        changed = self.outputs.get(name) != digest
+        self.outputs[name] = digest
+        return changed
+
+    def save(self) -> None:
+        tmp = self._outputs_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.outputs, f, sort_keys=True)
+        os.replace(tmp, self._outputs_path)
+
+
+def report_changed(changed: bool) -> None:
+    """Kertoo GitHub Actionsille (steps.<id>.outputs.changed) muuttuiko mikään."""
+    out = os.environ.get("GITHUB_OUTPUT")
+    if out:
+        with open(out, "a", encoding="utf-8") as f:
+            f.write(f"changed={'true' if changed else 'false'}\n")
@@ -1,169 +1,404 @@
-import argparse, os, yaml
-from datetime import datetime
+import argparse, json, os
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from functools import partial
 from typing import List
 from zoneinfo import ZoneInfo
 
-from .model import Event, dump_events_json, dump_events_ics
-from .collectors.ics import fetch_ics
-from .collectors.jsonld import fetch_jsonld_events
-from .collectors.helfi_lukio import fetch_all_helfi_lukio
-from .collectors.stadinao import fetch_stadinao_events
-from .collectors.vantaa_lukio import fetch_vantaa_lukio
-from .collectors.vantaa_manual import fetch_vantaa_manual
-from .collectors.keuda_manual import fetch_keuda_manual
-from .collectors.kerava_manual import fetch_kerava_manual
-from .collectors.helsinki_manual import fetch_helsinki_manual
-from .collectors.careeria_manual import fetch_careeria_manual
-from .collectors.perho_manual import fetch_perho_manual
-
+from . import cache, client, metrics, recording, serve, tz
+from .profiling import DEFAULT_TOP, Profiler
+from .model import Event, iter_events_json, iter_events_ics
+from .output import write_atomic
+from .search import SEARCH_NAME, build_index, iter_index
+from .window import BuildWindow, default_window, parse_bound
+from .shards import SHARD_DIR, MANIFEST_NAME, iter_manifest, write_shards
+from .orchestrator import (
+    run_collectors,
+    DEFAULT_WORKERS, DEFAULT_SOURCE_TIMEOUT, DEFAULT_BUILD_TIMEOUT,
+)
+from .dedupe import dedupe, DEFAULT_TOLERANCE
+from .registry import load_sources, parse_interval, select_sources, build_jobs
+from .incremental import BuildState, report_changed
+from .store import EventStore
+from .watch import DEFAULT_POLL, DEFAULT_REFRESH, Watcher, format_interval
 
 
 LOCAL_TZ = ZoneInfo("Europe/Helsinki")
 
-
-def load_sources(path: str):
-    with open(path, 'r', encoding='utf-8') as f:
-        return yaml.safe_load(f) or {}
-
-
-def dedupe(events: List[Event]) -> List[Event]:
-    seen = set()
-    out = []
-    for e in events:
-        key = (
-            e.title.strip().lower(),
-            e.start.isoformat(),
-            (e.location or '').strip().lower()
-        )
-        if key in seen:
-            continue
-        seen.add(key)
-        out.append(e)
-    return out
-
-
-def run(sources_path: str, out_dir: str):
+# Menneitä tapahtumia pidetään mukana näin monta päivää
+KEEP_PAST_DAYS = 30
+# inkrementaalisen tilan outputs.json: ikkuna, jolla ulostulot kirjoitettiin
+WINDOW_KEY = "window"
+
+
+def ensure_datetime(dt):
+    """
+    Ottaa joko datetime- tai date-olion ja palauttaa timezone-aware datetime Helsingin ajassa.
+    Yksittäisille arvoille; eventit normalisoidaan erissä (normalize_events, tz.py).
+    """
+    if hasattr(dt, "tzinfo"):
+        # dt on datetime-tyyppi (tai datetime-like)
+        if dt.tzinfo is None:
+            # Tulkitaan paikalliseksi ajaksi (Europe/Helsinki), ei UTC:ksi
+            return dt.replace(tzinfo=LOCAL_TZ)
+        return dt.astimezone(LOCAL_TZ)
+    else:
+        # dt on pelkkä date-olio -> tulkitaan klo 00:00 Helsingin aikaa
+        return datetime(dt.year, dt.month, dt.day, 0, 0, tzinfo=LOCAL_TZ)
+
+
+def normalize_events(events: List[Event], table=None, source: str = "normalize") -> List[Event]:
+    # normalisoi alku ja loppu datet -> datetimes yhtenä eränä; kesäaika-
+    # siirtymän aukkoon tai päällekkäisyyteen osuvat naiivit ajat raportoidaan
+    report = tz.normalize_events(events, table or tz.table_for_window(None))
+    for line in report.warnings(source):
+        print(line)
+    return events
+
+
+def _collect(name: str, table, fn) -> List[Event]:
+    events = fn()
+    with metrics.stage("normalize"):
+        return normalize_events(events, table, name)
+
+
+def _window_label(window: BuildWindow) -> str:
+    since = window.since.isoformat(timespec="minutes") if window.since else "-inf"
+    until = window.until.isoformat(timespec="minutes") if window.until else "+inf"
+    return f"[{since}, {until})"
+
+
+def write_search_index(events: List[Event], out_dir: str) -> dict:
+    """Kirjoittaa hakuindeksin osien viereen; palauttaa manifestin merkinnän."""
+    index = build_index(events)
+    digest, _written = write_atomic(os.path.join(out_dir, SHARD_DIR, SEARCH_NAME), iter_index(index))
+    return {"file": f"{SHARD_DIR}/{SEARCH_NAME}", "tokens": len(index["tokens"]), "sha256": digest}
+
+
+def write_metrics(build: metrics.BuildMetrics, out_dir: str) -> None:
+    # Mittarit ulostulojen viereen (metrics.json + Prometheus textfile)
+    build.finish()
+    metrics_path = os.path.join(out_dir, 'metrics.json')
+    prom_path = os.path.join(out_dir, 'metrics.prom')
+    write_atomic(metrics_path, build.iter_json(), compress=False, skip_if_unchanged=False)
+    write_atomic(prom_path, build.iter_prometheus(), compress=False, skip_if_unchanged=False)
+    print(f"Metrics → {metrics_path}, {prom_path}")
+
+
+@contextmanager
+def _serialize_stage(build, profiler, name):
+    # ulostulot kirjoitetaan virtana, joten serialisointi ja kirjoitus
+    # mitataan (ja profiloidaan) yhdessä
+    with build.stage(name):
+        if profiler is None:
+            yield
+        else:
+            with profiler.stage(name):
+                yield
+
+
+def run(
+    sources_path: str,
+    out_dir: str,
+    workers: int = DEFAULT_WORKERS,
+    source_timeout: float = DEFAULT_SOURCE_TIMEOUT,
+    build_timeout: float = DEFAULT_BUILD_TIMEOUT,
+    cache_dir: str = None,
+    cache_max_bytes: int = cache.DEFAULT_MAX_BYTES,
+    per_host: int = client.DEFAULT_PER_HOST,
+    region: str = None,
+    incremental: bool = False,
+    compact_json: bool = False,
+    dedupe_tolerance: float = DEFAULT_TOLERANCE.total_seconds() / 60,
+    dedupe_report: str = None,
+    only: List[str] = None,
+    profile_dir: str = None,
+    profile_top: int = DEFAULT_TOP,
+    record_dir: str = None,
+    replay_dir: str = None,
+    window: BuildWindow = None,
+    refresh=None,
+    store_path: str = None,
+) -> bool:
+    """
+    Palauttaa True, jos ulostulot muuttuivat (ilman --incremental aina True).
+    refresh (watch-tila, vaatii incremental): vain nämä lähteet tarkistetaan,
+    muiden tallennetut tulokset käytetään sellaisenaan.
+    """
+    if only and incremental:
+        # osittainen build sotkisi tallennetut ulostulojen tiivisteet
+        raise SystemExit("--only cannot be combined with --incremental")
+    if refresh is not None and not incremental:
+        raise SystemExit("refresh requires --incremental")
     os.makedirs(out_dir, exist_ok=True)
-
-    data = load_sources(sources_path)
-    events: List[Event] = []
-
-    # ICS sources (esim. julkiset Google-kalenterit)
-    for item in (data.get('ics') or []):
-        try:
-            events.extend(fetch_ics(item['url'], item.get('name')))
-        except Exception as e:
-            print(f"[WARN] ICS failed for {item}: {e}")
-
-    # HTML (JSON-LD) sources (sivut joilla on schema.org/Event datana)
-    for item in (data.get('html') or []):
-        try:
-            events.extend(fetch_jsonld_events(item['url'], item.get('name')))
-        except Exception as e:
-            print(f"[WARN] HTML JSON-LD failed for {item}: {e}")
-
-    # HELSINGIN LUKIOT (regex-scrape)
-    try:
-        events.extend(fetch_all_helfi_lukio())
-    except Exception as e:
-        print(f"[WARN] helfi lukio fetch failed: {e}")
-
-    # STADIN AMMATTIOPISTO
-    try:
-        events.extend(fetch_stadinao_events())
-    except Exception as e:
-        print(f"[WARN] Stadin AO fetch failed: {e}")
-
-    # Vantaan lukiot & Varia
-    try:
-        events.extend(fetch_vantaa_lukio())
-    except Exception as e:
-        print(f"[WARN] Vantaa lukio fetch failed: {e}")
-
-    # VANTAA (manuaalidata, esim. Lumon lukio, Varia, jne)
-    try:
-        events.extend(fetch_vantaa_manual())
-    except Exception as e:
-        print(f"[WARN] Vantaa manual fetch failed: {e}")
-
-    # KEUDA (Keski-Uudenmaan koulutuskuntayhtymä)
+    build = metrics.BuildMetrics()
+    client.configure(per_host=per_host)
+    if record_dir and replay_dir:
+        raise SystemExit("--record and --replay are mutually exclusive")
+    tape = recording.configure(record_dir, replay_dir)
+    http_cache = cache.configure(cache_dir, cache_max_bytes)
+
+    # Lähteet ja niiden kerääjät tulevat sources.yaml:sta
     try:
-        events.extend(fetch_keuda_manual())
-    except Exception as e:
-        print(f"[WARN] Keuda manual fetch failed: {e}")
-
-    # KERAVAN LUKIO (manuaalidata)
-    try:
-        events.extend(fetch_kerava_manual())
-    except Exception as e:
-        print(f"[WARN] Kerava manual fetch failed: {e}")
-
-    # HELSINGIN LUKIOT (manuaalidata esim. Ressu, Märsky, Kallio, Etu-Töölö, Viikin norssi, SYK...)
-    try:
-        events.extend(fetch_helsinki_manual())
-    except Exception as e:
-        print(f"[WARN] Helsinki manual fetch failed: {e}")
-
-    # CAREERIA (manuaalidata)
-    try:
-        events.extend(fetch_careeria_manual())
-    except Exception as e:
-        print(f"[WARN] Careeria manual fetch failed: {e}")
-        
-    # PERHO LIIKETALOUSOPISTO (manuaalidata)
-    try:
-        events.extend(fetch_perho_manual())
-    except Exception as e:
-        print(f"[WARN] Perho manual fetch failed: {e}")
-
-
-    # Suodata + normalisoi ajat
-    now = datetime.now(LOCAL_TZ)
+        sources = select_sources(load_sources(sources_path), region=region, only=only)
+    except ValueError as e:
+        raise SystemExit(str(e))
+
+    profiler = None
+    if profile_dir:
+        profiler = Profiler(profile_dir, top=profile_top)
+        workers = 1
+
+    # Aikaikkuna (--from/--to, oletuksena KEEP_PAST_DAYS päivää taaksepäin
+    # ilman loppua) annetaan kerääjille, jotka ohittavat ikkunan ulkopuoliset
+    # osumat jo jäsennettäessä. Sama ikkuna suodattaa lopuksi kaikki eventit.
+    if window is None:
+        window = default_window(datetime.now(LOCAL_TZ), KEEP_PAST_DAYS)
+    context = {"window": window}
+    # kesäaikasiirtymät ikkunan vuosille kerran; lähteet normalisoivat sillä
+    table = tz.table_for_window(window)
+    jobs = [job._replace(fn=partial(_collect, job.name, table, job.fn)) for job in build_jobs(sources, context)]
+    if profiler is not None:
+        jobs = [job._replace(fn=profiler.wrap(job.name, job.fn)) for job in jobs]
+
+    state = None
+    if incremental:
+        if not cache_dir:
+            raise SystemExit("--incremental requires --cache-dir")
+        state = BuildState(os.path.join(cache_dir, "incremental"),
+                           restore=partial(normalize_events, table=table), context=context)
+        jobs = state.wrap_jobs(sources, jobs, refresh=refresh)
+    jobs = [job._replace(fn=build.wrap(job.name, job.fn)) for job in jobs]
+
+    # Kaikki lähteet ajetaan yhtä aikaa; tulokset yhdistetään jobs-listan
+    # järjestyksessä, jotta events.json pysyy samana ajosta toiseen.
+    events: List[Event] = []
+    event_sources: List[str] = []
+    with build.stage("collect"):
+        results = run_collectors(
+            jobs, workers=workers, source_timeout=source_timeout, build_timeout=build_timeout
+        )
+    for name, source_events in results:
+        events.extend(source_events)
+        event_sources.extend([name] * len(source_events))
+    # aikakatkaistun lähteen säie voi vielä valmistua, joten tila tuloksista
+    finished = {name for name, _ in results}
+    for s in sources:
+        sm = build.source(s.name)
+        sm.status = "ok" if s.name in finished else "missing"
+        if state is not None and s.name in state.reused and s.name in finished:
+            sm.status = "reused"
+    if tape is not None and tape.replay and tape.misses:
+        # toistettu build ei saa hiljaa pudottaa lähteitä
+        raise SystemExit(f"--replay: {len(tape.misses)} request(s) not recorded in {replay_dir}: "
+                         + ", ".join(sorted(set(tape.misses))))
+
+    window_key = _window_label(window)
+    if (state is not None and refresh is not None and not state.rebuilt
+            and len(state.reused) == len(sources) and state.outputs.get(WINDOW_KEY) == window_key):
+        # watch: tarkistetut lähteet ennallaan eikä ikkuna ole siirtynyt,
+        # joten ulostulot olisivat samat; ei suodatusta eikä serialisointia
+        print(f"Sources: 0 rebuilt, {len(state.reused)} reused")
+        print("No changes")
+        write_metrics(build, out_dir)
+        return False
+
+    # Suodata (ajat on jo normalisoitu lähdekohtaisesti)
     keep: List[Event] = []
-
-    def ensure_datetime(dt):
-        """
-        Ottaa joko datetime- tai date-olion ja palauttaa timezone-aware datetime Helsingin ajassa.
-        """
-        if hasattr(dt, "tzinfo"):
-            # dt on datetime-tyyppi (tai datetime-like)
-            if dt.tzinfo is None:
-                # Tulkitaan paikalliseksi ajaksi (Europe/Helsinki), ei UTC:ksi
-                return dt.replace(tzinfo=LOCAL_TZ)
-            return dt.astimezone(LOCAL_TZ)
-        else:
-            # dt on pelkkä date-olio -> tulkitaan klo 00:00 Helsingin aikaa
-            return datetime(dt.year, dt.month, dt.day, 0, 0, tzinfo=LOCAL_TZ)
-
+    keep_sources: List[str] = []
+
+    with build.stage("filter"):
+        for e, source_name in zip(events, event_sources):
+            # kerääjät ovat jo ohittaneet suurimman osan; tämä kattaa loput
+            # (esim. inkrementaalisesti palautetut ja JSON-LD:n naiivit ajat)
+            if window.contains(e.start):
+                keep.append(e)
+                keep_sources.append(source_name)
+
+    with build.stage("dedupe"):
+        produced = len(events)
+        events, merges = dedupe(
+            keep, keep_sources,
+            priorities={s.name: s.priority for s in sources},
+            tolerance=timedelta(minutes=dedupe_tolerance),
+        )
+    source_of = {id(e): name for e, name in zip(keep, keep_sources)}
     for e in events:
-        # normalisoi alku ja loppu datet -> datetimes
-        e.start = ensure_datetime(e.start)
-        if e.end:
-            e.end = ensure_datetime(e.end)
-
-        # suodatus: pidä tulevat + viimeiset 30 päivää
-        if (e.start >= now) or ((now - e.start).days <= 30):
-            keep.append(e)
-
-    events = dedupe(keep)
-    events.sort(key=lambda e: e.start)
+        build.source(source_of[id(e)]).kept += 1
+    pruned = sum(sm.pruned for sm in build.sources.values())
+    build.events.update(pruned=pruned, produced=produced, in_window=len(keep), merged=len(merges), kept=len(events))
+    if pruned:
+        print(f"Window: {pruned} candidates outside {_window_label(window)} skipped by collectors")
+    for m in merges:
+        print(f"[DEDUPE] kept '{m.kept.title}' ({m.kept_source}), "
+              f"dropped '{m.dropped.title}' ({m.dropped_source}): {m.reason}")
+    if dedupe_report:
+        write_atomic(dedupe_report, [json.dumps([m.to_dict() for m in merges], ensure_ascii=False, indent=2)],
+                     compress=False)
+    if store_path:
+        # tietovarasto: tapahtumat talteen historiaan, ja ulostulot luetaan
+        # sieltä (ikkuna ja järjestys kyselyssä)
+        with EventStore(store_path) as store:
+            with build.stage("store"):
+                run_id = store.record(events, [source_of[id(e)] for e in events], build.started)
+            with build.stage("sort"):
+                events = normalize_events(store.current(run_id, window), table)
+            summary = store.summary(run_id)
+        print(f"Store: {summary['new']} new, {summary['total']} events in history → {store_path}")
+    else:
+        with build.stage("sort"):
+            events.sort(key=lambda e: e.start)
 
     # Kirjoita ulostulot
     json_path = os.path.join(out_dir, 'events.json')
     ics_path = os.path.join(out_dir, 'opendoors.ics')
 
-    with open(json_path, 'w', encoding='utf-8') as f:
-        f.write(dump_events_json(events))
-
-    with open(ics_path, 'wb') as f:
-        f.write(dump_events_ics(events))
+    json_chunks = iter_events_json(events, compact=compact_json)
+    ics_chunks = iter_events_ics(events)
+
+    serialize = partial(_serialize_stage, build, profiler)
+    # Kuukausiosat selaimelle; manifestissa on osien tiivisteet, joten sen
+    # muuttumattomuus riittää inkrementaalisen buildin vertailuun
+    manifest_path = os.path.join(out_dir, SHARD_DIR, MANIFEST_NAME)
+
+    if state is None:
+        with serialize("serialize_json"):
+            write_atomic(json_path, json_chunks)
+        with serialize("serialize_ics"):
+            write_atomic(ics_path, ics_chunks)
+        with serialize("serialize_shards"):
+            manifest = write_shards(events, out_dir, compact=compact_json)
+            manifest["search"] = write_search_index(events, out_dir)
+            write_atomic(manifest_path, iter_manifest(manifest))
+        print(f"Wrote {len(events)} events → {json_path}, {ics_path}")
+        print(f"Wrote {len(manifest['shards'])} month shards → {manifest_path}")
+        changed = True
+    else:
+        with serialize("serialize_json"):
+            changed = state.write_output(json_path, json_chunks)
+        with serialize("serialize_ics"):
+            changed = state.write_output(ics_path, ics_chunks) or changed
+        with serialize("serialize_shards"):
+            manifest = write_shards(events, out_dir, compact=compact_json)
+            manifest["search"] = write_search_index(events, out_dir)
+            changed = state.write_output(manifest_path, iter_manifest(manifest)) or changed
+        state.outputs[WINDOW_KEY] = window_key
+        state.save()
+        report_changed(changed)
+        print(f"Sources: {len(state.rebuilt)} rebuilt, {len(state.reused)} reused")
+        if changed:
+            print(f"Wrote {len(events)} events → {json_path}, {ics_path}")
+            print(f"Wrote {len(manifest['shards'])} month shards → {manifest_path}")
+        else:
+            print("No changes")
+    if http_cache is not None:
+        print(f"HTTP cache: {http_cache.hits} hits, {http_cache.misses} misses ({cache_dir})")
 
-    print(f"Wrote {len(events)} events → {json_path}, {ics_path}")
+    write_metrics(build, out_dir)
+    if profiler is not None:
+        print(f"Profiles ({len(profiler.reports)} stages) → {profile_dir}")
+    return changed
 
 
 if __name__ == '__main__':
     ap = argparse.ArgumentParser()
+    ap.add_argument('command', nargs='?', default='build', choices=['build', 'watch', 'serve'],
+                    help='build (oletus), watch: päivitä lähteitä jatkuvasti omilla väleillään, '
+                         'serve: tarjoile --out-hakemiston eventit kyselyinä (/events, /events.ics)')
     ap.add_argument('--sources', default='sources.yaml')
     ap.add_argument('--out', default='dist')
+    ap.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                    help='montako kerääjää ajetaan yhtä aikaa')
+    ap.add_argument('--source-timeout', type=float, default=DEFAULT_SOURCE_TIMEOUT,
+                    help='yhden lähteen aikaraja sekunteina')
+    ap.add_argument('--build-timeout', type=float, default=DEFAULT_BUILD_TIMEOUT,
+                    help='koko keruun aikaraja sekunteina')
+    ap.add_argument('--cache-dir', default=os.environ.get(cache.CACHE_DIR_ENV),
+                    help='HTTP-välimuistin hakemisto (ETag/Last-Modified); oletuksena ei välimuistia')
+    ap.add_argument('--cache-max-mb', type=float, default=cache.DEFAULT_MAX_BYTES / (1024 * 1024),
+                    help='välimuistin kokoraja megatavuina (LRU)')
+    ap.add_argument('--per-host', type=int, default=client.DEFAULT_PER_HOST,
+                    help='samanaikaisten yhteyksien enimmäismäärä yhteen palvelimeen')
+    ap.add_argument('--region', default=None,
+                    help='aja vain tämän alueen lähteet (sources.yaml: region)')
+    ap.add_argument('--incremental', action='store_true',
+                    help='käytä muuttumattomien lähteiden tallennettuja tuloksia (vaatii --cache-dir)')
+    ap.add_argument('--compact-json', action='store_true',
+                    help='kirjoita events.json ilman sisennyksiä')
+    ap.add_argument('--dedupe-tolerance', type=float, default=DEFAULT_TOLERANCE.total_seconds() / 60,
+                    help='alkuaikojen ero (min), jonka sisällä samankaltaiset eventit yhdistetään')
+    ap.add_argument('--dedupe-report', default=None,
+                    help='kirjoita yhdistetyt eventit ja syyt JSON-tiedostoon')
+    ap.add_argument('--only', action='append', default=None, metavar='SOURCE',
+                    help='aja vain nimetty lähde (voi toistaa)')
+    ap.add_argument('--profile', nargs='?', const='', default=None, metavar='DIR',
+                    help='profiloi kerääjät ja serialisointi (cProfile + tracemalloc); '
+                         'oletushakemisto <out>/profile')
+    ap.add_argument('--profile-top', type=int, default=DEFAULT_TOP,
+                    help='montako riviä muistiraporttiin')
+    ap.add_argument('--from', dest='from_', default=None, metavar='DATE',
+                    help=f'aikaikkunan alku (YYYY-MM-DD tai ISO-aika); oletus {KEEP_PAST_DAYS} päivää sitten')
+    ap.add_argument('--to', default=None, metavar='DATE',
+                    help='aikaikkunan loppu (päivä mukaan lukien); oletuksena ei loppua')
+    tape_group = ap.add_mutually_exclusive_group()
+    tape_group.add_argument('--record', default=None, metavar='DIR',
+                            help='tallenna kaikki HTTP-vastaukset hakemistoon')
+    tape_group.add_argument('--replay', default=None, metavar='DIR',
+                            help='toista tallennetut vastaukset ilman verkkoa; nauhoittamaton pyyntö on virhe')
+    ap.add_argument('--refresh', default=format_interval(DEFAULT_REFRESH), metavar='INTERVAL',
+                    help='watch: päivitysväli lähteille ilman omaa refresh-arvoa (esim. 30m, 6h)')
+    ap.add_argument('--poll', type=float, default=DEFAULT_POLL,
+                    help='watch: data/*.yaml- ja sources.yaml-muutosten tarkistusväli sekunteina')
+    ap.add_argument('--store', default=None, metavar='PATH',
+                    help='SQLite-tietovarasto: tapahtumat säilyvät historiana, ulostulot luetaan siitä')
+    ap.add_argument('--host', default=serve.DEFAULT_HOST, help='serve: kuunneltava osoite')
+    ap.add_argument('--port', type=int, default=serve.DEFAULT_PORT, help='serve: portti')
     args = ap.parse_args()
-    run(args.sources, args.out)
+    if args.command == 'serve':
+        try:
+            serve.serve(args.out, host=args.host, port=args.port)
+        except KeyboardInterrupt:
+            print("Server stopped")
+        raise SystemExit(0)
+    window = None
+    if args.from_ or args.to:
+        try:
+            window = BuildWindow(
+                since=parse_bound(args.from_) if args.from_ else default_window(
+                    datetime.now(LOCAL_TZ), KEEP_PAST_DAYS).since,
+                until=parse_bound(args.to, end=True) if args.to else None,
+            )
+        except ValueError as e:
+            ap.error(str(e))
+    profile_dir = None
+    if args.profile is not None:
+        profile_dir = args.profile or os.path.join(args.out, 'profile')
+    options = dict(
+        workers=args.workers,
+        source_timeout=args.source_timeout, build_timeout=args.build_timeout,
+        cache_dir=args.cache_dir, cache_max_bytes=int(args.cache_max_mb * 1024 * 1024),
+        per_host=args.per_host, region=args.region, incremental=args.incremental,
+        compact_json=args.compact_json, dedupe_tolerance=args.dedupe_tolerance,
+        dedupe_report=args.dedupe_report, only=args.only,
+        profile_dir=profile_dir, profile_top=args.profile_top,
+        record_dir=args.record, replay_dir=args.replay, window=window, store_path=args.store)
+    if args.command == 'watch':
+        # watch käyttää aina inkrementaalista tilaa: vuorossa olemattomien
+        # lähteiden tulokset tulevat sieltä
+        if not args.cache_dir:
+            ap.error('watch requires --cache-dir')
+        if args.only:
+            ap.error('--only cannot be combined with watch')
+        try:
+            default_refresh = parse_interval(args.refresh)
+        except ValueError as e:
+            ap.error(str(e))
+        options["incremental"] = True
+        watcher = Watcher(args.sources, lambda refresh: run(args.sources, args.out, refresh=refresh, **options),
+                          region=args.region, default_refresh=default_refresh, poll=args.poll)
+        try:
+            watcher.run()
+        except KeyboardInterrupt:
+            print("Watch stopped")
+    else:
+        run(args.sources, args.out, **options)
@@ -0,0 +1,217 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, Iterator, Optional
+
+# Buildin mittarit: vaiheiden seinäkelloajat lähteittäin (fetch, parse,
+# normalize) ja koko buildille (filter, dedupe, sort, serialize), ladatut
+# tavut, välimuistin osumat ja tuotetut vs. säilytetyt eventit. Kerääjäsäie
+# merkitsee lähteensä contextvariin, joten client.fetch osaa kirjata haun
+# oikealle lähteelle ilman että kerääjiä tarvitsee muuttaa.
+
+PREFIX = "opendoors"
+
+
+@dataclass
+class SourceMetrics:
+    name: str
+    status: str = "missing"   # ok / reused / missing (epäonnistui tai aikakatkaisu)
+    stages: Dict[str, float] = field(default_factory=dict)
+    requests: int = 0
+    bytes: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    produced: int = 0
+    kept: int = 0
+    pruned: int = 0           # aikaikkunan ulkopuolelta ohitetut ehdokkaat (ks. window.py)
+
+    def add_stage(self, stage: str, seconds: float) -> None:
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def to_dict(self) -> dict:
+        return {
+            "status": self.status,
+            "stages": {k: round(v, 6) for k, v in self.stages.items()},
+            "requests": self.requests,
+            "bytes": self.bytes,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "produced": self.produced,
+            "kept": self.kept,
+            "pruned": self.pruned,
+        }
+
+
+_current: ContextVar[Optional[SourceMetrics]] = ContextVar("current_source", default=None)
+_lock = threading.Lock()
+
+
+class BuildMetrics:
+    def __init__(self):
+        self.started = datetime.now(timezone.utc)
+        self._t0 = time.perf_counter()
+        self.duration = 0.0
+        self.stages: Dict[str, float] = {}
+        self.sources: Dict[str, SourceMetrics] = {}
+        self.events: Dict[str, int] = {}
+
+    def source(self, name: str) -> SourceMetrics:
+        with _lock:
+            if name not in self.sources:
+                self.sources[name] = SourceMetrics(name)
+            return self.sources[name]
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - t0
+
+    def wrap(self, name: str, fn):
+        """
+        Kerääjän kääre: merkitsee lähteen säikeelle ja mittaa koko keruun.
+        parse = koko keruu - fetch - normalize.
+        """
+        def run():
+            sm = self.source(name)
+            token = _current.set(sm)
+            t0 = time.perf_counter()
+            try:
+                events = fn()
+                sm.status = "ok"
+                sm.produced = len(events or [])
+                return events
+            finally:
+                total = time.perf_counter() - t0
+                other = sum(v for k, v in sm.stages.items() if k != "parse")
+                sm.add_stage("parse", max(0.0, total - other))
+                _current.reset(token)
+        return run
+
+    def finish(self) -> None:
+        self.duration = time.perf_counter() - self._t0
+
+    def totals(self) -> dict:
+        return {
+            "requests": sum(s.requests for s in self.sources.values()),
+            "bytes": sum(s.bytes for s in self.sources.values()),
+            "cache_hits": sum(s.cache_hits for s in self.sources.values()),
+            "cache_misses": sum(s.cache_misses for s in self.sources.values()),
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            "started": self.started.isoformat(timespec="seconds"),
+            "duration_s": round(self.duration, 6),
+            "stages": {k: round(v, 6) for k, v in self.stages.items()},
+            "events": dict(self.events),
+            "http": self.totals(),
+            "sources": {name: s.to_dict() for name, s in self.sources.items()},
+        }
+
+    def iter_json(self) -> Iterator[str]:
+        yield json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+        yield "\n"
+
+    def iter_prometheus(self) -> Iterator[str]:
+        """Prometheus textfile -muoto (node_exporterin textfile collector)."""
+        def metric(name, kind, help_text, samples):
+            yield f"# HELP {PREFIX}_{name} {help_text}\n"
+            yield f"# TYPE {PREFIX}_{name} {kind}\n"
+            for labels, value in samples:
+                label_str = ",".join(f'{k}="{_escape_label(v)}"' for k, v in labels.items())
+                if label_str:
+                    label_str = "{" + label_str + "}"
+                yield f"{PREFIX}_{name}{label_str} {_fmt(value)}\n"
+
+        sources = list(self.sources.values())
+        yield from metric("build_timestamp_seconds", "gauge", "Build start time (unix).",
+                          [({}, self.started.timestamp())])
+        yield from metric("build_duration_seconds", "gauge", "Build wall time.", [({}, self.duration)])
+        yield from metric("build_stage_seconds", "gauge", "Wall time per build stage.",
+                          [({"stage": k}, v) for k, v in self.stages.items()])
+        yield from metric("build_events", "gauge", "Events per build step.",
+                          [({"kind": k}, v) for k, v in self.events.items()])
+        yield from metric("source_up", "gauge", "1 if the source produced a result.",
+                          [({"source": s.name}, 0 if s.status == "missing" else 1) for s in sources])
+        yield from metric("source_reused", "gauge", "1 if the result was reused from the incremental state.",
+                          [({"source": s.name}, 1 if s.status == "reused" else 0) for s in sources])
+        yield from metric("source_stage_seconds", "gauge", "Wall time per source and stage.",
+                          [({"source": s.name, "stage": k}, v) for s in sources for k, v in s.stages.items()])
+        yield from metric("source_requests", "gauge", "HTTP requests per source.",
+                          [({"source": s.name}, s.requests) for s in sources])
+        yield from metric("source_bytes", "gauge", "Bytes downloaded per source.",
+                          [({"source": s.name}, s.bytes) for s in sources])
+        yield from metric("source_cache_hits", "gauge", "HTTP cache hits (304) per source.",
+                          [({"source": s.name}, s.cache_hits) for s in sources])
+        yield from metric("source_cache_misses", "gauge", "HTTP cache misses per source.",
+                          [({"source": s.name}, s.cache_misses) for s in sources])
+        yield from metric("source_events", "gauge", "Events produced, kept and pruned early per source.",
+                          [({"source": s.name, "kind": kind}, getattr(s, kind))
+                           for s in sources for kind in ("produced", "kept", "pruned")])
+
+
+def _escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt(value) -> str:
+    if isinstance(value, float):
+        return repr(round(value, 6))
+    return str(value)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Mittaa vaiheen nykyiselle lähteelle (ei mitään, jos lähdettä ei ole)."""
+    sm = _current.get()
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        if sm is not None:
+            sm.add_stage(name, time.perf_counter() - t0)
+
+
+def count_pruned(n: int) -> None:
+    """Kerääjä kertoo, montako ehdokasta se ohitti aikaikkunan takia."""
+    sm = _current.get()
+    if sm is None or not n:
+        return
+    with _lock:
+        sm.pruned += n
+
+
+def count_bytes(n: int) -> None:
+    """Striimattu vastaus (client.fetch(stream=True)) kertoo tavumääränsä vasta, kun runko on luettu."""
+    sm = _current.get()
+    if sm is None or not n:
+        return
+    with _lock:
+        sm.bytes += n
+
+
+def record_fetch(seconds: float, response=None, memo: bool = False, streamed: bool = False) -> None:
+    """client.fetch kutsuu tätä jokaisesta hausta."""
+    sm = _current.get()
+    if sm is None:
+        return
+    with _lock:
+        sm.add_stage("fetch", seconds)
+        if memo:
+            return
+        sm.requests += 1
+        if response is None:
+            return  # haku epäonnistui
+        if getattr(response, "from_cache", False):
+            sm.cache_hits += 1
+        else:
+            sm.cache_misses += 1
+            if not streamed:
+                sm.bytes += len(response.content or b"")
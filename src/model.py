@@ -1,12 +1,16 @@
 
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional, List
-from icalendar import Calendar, Event as ICalEvent, vText
+from typing import Iterable, Iterator, Optional, List
 import hashlib
 import json
+import sys
 
-@dataclass
+from .ical import iter_calendar
+from .search import detect_tag
+
+
+@dataclass(slots=True)
 class Event:
     title: str
     start: datetime
@@ -15,41 +19,97 @@ class Event:
     url: Optional[str] = None
     organizer: Optional[str] = None
     source_url: Optional[str] = None
+    # id:n välimuisti ja kentät joista se laskettiin
+    _id: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    _id_key: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # Sama järjestäjä/paikka toistuu tuhansissa eventeissä -> yksi olio
+        if type(self.organizer) is str:
+            self.organizer = sys.intern(self.organizer)
+        if type(self.location) is str:
+            self.location = sys.intern(self.location)
 
     @property
     def id(self) -> str:
-        base = f"{self.title}|{self.start.isoformat()}|{self.location or ''}"
-        return hashlib.sha1(base.encode('utf-8')).hexdigest()
+        # Lasketaan kerran; uudelleen vain jos title/start/location vaihtuu
+        # (esim. main.normalize_events korvaa startin aikavyöhykkeellisellä)
+        key = self._id_key
+        if (
+            key is None
+            or key[0] is not self.title
+            or key[1] is not self.start
+            or key[2] is not self.location
+        ):
+            base = f"{self.title}|{self.start.isoformat()}|{self.location or ''}"
+            self._id = hashlib.sha1(base.encode('utf-8')).hexdigest()
+            self._id_key = (self.title, self.start, self.location)
+        return self._id
+
+    @property
+    def tag(self) -> str:
+        # selaimen suodatin (lukio / stadinao), ks. search.detect_tag
+        return detect_tag(self.organizer)
 
     def to_dict(self):
-        d = asdict(self)
-        d['id'] = self.id
-        # ISO format with timezone when available
-        for k in ['start', 'end']:
-            if d.get(k):
-                d[k] = d[k].isoformat()
-        return d
+        # Sama avainjärjestys kuin dataclasses.asdict + id, ilman syväkopiota
+        start = self.start
+        end = self.end
+        return {
+            'title': self.title,
+            # ISO format with timezone when available
+            'start': start.isoformat() if start else start,
+            'end': end.isoformat() if end else end,
+            'location': self.location,
+            'url': self.url,
+            'organizer': self.organizer,
+            'source_url': self.source_url,
+            'id': self.id,
+            'tag': self.tag,
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> 'Event':
+        # to_dict():n käänteinen (id lasketaan uudelleen kentistä)
+        return cls(
+            title=d['title'],
+            start=datetime.fromisoformat(d['start']),
+            end=datetime.fromisoformat(d['end']) if d.get('end') else None,
+            location=d.get('location'),
+            url=d.get('url'),
+            organizer=d.get('organizer'),
+            source_url=d.get('source_url'),
+        )
 
 
-def dump_events_json(events: List[Event]) -> str:
-    payload = [e.to_dict() for e in events]
-    return json.dumps(payload, ensure_ascii=False, indent=2)
+def iter_events_json(events: Iterable[Event], compact: bool = False) -> Iterator[str]:
+    """
+    Kirjoittaa JSON-taulukon event kerrallaan. Oletusmuoto on tavu tavulta
+    sama kuin json.dumps(..., indent=2); compact=True jättää sisennykset pois.
+    """
+    first = True
+    for e in events:
+        if compact:
+            item = json.dumps(e.to_dict(), ensure_ascii=False, separators=(',', ':'))
+            yield ('[' if first else ',') + item
+        else:
+            item = json.dumps(e.to_dict(), ensure_ascii=False, indent=2)
+            yield ('[\n  ' if first else ',\n  ') + item.replace('\n', '\n  ')
+        first = False
+    if first:
+        yield '[]'
+    else:
+        yield ']' if compact else '\n]'
+
+
+def dump_events_json(events: List[Event], compact: bool = False) -> str:
+    return ''.join(iter_events_json(events, compact=compact))
+
+
+def iter_events_ics(events: Iterable[Event]) -> Iterator[bytes]:
+    """Kirjoittaa kalenterin VEVENT kerrallaan (ks. ical.py)."""
+    return iter_calendar(events)
 
 
 def dump_events_ics(events: List[Event]) -> bytes:
-    cal = Calendar()
-    cal.add('prodid', '-//OpenDoorsBot//EN')
-    cal.add('version', '2.0')
-    for e in events:
-        ve = ICalEvent()
-        ve.add('uid', e.id + '@opendoors.bot')
-        ve.add('summary', vText(e.title))
-        ve.add('dtstart', e.start)
-        if e.end:
-            ve.add('dtend', e.end)
-        if e.location:
-            ve.add('location', vText(e.location))
-        if e.url:
-            ve.add('url', vText(e.url))
-        cal.add_component(ve)
-    return cal.to_ical()
+    return b''.join(iter_events_ics(events))
@@ -0,0 +1,122 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Callable, List, NamedTuple, Optional, Tuple
+
+from .model import Event
+
+
+class Job(NamedTuple):
+    name: str
+    fn: Callable[[], List[Event]]
+    # lähdekohtainen aikaraja; None = run_collectors-kutsun oletus
+    timeout: Optional[float] = None
+    # suurempi prioriteetti käynnistetään ensin
+    priority: int = 0
+
+DEFAULT_WORKERS = 8
+DEFAULT_SOURCE_TIMEOUT = 120.0
+DEFAULT_BUILD_TIMEOUT = 600.0
+
+
+def run_collectors(
+    jobs: List[Job],
+    workers: int = DEFAULT_WORKERS,
+    source_timeout: float = DEFAULT_SOURCE_TIMEOUT,
+    build_timeout: float = DEFAULT_BUILD_TIMEOUT,
+) -> List[Tuple[str, List[Event]]]:
+    """
+    Ajaa kerääjät rinnakkain `workers` daemon-säikeessä.
+
+    - source_timeout: yhden lähteen seinäkelloaika sen käynnistymisestä
+      (Job.timeout ohittaa tämän lähdekohtaisesti)
+    - build_timeout: koko keruun yläraja
+
+    Palauttaa (nimi, eventit) -parit samassa järjestyksessä kuin `jobs`,
+    jotta lopputulos on deterministinen riippumatta valmistumisjärjestyksestä.
+    Aikarajan ylittäneet tai kaatuneet lähteet jätetään pois ja niistä
+    tulostetaan [WARN]. Jumiin jäänyttä säiettä ei voi tappaa, mutta sen
+    tulosta ei enää odoteta, eikä se estä prosessin päättymistä.
+    """
+    build_deadline = time.monotonic() + build_timeout
+    started = {}
+    lock = threading.Lock()
+    results = {}
+
+    # Omat daemon-säikeet ThreadPoolExecutorin sijaan: concurrent.futures
+    # liittää työsäikeensä tulkin sammuessa, jolloin jumiin jäänyt kerääjä
+    # pitäisi CI-ajon käynnissä --build-timeoutin jälkeenkin.
+    index = {}
+    queue = deque()
+    for i in sorted(range(len(jobs)), key=lambda i: -jobs[i].priority):
+        f = Future()
+        index[f] = i
+        queue.append((i, f))
+
+    def worker():
+        while True:
+            with lock:
+                if not queue:
+                    return
+                i, f = queue.popleft()
+            if not f.set_running_or_notify_cancel():
+                continue
+            with lock:
+                started[i] = time.monotonic()
+            try:
+                f.set_result(jobs[i].fn())
+            except BaseException as e:
+                f.set_exception(e)
+
+    for k in range(min(max(1, workers), len(jobs))):
+        threading.Thread(target=worker, name=f"collector-{k}", daemon=True).start()
+
+    pending = set(index)
+    try:
+        while pending:
+            now = time.monotonic()
+            if now >= build_deadline:
+                for f in sorted(pending, key=index.get):
+                    f.cancel()
+                    print(f"[WARN] {jobs[index[f]].name} did not finish within build deadline ({build_timeout:.0f}s)")
+                break
+
+            # Lähdekohtaiset aikarajat lasketaan siitä kun työ oikeasti alkoi
+            next_check = build_deadline
+            with lock:
+                running = {f: started[index[f]] for f in pending if index[f] in started}
+            for f, t0 in running.items():
+                limit = jobs[index[f]].timeout or source_timeout
+                if now - t0 >= limit:
+                    pending.discard(f)
+                    f.cancel()
+                    print(f"[WARN] {jobs[index[f]].name} timed out after {limit:.0f}s")
+                else:
+                    next_check = min(next_check, t0 + limit)
+
+            if not pending:
+                break
+
+            done, _ = wait(pending, timeout=max(0.05, min(next_check - now, 1.0)),
+                           return_when=FIRST_COMPLETED)
+            for f in done:
+                pending.discard(f)
+                name = jobs[index[f]].name
+                try:
+                    results[index[f]] = list(f.result() or [])
+                except Exception as e:
+                    print(f"[WARN] {name} failed: {e}")
+    finally:
+        # jonossa olevia ei enää käynnistetä
+        with lock:
+            for _i, f in queue:
+                f.cancel()
+            queue.clear()
+
+    abandoned = [jobs[index[f]].name for f in sorted(index, key=index.get) if f.running()]
+    if abandoned:
+        print(f"[WARN] abandoned {len(abandoned)} collector thread(s) still running: {', '.join(abandoned)}"
+              " (daemon threads, not waited for at exit)")
+
+    return [(jobs[i].name, results[i]) for i in range(len(jobs)) if i in results]
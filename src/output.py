@@ -0,0 +1,102 @@
+import gzip
+import hashlib
+import os
+import tempfile
+from typing import Iterable, Tuple, Union
+
+# Ulostulojen kirjoitus: sisältö virtaa väliaikaistiedostoon, joka fsyncataan
+# ja nimetään lopulliseksi vasta lopuksi (os.replace on atominen). Kaatuminen
+# kesken kirjoituksen ei siis koskaan jätä sivustolle katkennutta tiedostoa.
+# Samalla kirjoitetaan .gz-sisar staattista hostausta varten.
+
+Chunk = Union[str, bytes]
+
+
+def _file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _fsync_dir(path: str) -> None:
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return  # esim. Windows
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def write_atomic(
+    path: str,
+    chunks: Iterable[Chunk],
+    compress: bool = True,
+    skip_if_unchanged: bool = True,
+) -> Tuple[str, bool]:
+    """
+    Kirjoittaa `chunks`-osat tiedostoon `path` atomisesti (+ `path`.gz).
+    Palauttaa (sha256, kirjoitettiinko). Jos skip_if_unchanged ja levyllä on
+    jo sama sisältö, tiedostoihin ei kosketa (mtime säilyy).
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    base = os.path.basename(path)
+    h = hashlib.sha256()
+
+    fd, tmp = tempfile.mkstemp(prefix=f".{base}.", suffix=".tmp", dir=directory)
+    gz_tmp = None
+    try:
+        with os.fdopen(fd, "wb") as f:
+            gz_raw = gz = None
+            if compress:
+                gz_fd, gz_tmp = tempfile.mkstemp(prefix=f".{base}.gz.", suffix=".tmp", dir=directory)
+                gz_raw = os.fdopen(gz_fd, "wb")
+                # mtime=0 -> sama sisältö tuottaa saman .gz:n
+                gz = gzip.GzipFile(filename="", mode="wb", fileobj=gz_raw, compresslevel=9, mtime=0)
+            try:
+                for chunk in chunks:
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode("utf-8")
+                    h.update(chunk)
+                    f.write(chunk)
+                    if gz is not None:
+                        gz.write(chunk)
+                f.flush()
+                os.fsync(f.fileno())
+            finally:
+                if gz is not None:
+                    gz.close()
+                    gz_raw.flush()
+                    os.fsync(gz_raw.fileno())
+                    gz_raw.close()
+
+        digest = h.hexdigest()
+        gz_path = path + ".gz"
+        if (
+            skip_if_unchanged
+            and os.path.exists(path)
+            and (not compress or os.path.exists(gz_path))
+            and _file_sha256(path) == digest
+        ):
+            return digest, False
+
+        # mkstemp luo tiedostot oikeuksilla 0600
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+        tmp = None
+        if gz_tmp is not None:
+            os.chmod(gz_tmp, 0o644)
+            os.replace(gz_tmp, gz_path)
+            gz_tmp = None
+        _fsync_dir(directory)
+        return digest, True
+    finally:
+        for leftover in (tmp, gz_tmp):
+            if leftover is not None and os.path.exists(leftover):
+                os.remove(leftover)
@@ -0,0 +1,89 @@
+import cProfile
+import os
+import re
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Iterator, List, NamedTuple
+
+# Valinnainen profilointi (--profile): jokainen kerääjä ja serialisointi
+# ajetaan cProfilen ja tracemallocin alla, ja vaiheesta kirjoitetaan
+# <vaihe>.pstats (python -m pstats / snakeviz) sekä <vaihe>.alloc.txt
+# (eniten muistia varanneet rivit). tracemalloc on prosessin laajuinen,
+# joten profiloitaessa kerääjät ajetaan yksi kerrallaan (workers=1).
+
+DEFAULT_TOP = 25
+
+
+class StageReport(NamedTuple):
+    stage: str
+    seconds: float
+    peak_bytes: int
+    pstats_path: str
+    alloc_path: str
+
+
+def _slug(name: str) -> str:
+    return re.sub(r"[^\w.-]+", "_", name).strip("_") or "stage"
+
+
+def _mib(n: int) -> str:
+    return f"{n / (1024 * 1024):.2f} MiB"
+
+
+class Profiler:
+    def __init__(self, out_dir: str, top: int = DEFAULT_TOP):
+        self.out_dir = out_dir
+        self.top = top
+        self.reports: List[StageReport] = []
+        os.makedirs(out_dir, exist_ok=True)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        # sisäkkäisiä vaiheita ei tueta: tracemalloc on yksi koko prosessille
+        if tracemalloc.is_tracing():
+            yield
+            return
+        profile = cProfile.Profile()
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            seconds = time.perf_counter() - t0
+            snapshot = tracemalloc.take_snapshot()
+            _current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            self._write(name, profile, snapshot, seconds, peak)
+
+    def wrap(self, name: str, fn):
+        """Kerääjän kääre; cProfile profiloi vain kutsuvan säikeen."""
+        def run():
+            with self.stage(f"collector-{name}"):
+                return fn()
+        return run
+
+    def _write(self, name, profile, snapshot, seconds, peak) -> None:
+        base = os.path.join(self.out_dir, _slug(name))
+        pstats_path = base + ".pstats"
+        alloc_path = base + ".alloc.txt"
+        profile.dump_stats(pstats_path)
+
+        snapshot = snapshot.filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        ))
+        stats = snapshot.statistics("lineno")
+        with open(alloc_path, "w", encoding="utf-8") as f:
+            f.write(f"# {name}: {seconds:.3f} s, peak {_mib(peak)}, "
+                    f"retained {_mib(sum(s.size for s in stats))} at end of stage\n")
+            f.write(f"# top {self.top} lines by retained size\n")
+            for s in stats[:self.top]:
+                frame = s.traceback[0]
+                f.write(f"{s.size / 1024:>10.1f} KiB {s.count:>8} blocks  {frame.filename}:{frame.lineno}\n")
+
+        self.reports.append(StageReport(name, seconds, peak, pstats_path, alloc_path))
+        print(f"[PROFILE] {name}: {seconds:.3f}s, peak {_mib(peak)} → {pstats_path}")
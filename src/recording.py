@@ -0,0 +1,121 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from typing import List, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from .cache import CachedResponse
+
+# HTTP-vastausten nauhoitus ja toisto (--record / --replay). Nauhoitettaessa
+# jokainen client.fetch-vastaus tallennetaan hakemistoon; toistettaessa
+# vastaukset luetaan sieltä eikä verkkoon oteta yhteyttä. Nauhoittamaton
+# pyyntö on toistossa virhe (ReplayMiss), ja build päättyy virheeseen.
+
+SAVED_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+
+class ReplayMiss(requests.ConnectionError):
+    """Pyyntöä ei ole nauhoitettu (--replay)."""
+
+
+class RecordedResponse(CachedResponse):
+    def __init__(self, url: str, content: bytes, encoding: Optional[str], status_code: int, headers: dict):
+        super().__init__(url, content, encoding, from_cache=False)
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} (recorded) for url: {self.url}", response=self)
+
+
+class Tape:
+    def __init__(self, directory: str, replay: bool):
+        self.directory = directory
+        self.replay = replay
+        self.misses: List[str] = []
+        self._lock = threading.Lock()
+        if not replay:
+            os.makedirs(directory, exist_ok=True)
+        self._index_path = os.path.join(directory, "index.json")
+        try:
+            with open(self._index_path, "r", encoding="utf-8") as f:
+                self._index = json.load(f)
+        except FileNotFoundError:
+            if replay:
+                raise SystemExit(f"--replay: no recording in {directory}")
+            self._index = {}
+
+    @staticmethod
+    def _key(url: str, headers: Optional[dict]) -> str:
+        # sama sivu eri User-Agentilla voi palauttaa eri sisällön
+        user_agent = (headers or {}).get("User-Agent") or ""
+        return hashlib.sha1(f"{user_agent}\n{url}".encode("utf-8")).hexdigest()
+
+    def _body_path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".body")
+
+    def save(self, url: str, headers: Optional[dict], resp, body_path: Optional[str] = None) -> None:
+        """Nauhoittaa vastauksen; striimatun vastauksen runko on valmiiksi tiedostossa `body_path`."""
+        key = self._key(url, headers)
+        if body_path is None:
+            body_path = self._body_path(key) + ".tmp"
+            with open(body_path, "wb") as f:
+                f.write(resp.content)
+            encoding = resp.encoding or getattr(resp, "apparent_encoding", None)
+        else:
+            encoding = resp.encoding
+        os.replace(body_path, self._body_path(key))
+        resp_headers = getattr(resp, "headers", None) or {}
+        with self._lock:
+            self._index[key] = {
+                "url": url,
+                "user_agent": (headers or {}).get("User-Agent"),
+                "status": resp.status_code,
+                "encoding": encoding,
+                "headers": {h: resp_headers[h] for h in SAVED_HEADERS if h in resp_headers},
+            }
+            tmp = self._index_path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._index, f, ensure_ascii=False, indent=1, sort_keys=True)
+            os.replace(tmp, self._index_path)
+
+    def staging_file(self):
+        fd, path = tempfile.mkstemp(dir=self.directory, suffix=".part")
+        return os.fdopen(fd, "wb"), path
+
+    def load(self, url: str, headers: Optional[dict]) -> RecordedResponse:
+        key = self._key(url, headers)
+        entry = self._index.get(key)
+        if entry is None or not os.path.exists(self._body_path(key)):
+            with self._lock:
+                self.misses.append(url)
+            raise ReplayMiss(f"not recorded: {url}")
+        with open(self._body_path(key), "rb") as f:
+            content = f.read()
+        return RecordedResponse(url, content, entry.get("encoding"), entry["status"], entry.get("headers", {}))
+
+
+_tape: Optional[Tape] = None
+
+
+def configure(record_dir: Optional[str] = None, replay_dir: Optional[str] = None) -> Optional[Tape]:
+    """Ottaa nauhoituksen tai toiston käyttöön (tai molemmat pois)."""
+    global _tape
+    if record_dir and replay_dir:
+        raise ValueError("record and replay are mutually exclusive")
+    if replay_dir:
+        _tape = Tape(replay_dir, replay=True)
+    elif record_dir:
+        _tape = Tape(record_dir, replay=False)
+    else:
+        _tape = None
+    return _tape
+
+
+def get_tape() -> Optional[Tape]:
+    return _tape
@@ -0,0 +1,181 @@
+import importlib
+import inspect
+import re
+from dataclasses import dataclass, field
+from functools import partial
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+import yaml
+
+from .orchestrator import Job
+
+if TYPE_CHECKING:
+    from .collectors.textscan import PatternSet
+
+# Kerääjätyypit: sources.yaml:n `type` -> (moduuli, funktio, parametrien nimet).
+# Parametrien nimet kertovat mitkä sources.yaml-avaimet välitetään funktiolle
+# ja millä nimellä ("yaml-avain" tai ("yaml-avain", "argumentti")).
+# Moduuli ladataan vasta kun tyyppiä oikeasti käytetään.
+COLLECTORS: Dict[str, tuple] = {
+    "ics": (".collectors.ics", "fetch_ics", ["url", ("name", "source_name")]),
+    "jsonld": (".collectors.jsonld", "fetch_jsonld_events", ["url", ("name", "source_name")]),
+    "helfi_regex": (".collectors.helfi_lukio", "fetch_helfi_lukio", ["name", "url", "location"]),
+    "vantaa_regex": (".collectors.vantaa_lukio", "fetch_vantaa_lukio", ["name", "url", "location"]),
+    "stadinao": (".collectors.stadinao", "fetch_stadinao_events", ["name", "url", "location"]),
+    "manual_yaml": (".collectors.manual_yaml", "fetch_manual_yaml",
+                    ["path", "default_title", "default_organizer"]),
+}
+
+# Avaimet jotka koskevat ajoa, eivät kerääjää
+META_KEYS = {"name", "type", "enabled", "priority", "timeout", "region", "refresh"}
+
+# watch-tilan päivitysväli: sekunteja tai 30s / 15m / 1h / 1d
+_INTERVAL = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([smhd]?)\s*$")
+_INTERVAL_UNITS = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400}
+
+# Regex-kerääjien kuviojoukot (patterns.yaml) ja tyyppien oletusjoukot.
+# Lähde voi valita toisen joukon avaimella `patterns: <nimi>`.
+PATTERNS_PATH = Path(__file__).resolve().parents[1] / "patterns.yaml"
+DEFAULT_PATTERN_SETS = {
+    "helfi_regex": "helfi",
+    "vantaa_regex": "vantaa",
+    "stadinao": "stadinao",
+}
+
+
+@dataclass
+class Source:
+    name: str
+    type: str
+    params: dict = field(default_factory=dict)
+    enabled: bool = True
+    priority: int = 0
+    timeout: Optional[float] = None
+    region: Optional[str] = None
+    refresh: Optional[float] = None   # watch: päivitysväli sekunteina
+    # käännetty kuviojoukko (textscan.PatternSet) regex-kerääjille
+    pattern_set: Optional["PatternSet"] = field(default=None, repr=False)
+
+
+def _source_from_item(item: dict, defaults: dict) -> Source:
+    merged = {**defaults, **item}
+    return Source(
+        name=merged.get("name") or merged.get("url") or merged.get("path"),
+        type=merged["type"],
+        params={k: v for k, v in item.items() if k not in META_KEYS or k == "name"},
+        enabled=bool(merged.get("enabled", True)),
+        priority=int(merged.get("priority", 0)),
+        timeout=merged.get("timeout"),
+        region=merged.get("region"),
+        refresh=parse_interval(merged.get("refresh")),
+    )
+
+
+def parse_interval(value) -> Optional[float]:
+    if value is None:
+        return None
+    m = _INTERVAL.match(str(value))
+    if not m or float(m.group(1)) <= 0:
+        raise ValueError(f"invalid refresh interval {value!r} (e.g. 900, 15m, 6h, 1d)")
+    return float(m.group(1)) * _INTERVAL_UNITS[m.group(2)]
+
+
+def load_pattern_specs(path: Path = PATTERNS_PATH) -> Dict[str, dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        return yaml.safe_load(f) or {}
+
+
+def parse_sources(data: dict, pattern_specs: Optional[Dict[str, dict]] = None) -> List[Source]:
+    """
+    `pattern_specs` on patterns.yaml:n sisältö (oletuksena luetaan repon
+    juuresta); sources.yaml:n oma `patterns:`-osio lisää tai korvaa joukkoja.
+    """
+    defaults = {k: v for k, v in (data.get("defaults") or {}).items() if k in META_KEYS}
+    sources = []
+    for item in (data.get("sources") or []):
+        sources.append(_source_from_item(item, defaults))
+
+    # Vanha muoto: pelkät ics- ja html-listat
+    for item in (data.get("ics") or []):
+        sources.append(_source_from_item({"type": "ics", **item}, defaults))
+    for item in (data.get("html") or []):
+        sources.append(_source_from_item({"type": "jsonld", **item}, defaults))
+
+    seen = set()
+    for s in sources:
+        if s.type not in COLLECTORS:
+            raise ValueError(f"unknown collector type {s.type!r} for source {s.name!r}")
+        if s.name in seen:
+            raise ValueError(f"duplicate source name {s.name!r}")
+        seen.add(s.name)
+
+    needs_patterns = [s for s in sources if s.type in DEFAULT_PATTERN_SETS]
+    if needs_patterns:
+        from .collectors.textscan import compile_pattern_sets
+        if pattern_specs is None:
+            pattern_specs = load_pattern_specs()
+        sets = compile_pattern_sets({**pattern_specs, **(data.get("patterns") or {})})
+        for s in needs_patterns:
+            set_name = s.params.get("patterns", DEFAULT_PATTERN_SETS[s.type])
+            if set_name not in sets:
+                raise ValueError(f"unknown pattern set {set_name!r} for source {s.name!r}")
+            s.pattern_set = sets[set_name]
+    return sources
+
+
+def load_sources(path: str) -> List[Source]:
+    with open(path, "r", encoding="utf-8") as f:
+        return parse_sources(yaml.safe_load(f) or {})
+
+
+def select_sources(
+    sources: List[Source],
+    region: Optional[str] = None,
+    only: Optional[List[str]] = None,
+) -> List[Source]:
+    """Päällä olevat lähteet, tarvittaessa vain yhdeltä alueelta tai nimetyt."""
+    if only:
+        unknown = sorted(set(only) - {s.name for s in sources if s.enabled})
+        if unknown:
+            raise ValueError(f"unknown or disabled source(s): {', '.join(unknown)}")
+    return [
+        s for s in sources
+        if s.enabled and (region is None or s.region == region) and (not only or s.name in only)
+    ]
+
+
+def collector_module(source: Source):
+    return importlib.import_module(COLLECTORS[source.type][0], __package__)
+
+
+def collector_context(source: Source, context: Optional[dict]) -> dict:
+    """
+    Buildin yhteiset argumentit (esim. since), rajattuna niihin joita
+    kerääjäfunktio ottaa vastaan.
+    """
+    if not context:
+        return {}
+    _module_name, func_name, _arg_names = COLLECTORS[source.type]
+    accepted = inspect.signature(getattr(collector_module(source), func_name)).parameters
+    return {k: v for k, v in context.items() if k in accepted and v is not None}
+
+
+def collector_for(source: Source, context: Optional[dict] = None):
+    _module_name, func_name, arg_names = COLLECTORS[source.type]
+    fn = getattr(collector_module(source), func_name)
+    kwargs = collector_context(source, context)
+    for arg in arg_names:
+        key, kwarg = arg if isinstance(arg, tuple) else (arg, arg)
+        if key in source.params:
+            kwargs[kwarg] = source.params[key]
+    if source.pattern_set is not None:
+        kwargs["patterns"] = source.pattern_set
+    return partial(fn, **kwargs)
+
+
+def build_jobs(sources: List[Source], context: Optional[dict] = None) -> List[Job]:
+    return [
+        Job(name=s.name, fn=collector_for(s, context), timeout=s.timeout, priority=s.priority)
+        for s in sources
+    ]
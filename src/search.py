@@ -0,0 +1,71 @@
+import json
+import re
+import unicodedata
+from typing import Dict, Iterator, List, Optional
+
+# Selaimen haku ja suodatus buildissa valmiiksi: eventin tagi (lukio /
+# stadinao) ja hakuindeksi. Indeksissä on aakkosjärjestetty sanasto
+# (pienet kirjaimet, ä/ö/å -> a/o/a) ja jokaiselle sanalle niiden eventtien
+# numerot, joissa se esiintyy. Selain hakee kirjoitetun alun sanastosta
+# puolitushaulla, joten haku ei käy eventtejä läpi.
+
+INDEX_VERSION = 1
+SEARCH_NAME = "search.json"
+
+_NON_WORD = re.compile(r"[^0-9a-z]+")
+
+# organizer-osuma -> tagi; muut ovat lukioita (vastaa aiempaa detectTagia)
+TAG_RULES = (
+    ("stadin", "stadinao"),
+    ("varia", "stadinao"),
+)
+DEFAULT_TAG = "lukio"
+
+
+def detect_tag(organizer: Optional[str]) -> str:
+    org = (organizer or "").lower()
+    for needle, tag in TAG_RULES:
+        if needle in org:
+            return tag
+    return DEFAULT_TAG
+
+
+def fold(text: str) -> str:
+    """Pienet kirjaimet ja diakriitit pois (ä -> a); sama kuin index.html:n fold()."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    if not text:
+        return []
+    return [t for t in _NON_WORD.split(fold(text)) if t]
+
+
+def build_index(events) -> dict:
+    """
+    {"ids": [eventin id], "tokens": [sana, aakkosjärjestyksessä],
+     "postings": [[ids-listan indeksit sanalle], ...]}
+    Haettavat kentät kuten ennen: otsikko, järjestäjä, paikka ja URL.
+    """
+    postings: Dict[str, List[int]] = {}
+    ids = []
+    for i, e in enumerate(events):
+        ids.append(e.id)
+        seen = set()
+        for field in (e.title, e.organizer, e.location, e.url):
+            for token in tokenize(field):
+                if token not in seen:
+                    seen.add(token)
+                    postings.setdefault(token, []).append(i)
+    tokens = sorted(postings)
+    return {
+        "version": INDEX_VERSION,
+        "ids": ids,
+        "tokens": tokens,
+        "postings": [postings[t] for t in tokens],
+    }
+
+
+def iter_index(index: dict) -> Iterator[str]:
+    yield json.dumps(index, ensure_ascii=False, separators=(",", ":"))
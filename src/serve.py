@@ -0,0 +1,289 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from . import tz
+from .model import Event, iter_events_ics
+from .search import fold, tokenize
+from .window import parse_bound
+
+# Buildin tulosten tarjoilu HTTP:llä (python -m src.main serve): eventit
+# pidetään muistissa alkuajan mukaan järjestettyinä, ja /events ja
+# /events.ics vastaavat aikaväli-, järjestäjä- ja hakusanakyselyihin
+# puolitushaulla ilman että asiakas lataa kaiken. Vastauksilla on vahva
+# ETag (sisällön sha256), gzip ja 304. Kun build kirjoittaa events.json:n
+# uudelleen (atomisesti, output.write_atomic), indeksi rakennetaan taustalla
+# ja vaihdetaan yhdellä sijoituksella; käynnissä olevat pyynnöt käyttävät
+# loppuun sitä indeksiä, jolla ne aloittivat.
+#
+#   /events?from=2026-11-01&to=2026-11-30&organizer=kallio&q=ilta
+#   /events.ics?organizer=stadin
+#   /status
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8000
+DEFAULT_POLL = 2.0            # events.json:n tarkistusväli sekunteina
+CACHE_SIZE = 256              # vastauksia muistissa per indeksi
+GZIP_MIN_BYTES = 1024
+QUERY_KEYS = ("from", "to", "organizer", "q")
+
+
+class Query(NamedTuple):
+    since: Optional[float] = None      # alkuaika >= (unix-aika)
+    until: Optional[float] = None      # alkuaika < (unix-aika)
+    organizer: str = ""                # taitettu osamerkkijono
+    words: Tuple[str, ...] = ()        # jokainen sana jonkin sanan alkuna (kuten selaimen haku)
+
+
+class QueryError(ValueError):
+    pass
+
+
+def parse_query(query_string: str) -> Query:
+    params = parse_qs(query_string, keep_blank_values=False)
+    unknown = sorted(set(params) - set(QUERY_KEYS))
+    if unknown:
+        raise QueryError(f"unknown parameter(s): {', '.join(unknown)}")
+    value = {k: v[-1] for k, v in params.items()}
+    try:
+        since = parse_bound(value["from"]).timestamp() if "from" in value else None
+        until = parse_bound(value["to"], end=True).timestamp() if "to" in value else None
+    except ValueError as e:
+        raise QueryError(f"invalid date: {e}")
+    return Query(
+        since=since,
+        until=until,
+        organizer=fold(value.get("organizer", "").strip()),
+        words=tuple(tokenize(value.get("q"))),
+    )
+
+
+class Response(NamedTuple):
+    body: bytes
+    gzipped: Optional[bytes]
+    etag: str                  # ilman lainausmerkkejä; gzip-versiolla pääte -gz
+    content_type: str
+
+
+def make_response(body: bytes, content_type: str) -> Response:
+    gzipped = gzip.compress(body, compresslevel=6, mtime=0) if len(body) >= GZIP_MIN_BYTES else None
+    return Response(body, gzipped, hashlib.sha256(body).hexdigest()[:32], content_type)
+
+
+class EventIndex:
+    """
+    Yhden buildin eventit alkuajan mukaan. Muuttumaton luomisen jälkeen, joten
+    säikeet voivat lukea sitä lukitsematta; vastausvälimuisti on indeksikohtainen.
+    """
+
+    def __init__(self, rows: List[dict], stamp=None):
+        self.stamp = stamp
+        self.loaded = time.time()
+        events = [Event.from_dict(d) for d in rows]
+        # ISO-muodosta saadaan kiinteä offset; ICS tarvitsee Europe/Helsinki-vyöhykkeen
+        tz.normalize_events(events, tz.table_for_window(None))
+        order = sorted(range(len(events)), key=lambda i: events[i].start)
+        self.events = [events[i] for i in order]
+        self.starts = [e.start.timestamp() for e in self.events]
+        self.items = [json.dumps(rows[i], ensure_ascii=False, separators=(",", ":")) for i in order]
+        self.organizers = [fold(e.organizer or "") for e in self.events]
+        # " sana1 sana2 ..." -> sanan alun haku on osamerkkijonohaku " " + alku
+        self.words = [" " + " ".join(tokenize(" ".join(filter(None, (e.title, e.organizer, e.location, e.url)))))
+                      for e in self.events]
+        self._cache: "OrderedDict[tuple, Response]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str) -> "EventIndex":
+        stamp = file_stamp(path)
+        with open(path, "r", encoding="utf-8") as f:
+            rows = json.load(f)
+        return cls(rows, stamp)
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def select(self, q: Query) -> List[int]:
+        lo = bisect_left(self.starts, q.since) if q.since is not None else 0
+        hi = bisect_left(self.starts, q.until) if q.until is not None else len(self.starts)
+        out = []
+        organizers, words = self.organizers, self.words
+        needles = [" " + w for w in q.words]
+        for i in range(lo, hi):
+            if q.organizer and q.organizer not in organizers[i]:
+                continue
+            if needles and not all(n in words[i] for n in needles):
+                continue
+            out.append(i)
+        return out
+
+    def render(self, kind: str, q: Query) -> Response:
+        key = (kind, q)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+        selected = self.select(q)
+        if kind == "ics":
+            body = b"".join(iter_events_ics(self.events[i] for i in selected))
+            resp = make_response(body, "text/calendar; charset=utf-8")
+        else:
+            body = ("[" + ",".join(self.items[i] for i in selected) + "]").encode("utf-8")
+            resp = make_response(body, "application/json; charset=utf-8")
+        with self._lock:
+            self._cache[key] = resp
+            while len(self._cache) > CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return resp
+
+
+def file_stamp(path: str):
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+class EventServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, events_path: str, poll: float = DEFAULT_POLL):
+        self.events_path = events_path
+        self.poll = poll
+        self.index = EventIndex.load(events_path)
+        self._stop = threading.Event()
+        self._failed = None
+        super().__init__(address, EventHandler)
+
+    def reload_if_changed(self) -> bool:
+        """Uusi indeksi, jos events.json vaihtui; vaihto on yksi sijoitus."""
+        try:
+            stamp = file_stamp(self.events_path)
+        except FileNotFoundError:
+            return False
+        if stamp == self.index.stamp or stamp == self._failed:
+            return False
+        try:
+            index = EventIndex.load(self.events_path)
+        except (OSError, ValueError) as e:
+            self._failed = stamp   # ei uutta yritystä ennen seuraavaa muutosta
+            print(f"[WARN] serve: reload failed, keeping {len(self.index)} events: {e}")
+            return False
+        self.index = index
+        print(f"Reloaded {len(index)} events from {self.events_path}")
+        return True
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.poll):
+            self.reload_if_changed()
+
+    def serve_forever(self, poll_interval: float = 0.5) -> None:
+        threading.Thread(target=self._watch, name="serve-reload", daemon=True).start()
+        try:
+            super().serve_forever(poll_interval)
+        finally:
+            self._stop.set()
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """Accept-Encoding (RFC 9110): gzip tai *, ja q > 0. Virheellinen q = 0."""
+    allowed = {}
+    for part in accept_encoding.split(","):
+        coding, *params = (p.strip() for p in part.split(";"))
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value.strip())
+                except ValueError:
+                    q = 0.0
+        if coding:
+            allowed[coding.lower()] = q
+    q = allowed.get("gzip", allowed.get("x-gzip", allowed.get("*", 0.0)))
+    return q > 0
+
+
+class EventHandler(BaseHTTPRequestHandler):
+    server_version = "OpenDoors/1.0"
+    protocol_version = "HTTP/1.1"
+    # otsakkeet ja runko menevät eri kirjoituksina; ilman TCP_NODELAY:tä
+    # Nagle odottaa keep-alive-yhteydellä asiakkaan viivästettyä ACK:ta (~40 ms)
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self._handle(send_body=True)
+
+    def do_HEAD(self):
+        self._handle(send_body=False)
+
+    def _handle(self, send_body: bool) -> None:
+        index = self.server.index   # sama indeksi koko pyynnön ajan
+        url = urlsplit(self.path)
+        if url.path == "/status":
+            body = json.dumps({"events": len(index), "loaded": round(index.loaded, 3)}).encode("utf-8")
+            return self._send(200, Response(body, None, "", "application/json"), send_body, cache=False)
+        if url.path not in ("/events", "/events.json", "/events.ics"):
+            return self._error(404, "not found", send_body)
+        try:
+            q = parse_query(url.query)
+        except QueryError as e:
+            return self._error(400, str(e), send_body)
+        resp = index.render("ics" if url.path.endswith(".ics") else "json", q)
+        self._send(200, resp, send_body)
+
+    def _accepts_gzip(self) -> bool:
+        return accepts_gzip(self.headers.get("Accept-Encoding", ""))
+
+    def _send(self, status: int, resp: Response, send_body: bool, cache: bool = True) -> None:
+        body, encoding, etag = resp.body, None, None
+        if cache:
+            etag = resp.etag
+            if resp.gzipped is not None and self._accepts_gzip():
+                body, encoding, etag = resp.gzipped, "gzip", etag + "-gz"
+            # If-None-Match käyttää heikkoa vertailua (RFC 9110)
+            tags = [t.strip().removeprefix("W/") for t in self.headers.get("If-None-Match", "").split(",")]
+            if f'"{etag}"' in tags or "*" in tags:
+                status, body = 304, b""
+        self.send_response(status)
+        self.send_header("Content-Type", resp.content_type)
+        if etag:
+            self.send_header("ETag", f'"{etag}"')
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Vary", "Accept-Encoding")
+        if encoding and status != 304:
+            self.send_header("Content-Encoding", encoding)
+        if status != 304:
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if send_body and body:
+            self.wfile.write(body)
+
+    def _error(self, status: int, message: str, send_body: bool) -> None:
+        body = json.dumps({"error": message}, ensure_ascii=False).encode("utf-8")
+        self._send(status, Response(body, None, "", "application/json; charset=utf-8"), send_body, cache=False)
+
+    def log_request(self, code="-", size="-"):
+        # onnistuneita pyyntöjä ei lokiteta; kuormatestissä rivejä tulisi tuhansia
+        if str(getattr(code, "value", code)).startswith(("4", "5")):
+            super().log_request(code, size)
+
+
+def serve(out_dir: str, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, poll: float = DEFAULT_POLL) -> None:
+    events_path = os.path.join(out_dir, "events.json")
+    if not os.path.exists(events_path):
+        raise SystemExit(f"serve: {events_path} not found (run a build first)")
+    server = EventServer((host, port), events_path, poll=poll)
+    print(f"Serving {len(server.index)} events on http://{host}:{server.server_port}/events "
+          f"(reloads when {events_path} changes)")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
@@ -0,0 +1,63 @@
+import json
+import os
+import re
+from itertools import groupby
+from typing import Iterator, List
+
+from .model import Event, iter_events_json
+from .output import write_atomic
+
+# Kuukausittain pilkotut ulostulot selaimelle: events/YYYY-MM.json ja
+# events/manifest.json, jossa on osien aikavälit, määrät ja sisällön
+# tiivisteet. Sivu hakee manifestin ja vain ne kuukaudet, joissa on
+# tulevia tapahtumia; tiivisteen ansiosta osat voi välimuistittaa.
+
+SHARD_DIR = "events"
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+_SHARD_FILE = re.compile(r"^\d{4}-\d{2}\.json(?:\.gz)?$")
+
+
+def month_key(e: Event) -> str:
+    return f"{e.start.year:04d}-{e.start.month:02d}"
+
+
+def write_shards(events: List[Event], out_dir: str, compact: bool = False) -> dict:
+    """
+    Kirjoittaa alkuajan mukaan järjestetyt eventit kuukausitiedostoihin ja
+    poistaa kuukaudet, joita ei enää ole. Palauttaa manifestin (ks.
+    iter_manifest); manifestia ei kirjoiteta tässä.
+    """
+    shard_dir = os.path.join(out_dir, SHARD_DIR)
+    os.makedirs(shard_dir, exist_ok=True)
+    shards = []
+    for month, group in groupby(events, key=month_key):
+        group = list(group)
+        filename = f"{month}.json"
+        digest, _written = write_atomic(os.path.join(shard_dir, filename), iter_events_json(group, compact=compact))
+        shards.append({
+            "month": month,
+            "file": f"{SHARD_DIR}/{filename}",
+            # selain tarvitsee osan, jos sen viimeinen tapahtuma ei ole päättynyt
+            "start": group[0].start.isoformat(),
+            "end": max(e.end or e.start for e in group).isoformat(),
+            "count": len(group),
+            "sha256": digest,
+        })
+
+    current = {s["month"] + ".json" for s in shards}
+    for name in os.listdir(shard_dir):
+        if _SHARD_FILE.match(name) and name.removesuffix(".gz") not in current:
+            os.remove(os.path.join(shard_dir, name))
+
+    return {
+        "version": MANIFEST_VERSION,
+        "count": sum(s["count"] for s in shards),
+        "shards": shards,
+    }
+
+
+def iter_manifest(manifest: dict) -> Iterator[str]:
+    # ei aikaleimaa: sama sisältö -> sama manifesti (inkrementaalinen build)
+    yield json.dumps(manifest, ensure_ascii=False, indent=2)
+    yield "\n"
@@ -0,0 +1,133 @@
+import sqlite3
+from datetime import datetime
+from typing import List, Optional
+
+from .model import Event
+from .window import BuildWindow
+
+# Valinnainen SQLite-tietovarasto (--store): jokaisen buildin tapahtumat
+# päivitetään tauluun Event.id:n mukaan, ja jokaisesta tiedetään lähde,
+# ensimmäinen ja viimeisin build, jossa se nähtiin. Vanhoja tapahtumia ei
+# poisteta, joten tietokanta kerää usean vuoden historian analytiikkaa
+# varten. Buildin ulostulot luetaan varastosta kyselyllä (tämän buildin
+# tapahtumat aikaikkunassa alkuajan mukaan).
+#
+#   sqlite3 events.db "SELECT organizer, count(*) FROM events GROUP BY 1 ORDER BY 2 DESC"
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started TEXT NOT NULL,          -- ISO, UTC
+    events INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS events (
+    id TEXT PRIMARY KEY,            -- Event.id
+    title TEXT NOT NULL,
+    start TEXT NOT NULL,            -- ISO ja UTC-offset, kuten events.json
+    start_ts REAL NOT NULL,         -- unix-aika järjestykseen ja aikaväleihin
+    "end" TEXT,
+    location TEXT,
+    url TEXT,
+    organizer TEXT,
+    source_url TEXT,
+    source TEXT NOT NULL,           -- lähde (sources.yaml: name), joka viimeksi tuotti eventin
+    first_seen TEXT NOT NULL,       -- runs.started
+    last_seen TEXT NOT NULL,
+    first_run INTEGER NOT NULL REFERENCES runs(id),
+    last_run INTEGER NOT NULL REFERENCES runs(id),
+    ord INTEGER NOT NULL DEFAULT 0  -- järjestys viimeisimmässä buildissa (sama alkuaika)
+);
+CREATE INDEX IF NOT EXISTS events_start ON events(start_ts);
+CREATE INDEX IF NOT EXISTS events_organizer ON events(organizer);
+CREATE INDEX IF NOT EXISTS events_source ON events(source);
+"""
+
+UPSERT = """
+INSERT INTO events (id, title, start, start_ts, "end", location, url, organizer, source_url,
+                    source, first_seen, last_seen, first_run, last_run, ord)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(id) DO UPDATE SET
+    "end" = excluded."end",
+    url = excluded.url,
+    organizer = excluded.organizer,
+    source_url = excluded.source_url,
+    source = excluded.source,
+    last_seen = excluded.last_seen,
+    last_run = excluded.last_run,
+    ord = excluded.ord
+"""
+
+SELECT_RUN = """
+SELECT title, start, "end", location, url, organizer, source_url FROM events WHERE last_run = ?
+"""
+
+
+class EventStore:
+    def __init__(self, path: str):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        # WAL-tilassa NORMAL ei voi korruptoida kantaa; viimeisin build voi kaatuessa hävitä
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version not in (0, SCHEMA_VERSION):
+            raise SystemExit(f"--store: {path} has schema version {version}, expected {SCHEMA_VERSION}")
+        with self.conn:
+            self.conn.executescript(SCHEMA)
+            self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def __enter__(self) -> "EventStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def record(self, events: List[Event], sources: List[str], seen: datetime) -> int:
+        """Upsert yhdessä transaktiossa; palauttaa buildin (runs.id)."""
+        seen_iso = seen.isoformat(timespec="seconds")
+        with self.conn:
+            run = self.conn.execute("INSERT INTO runs (started, events) VALUES (?, ?)",
+                                    (seen_iso, len(events))).lastrowid
+            rows = [
+                (e.id, e.title, e.start.isoformat(), e.start.timestamp(), e.end.isoformat() if e.end else None,
+                 e.location, e.url, e.organizer, e.source_url, source, seen_iso, seen_iso, run, run, i)
+                for i, (e, source) in enumerate(zip(events, sources))
+            ]
+            # id-järjestyksessä B-puun sivut täyttyvät peräkkäin
+            rows.sort()
+            self.conn.executemany(UPSERT, rows)
+        return run
+
+    def summary(self, run: int) -> dict:
+        total, new = self.conn.execute(
+            "SELECT count(*), count(*) FILTER (WHERE first_run = ?) FROM events", (run,)).fetchone()
+        return {"total": total, "new": new}
+
+    def current(self, run: int, window: Optional[BuildWindow] = None) -> List[Event]:
+        """Buildin `run` eventit ikkunassa alkuajan mukaan (kuten events.json)."""
+        sql = SELECT_RUN.strip()
+        params: list = [run]
+        if window is not None and window.since is not None:
+            sql += " AND start_ts >= ?"
+            params.append(window.since.timestamp())
+        if window is not None and window.until is not None:
+            sql += " AND start_ts < ?"
+            params.append(window.until.timestamp())
+        sql += " ORDER BY start_ts, ord"
+        return [
+            Event(
+                title=title,
+                start=datetime.fromisoformat(start),
+                end=datetime.fromisoformat(end) if end else None,
+                location=location,
+                url=url,
+                organizer=organizer,
+                source_url=source_url,
+            )
+            for title, start, end, location, url, organizer, source_url in self.conn.execute(sql, params)
+        ]
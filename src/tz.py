@@ -0,0 +1,206 @@
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+from zoneinfo import ZoneInfo
+
+from .window import LOCAL_TZ, BuildWindow
+
+# Aikojen normalisointi erissä: naiivit ajat ja päivät tulkitaan Helsingin
+# ajaksi, aikavyöhykkeelliset muunnetaan Helsingin aikaan. Buildin
+# aikaikkunalle lasketaan valmiiksi kesäaikasiirtymien taulukko, josta
+# nähdään puolitushaulla, osuuko seinäkelloaika siirtymän aukkoon (ei ole
+# olemassa, esim. 2027-03-28 03:30) tai päällekkäisyyteen (kahdesti, esim.
+# 2026-10-25 03:30). Muut ajat saavat LOCAL_TZ:n suoraan.
+#
+# fold (PEP 495) käsitellään näin:
+#   päällekkäisyys: fold=0 on ensimmäinen (kesäaika), fold=1 toinen kerta
+#   aukko: fold=0 siirtää eteenpäin aukon verran (03:30 -> 04:30), fold=1
+#          taaksepäin (03:30 -> 02:30); tulos on aina olemassa oleva aika
+# Molemmat raportoidaan (NormalizeReport), jotta lähteen virheet näkyvät.
+
+UTC = timezone.utc
+# taulukko kattaa ikkunan lisäksi näin monta vuotta kumpaankin suuntaan
+MARGIN_YEARS = 1
+# avoimen ikkunan loppu: näin monta vuotta alusta eteenpäin
+OPEN_END_YEARS = 5
+
+
+class Transition(NamedTuple):
+    utc: datetime          # siirtymän hetki, naiivi UTC
+    before: timedelta      # UTC-poikkeama ennen
+    after: timedelta       # ja jälkeen
+
+    @property
+    def gap(self) -> bool:
+        return self.after > self.before
+
+    def local_range(self) -> Tuple[datetime, datetime]:
+        """Naiivi paikallinen väli [alku, loppu), jonka ajat ovat aukossa tai kahdesti."""
+        a, b = self.utc + self.before, self.utc + self.after
+        return (a, b) if a < b else (b, a)
+
+
+def _offset(tz: ZoneInfo, utc: datetime) -> timedelta:
+    return utc.replace(tzinfo=UTC).astimezone(tz).utcoffset()
+
+
+def find_transitions(tz: ZoneInfo, first_year: int, last_year: int) -> List[Transition]:
+    """Vuorokauden askelin läpi ja muutoskohta puolitushaulla sekunnin tarkkuudella."""
+    out = []
+    t = datetime(first_year, 1, 1)
+    end = datetime(last_year + 1, 1, 1)
+    step = timedelta(days=1)
+    prev = _offset(tz, t)
+    while t < end:
+        nxt = t + step
+        off = _offset(tz, nxt)
+        if off != prev:
+            lo, hi = 0, int(step.total_seconds())
+            while hi - lo > 1:
+                mid = (lo + hi) // 2
+                if _offset(tz, t + timedelta(seconds=mid)) == prev:
+                    lo = mid
+                else:
+                    hi = mid
+            out.append(Transition(t + timedelta(seconds=hi), prev, off))
+            prev = off
+        t = nxt
+    return out
+
+
+class TransitionTable:
+    """
+    Aikavyöhykkeen siirtymät vuosille first_year..last_year. Naiivin ajan
+    luokittelu on yksi puolitushaku siirtymien paikallisiin väleihin.
+    """
+
+    def __init__(self, first_year: int, last_year: int, tz: ZoneInfo = LOCAL_TZ):
+        self.tz = tz
+        self.first = datetime(first_year, 1, 1)
+        self.last = datetime(last_year + 1, 1, 1)
+        self.transitions = find_transitions(tz, first_year, last_year)
+        # [alku0, loppu0, alku1, loppu1, ...]: pariton bisect-indeksi = välin sisällä
+        self._edges: List[datetime] = []
+        for tr in self.transitions:
+            self._edges.extend(tr.local_range())
+
+    def covers(self, local: datetime) -> bool:
+        return self.first <= local < self.last
+
+    def lookup(self, local: datetime) -> Optional[Transition]:
+        """Siirtymä, jonka aukossa tai päällekkäisyydessä naiivi aika on (muuten None)."""
+        p = bisect_right(self._edges, local)
+        return self.transitions[p >> 1] if p & 1 else None
+
+
+@lru_cache(maxsize=8)
+def _table(first_year: int, last_year: int) -> TransitionTable:
+    return TransitionTable(first_year, last_year)
+
+
+def table_for_window(window: Optional[BuildWindow], now: Optional[datetime] = None) -> TransitionTable:
+    now = now or datetime.now(LOCAL_TZ)
+    first = (window.since if window and window.since else now).astimezone(LOCAL_TZ).year
+    last = (window.until.astimezone(LOCAL_TZ).year if window and window.until
+            else max(first, now.year) + OPEN_END_YEARS)
+    return _table(first - MARGIN_YEARS, last + MARGIN_YEARS)
+
+
+@dataclass
+class NormalizeReport:
+    # (alkuperäinen naiivi aika, käytetty aika)
+    nonexistent: List[Tuple[datetime, datetime]] = field(default_factory=list)
+    ambiguous: List[Tuple[datetime, datetime]] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.nonexistent or self.ambiguous)
+
+    def warnings(self, source: str) -> List[str]:
+        lines = []
+        for raw, used in self.nonexistent:
+            lines.append(f"[WARN] {source}: nonexistent local time {raw.isoformat()} (DST gap), "
+                         f"using {used.isoformat()}")
+        for raw, used in self.ambiguous:
+            which = "second" if used.fold else "first"
+            lines.append(f"[WARN] {source}: ambiguous local time {raw.isoformat()} (DST overlap), "
+                         f"using {which} occurrence {used.isoformat()}")
+        return lines
+
+
+def _resolve_slow(local: datetime, tz: ZoneInfo, report: NormalizeReport) -> datetime:
+    # taulukon ulkopuolella sama luokittelu ZoneInfon kautta
+    a = local.replace(tzinfo=tz, fold=0)
+    b = local.replace(tzinfo=tz, fold=1)
+    if a.utcoffset() == b.utcoffset():
+        return a
+    roundtrip = a.astimezone(UTC).astimezone(tz).replace(tzinfo=None)
+    if roundtrip == local.replace(fold=0):
+        used = b if local.fold else a
+        report.ambiguous.append((local, used))
+        return used
+    shift = abs(b.utcoffset() - a.utcoffset())
+    used = (local - shift if local.fold else local + shift).replace(tzinfo=tz, fold=0)
+    report.nonexistent.append((local, used))
+    return used
+
+
+def normalize_batch(values: Sequence, table: TransitionTable,
+                    report: Optional[NormalizeReport] = None) -> Tuple[List[datetime], NormalizeReport]:
+    """
+    datetime/date-lista -> aikavyöhykkeelliset datetimet (tz = table.tz),
+    samassa järjestyksessä. Tavallinen naiivi aika rakennetaan suoraan
+    (datetime(...) on selvästi nopeampi kuin replace(tzinfo=...)).
+    """
+    if report is None:
+        report = NormalizeReport()
+    tz = table.tz
+    edges = table._edges
+    transitions = table.transitions
+    first, last = table.first, table.last
+    out = []
+    append = out.append
+    for v in values:
+        if type(v) is not datetime:
+            if isinstance(v, datetime):
+                pass
+            elif isinstance(v, date):
+                # pelkkä päivä -> keskiyö paikallista aikaa
+                v = datetime(v.year, v.month, v.day)
+            else:
+                raise TypeError(f"expected datetime or date, got {type(v).__name__}")
+        tzinfo = v.tzinfo
+        if tzinfo is not None:
+            # hetki on yksiselitteinen; ZoneInfo asettaa foldin itse
+            append(v if tzinfo is tz else v.astimezone(tz))
+            continue
+        if not (first <= v < last):
+            append(_resolve_slow(v, tz, report))
+            continue
+        p = bisect_right(edges, v)
+        if not p & 1:
+            append(datetime(v.year, v.month, v.day, v.hour, v.minute, v.second, v.microsecond, tz))
+            continue
+        tr = transitions[p >> 1]
+        if tr.gap:
+            shift = tr.after - tr.before
+            used = (v - shift if v.fold else v + shift).replace(tzinfo=tz, fold=0)
+            report.nonexistent.append((v, used))
+        else:
+            used = v.replace(tzinfo=tz)
+            report.ambiguous.append((v, used))
+        append(used)
+    return out, report
+
+
+def normalize_events(events: list, table: TransitionTable) -> NormalizeReport:
+    """Alku- ja loppuajat yhtenä eränä; eventit muutetaan paikallaan."""
+    ends = [e for e in events if e.end]
+    values, report = normalize_batch([e.start for e in events] + [e.end for e in ends], table)
+    n = len(events)
+    for e, v in zip(events, values):
+        e.start = v
+    for e, v in zip(ends, values[n:]):
+        e.end = v
+    return report
@@ -0,0 +1,151 @@
+import os
+import time
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from .registry import PATTERNS_PATH, Source, load_sources, select_sources
+
+# Jatkuvasti käynnissä oleva build (python -m src.main watch). Jokainen
+# lähde päivitetään omalla välillään (sources.yaml: refresh, oletuksena
+# --refresh), ja data/*.yaml-tiedostojen muutokset huomataan mtime-
+# pollauksella. Buildissa tarkistetaan vain vuorossa olevat lähteet; muiden
+# tulokset tulevat inkrementaalisesta tilasta (BuildState.keep_source), ja
+# ulostulot kirjoitetaan vain kun jokin muuttui. sources.yaml:n tai
+# patterns.yaml:n muutos lataa lähteet uudelleen ja tarkistaa kaikki.
+
+DEFAULT_REFRESH = 6 * 3600   # sekuntia; lähteille ilman omaa refresh-arvoa
+DEFAULT_POLL = 5.0           # tiedostojen tarkistusväli sekunteina
+
+# polku -> (mtime_ns, koko); None = tiedostoa ei ole
+Stamps = Dict[str, Optional[Tuple[int, int]]]
+
+
+def _stamp(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def source_files(source: Source) -> List[str]:
+    """Lähteen paikalliset syötetiedostot (manual_yaml); glob lavennetaan joka kerta."""
+    if source.type != "manual_yaml":
+        return []
+    from .collectors.manual_yaml import expand_paths
+    return [str(p) for p in expand_paths(source.params["path"])]
+
+
+class Watcher:
+    def __init__(
+        self,
+        sources_path: str,
+        build: Callable[[Optional[Set[str]]], bool],
+        region: Optional[str] = None,
+        default_refresh: float = DEFAULT_REFRESH,
+        poll: float = DEFAULT_POLL,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        # build(refresh) ajaa inkrementaalisen buildin; refresh=None tarkistaa kaikki
+        self.sources_path = sources_path
+        self.build = build
+        self.region = region
+        self.default_refresh = default_refresh
+        self.poll = poll
+        self.clock = clock
+        self.sources: List[Source] = []
+        self.next_due: Dict[str, float] = {}
+        self.files: Dict[str, Stamps] = {}
+        self.config: Stamps = {}
+
+    def interval(self, source: Source) -> Optional[float]:
+        # paikalliset tiedostot päivittyvät mtimen perusteella
+        if source.refresh is not None:
+            return source.refresh
+        return None if source.type == "manual_yaml" else self.default_refresh
+
+    def _config_stamps(self) -> Stamps:
+        return {p: _stamp(p) for p in (self.sources_path, str(PATTERNS_PATH))}
+
+    def _file_stamps(self, source: Source) -> Stamps:
+        return {p: _stamp(p) for p in source_files(source)}
+
+    def _schedule(self, names, now: float) -> None:
+        for s in self.sources:
+            if s.name in names:
+                interval = self.interval(s)
+                self.next_due[s.name] = now + interval if interval is not None else float("inf")
+
+    def _load(self) -> None:
+        self.config = self._config_stamps()
+        self.sources = select_sources(load_sources(self.sources_path), region=self.region)
+        self.files = {s.name: self._file_stamps(s) for s in self.sources}
+        self.next_due = {}
+        self._schedule({s.name for s in self.sources}, self.clock())
+
+    def pending(self) -> Tuple[Optional[Set[str]], List[str]]:
+        """
+        Vuorossa olevat lähteet ja syyt. (None, [...]) = asetukset muuttuivat,
+        tarkistetaan kaikki lähteet.
+        """
+        if self._config_stamps() != self.config:
+            return None, ["configuration changed"]
+        now = self.clock()
+        due: Set[str] = set()
+        reasons = []
+        for s in self.sources:
+            stamps = self._file_stamps(s)
+            if stamps != self.files.get(s.name):
+                changed = sorted(p for p in stamps.keys() | self.files.get(s.name, {}).keys()
+                                 if stamps.get(p) != self.files.get(s.name, {}).get(p))
+                due.add(s.name)
+                reasons.append(f"{s.name} ({', '.join(os.path.basename(p) for p in changed)} changed)")
+            elif self.next_due.get(s.name, 0.0) <= now:
+                due.add(s.name)
+                reasons.append(f"{s.name} (every {format_interval(self.interval(s))})")
+        return due, reasons
+
+    def step(self) -> Optional[bool]:
+        """Yksi kierros: build, jos jokin on vuorossa. None = ei buildia."""
+        due, reasons = self.pending()
+        if due is not None and not due:
+            return None
+        if due is None:
+            print(f"Watch: {reasons[0]}, reloading sources")
+            self._load()
+        else:
+            print(f"Watch: refreshing {len(due)} source(s): {'; '.join(reasons)}")
+            # tiedostojen tila ennen buildia, jotta buildin aikainen muutos huomataan seuraavalla kierroksella
+            for s in self.sources:
+                if s.name in due:
+                    self.files[s.name] = self._file_stamps(s)
+            self._schedule(due, self.clock())
+        return self.build(due)
+
+    def run(self) -> None:
+        """Ensimmäinen build tarkistaa kaikki lähteet; sen jälkeen pollataan (Ctrl-C lopettaa)."""
+        try:
+            self._load()
+        except ValueError as e:
+            raise SystemExit(str(e))
+        self._guarded(self.build, None)
+        while True:
+            time.sleep(self.poll)
+            self._guarded(self.step)
+
+    @staticmethod
+    def _guarded(fn, *args) -> Optional[bool]:
+        try:
+            return fn(*args)
+        except (Exception, SystemExit) as e:
+            # virheellinen sources.yaml tai kaatunut build ei pysäytä watchia
+            print(f"[WARN] watch: build failed: {type(e).__name__}: {e}")
+            return False
+
+
+def format_interval(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "-"
+    for unit, size in (("d", 86400), ("h", 3600), ("m", 60)):
+        if seconds >= size and seconds % size == 0:
+            return f"{int(seconds // size)}{unit}"
+    return f"{seconds:g}s"
@@ -0,0 +1,104 @@
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from typing import Optional, Tuple
+from zoneinfo import ZoneInfo
+
+# Buildin aikaikkuna [since, until). main.run antaa sen kerääjille
+# (registry.build_jobs -> kerääjän `window`-parametri), ja kerääjät
+# ohittavat ikkunan ulkopuoliset osumat ennen kuin niistä tehdään
+# datetime- tai Event-olioita. Ohitetut lasketaan lähteen mittareihin
+# (metrics.count_pruned).
+
+LOCAL_TZ = ZoneInfo("Europe/Helsinki")
+
+# (vuosi, kk, pv, h, min) paikallista aikaa; tuplevertailu ilman datetimea
+LocalTuple = Tuple[int, int, int, int, int]
+
+
+def _local_tuple(dt: datetime) -> LocalTuple:
+    dt = dt.astimezone(LOCAL_TZ)
+    return (dt.year, dt.month, dt.day, dt.hour, dt.minute)
+
+
+@dataclass(frozen=True)
+class BuildWindow:
+    since: Optional[datetime] = None   # mukana (aikavyöhykkeellinen)
+    until: Optional[datetime] = None   # ei mukana
+    # paikallisen ajan rajat valmiiksi laskettuina (admits/admits_iso)
+    _lo: Optional[LocalTuple] = field(default=None, init=False, repr=False, compare=False)
+    _hi: Optional[LocalTuple] = field(default=None, init=False, repr=False, compare=False)
+    _lo_iso: str = field(default="", init=False, repr=False, compare=False)
+    _hi_iso: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        if self.since is not None and self.until is not None and self.until <= self.since:
+            raise ValueError(f"empty build window: {self.since.isoformat()} .. {self.until.isoformat()}")
+        if self.since is not None:
+            lo = _local_tuple(self.since)
+            object.__setattr__(self, "_lo", lo)
+            object.__setattr__(self, "_lo_iso", "%04d-%02d-%02dT%02d:%02d" % lo)
+        if self.until is not None:
+            hi = _local_tuple(self.until)
+            object.__setattr__(self, "_hi", hi)
+            object.__setattr__(self, "_hi_iso", "%04d-%02d-%02dT%02d:%02d" % hi)
+
+    def contains(self, dt: datetime) -> bool:
+        """Naiivi aika tulkitaan paikalliseksi (kuten main.ensure_datetime)."""
+        if isinstance(dt, datetime):
+            if dt.tzinfo is None:
+                dt = dt.replace(tzinfo=LOCAL_TZ)
+        else:
+            dt = datetime.combine(dt, time(), LOCAL_TZ)
+        if self.since is not None and dt < self.since:
+            return False
+        return self.until is None or dt < self.until
+
+    def admits(self, year: int, month: int, day: int, hour: int = 0, minute: int = 0) -> bool:
+        """Paikallinen aika osina; ei luo datetimea eikä tarkista päivän oikeellisuutta."""
+        t = (year, month, day, hour, minute)
+        if self._lo is not None and t < self._lo:
+            return False
+        return self._hi is None or t < self._hi
+
+    def covers(self, other: "BuildWindow") -> bool:
+        """Onko `other` kokonaan tämän ikkunan sisällä (None = rajaton)."""
+        if self.since is not None and (other.since is None or other.since < self.since):
+            return False
+        return self.until is None or (other.until is not None and other.until <= self.until)
+
+    def to_json(self) -> list:
+        return [self.since.isoformat() if self.since else None, self.until.isoformat() if self.until else None]
+
+    @classmethod
+    def from_json(cls, bounds: list) -> "BuildWindow":
+        since, until = bounds
+        return cls(since=datetime.fromisoformat(since) if since else None,
+                   until=datetime.fromisoformat(until) if until else None)
+
+    def admits_iso(self, local: str) -> bool:
+        """Paikallinen aika muodossa YYYY-MM-DDTHH:MM (merkkijonovertailu)."""
+        if local < self._lo_iso:
+            return False
+        return self._hi_iso is None or local < self._hi_iso
+
+
+def parse_bound(value: str, end: bool = False) -> datetime:
+    """
+    --from/--to: YYYY-MM-DD tai ISO-aika. Naiivi aika on paikallista.
+    Pelkkä päivä --to:na tarkoittaa koko päivää (raja seuraavan päivän alussa).
+    """
+    try:
+        d = date.fromisoformat(value)
+    except ValueError:
+        dt = datetime.fromisoformat(value)
+        return dt if dt.tzinfo is not None else dt.replace(tzinfo=LOCAL_TZ)
+    if end:
+        d += timedelta(days=1)
+    return datetime.combine(d, time(), LOCAL_TZ)
+
+
+def default_window(now: datetime, keep_past_days: int) -> BuildWindow:
+    # alku pyöristetään vuorokauteen; inkrementaalinen build käyttää tulosta
+    # niin kauan kuin sen ikkuna kattaa nykyisen (incremental.source_window)
+    start = (now - timedelta(days=keep_past_days)).astimezone(LOCAL_TZ)
+    return BuildWindow(since=datetime.combine(start.date(), time(), LOCAL_TZ))
@@ -0,0 +1,125 @@
+import unittest
+from datetime import date, datetime, timezone
+from zoneinfo import ZoneInfo
+
+from icalendar import Calendar
+
+from bench.ics_serializer import dump_events_ics_icalendar
+from src.ical import fold
+from src.model import Event, dump_events_ics
+
+# Natiivin ICS-kirjoittimen (src/ical.py) pariteetti icalendar-kirjaston
+# kanssa: molemmat tulosteet luetaan Calendar.from_ical:lla ja VEVENTit
+# verrataan ominaisuus kerrallaan (arvo ja TZID/VALUE-parametrit).
+#
+#   python -m unittest tests.test_ical
+
+HELSINKI = ZoneInfo("Europe/Helsinki")
+
+
+def _events(ics: bytes) -> list:
+    return list(Calendar.from_ical(ics).walk("VEVENT"))
+
+
+def _value(prop):
+    dt = getattr(prop, "dt", None)
+    if dt is not None:
+        return dt, type(dt), getattr(dt, "tzinfo", None) and str(dt.utcoffset())
+    return str(prop)
+
+
+def _text_lines(ics: bytes) -> list:
+    # taitetut rivit auki; SUMMARY/LOCATION-rivit sellaisenaan (escapet näkyvät)
+    lines = ics.replace(b"\r\n ", b"").split(b"\r\n")
+    return [line for line in lines if line.startswith((b"SUMMARY", b"LOCATION"))]
+
+
+def _params(prop) -> dict:
+    params = getattr(prop, "params", {}) or {}
+    return {k.upper(): str(v) for k, v in params.items() if k.upper() in ("TZID", "VALUE")}
+
+
+class IcsParityTest(unittest.TestCase):
+    def assertParity(self, events):
+        native = dump_events_ics(events)
+        reference = dump_events_ics_icalendar(events)
+        got, expected = _events(native), _events(reference)
+        self.assertEqual(len(got), len(events))
+        self.assertEqual(len(got), len(expected))
+        for a, b in zip(got, expected):
+            self.assertEqual(sorted(a.keys()), sorted(b.keys()))
+            for name in b.keys():
+                with self.subTest(uid=str(b["UID"]), prop=name):
+                    self.assertEqual(_value(a[name]), _value(b[name]))
+                    self.assertEqual(_params(a[name]), _params(b[name]))
+        # from_ical hyväksyy myös escapettoman pilkun, joten escapet verrataan riveinä
+        self.assertEqual(_text_lines(native), _text_lines(reference))
+        for line in native.split(b"\r\n"):
+            self.assertLessEqual(len(line), 75, line)
+            line.decode("utf-8")   # taitto ei katkaise monitavuista merkkiä
+        return got
+
+    def test_escapes(self):
+        got = self.assertParity([
+            Event('Avoimet ovet, ilta; "kaikki"\\muut\ntoinen rivi\r\nkolmas',
+                  datetime(2026, 1, 15, 18, 0, tzinfo=HELSINKI), datetime(2026, 1, 15, 19, 30, tzinfo=HELSINKI),
+                  location="Kallion lukio; sali 2, Helsinki", url="https://x.fi/a?b=1,2;c"),
+        ])
+        self.assertEqual(str(got[0]["SUMMARY"]), 'Avoimet ovet, ilta; "kaikki"\\muut\ntoinen rivi\nkolmas')
+        self.assertEqual(str(got[0]["LOCATION"]), "Kallion lukio; sali 2, Helsinki")
+
+    def test_folding_multibyte_at_limit(self):
+        start = datetime(2026, 3, 2, 9, 0, tzinfo=HELSINKI)
+        events = []
+        # "SUMMARY:" on 8 oktettia; ä (2 oktettia) ja € (3) osuvat 75. oktetin kohdalle
+        for pad in range(64, 70):
+            events.append(Event("a" * pad + "ä" * 40, start))
+            events.append(Event("a" * pad + "€" * 30, start))
+        events.append(Event("Ä" * 120, start, location="ö" * 77))
+        got = self.assertParity(events)
+        for e, comp in zip(events, got):
+            self.assertEqual(str(comp["SUMMARY"]), e.title)
+
+    def test_fold(self):
+        line = "SUMMARY:" + "a" * 66 + "ä" + "b" * 10
+        folded = fold(line)
+        first, rest = folded.split(b"\r\n ", 1)
+        self.assertEqual(len(first), 74)   # ä ei mahdu 75 oktettiin, siirtyy jatkoriville
+        self.assertEqual(folded.replace(b"\r\n ", b"").decode("utf-8"), line + "\r\n")
+        self.assertEqual(fold("x" * 75), b"x" * 75 + b"\r\n")
+
+    def test_all_day(self):
+        got = self.assertParity([
+            Event("Koko päivä", date(2026, 5, 4), date(2026, 5, 5)),
+            Event("Koko päivä, ei loppua", date(2026, 5, 6)),
+        ])
+        self.assertEqual(got[0]["DTSTART"].dt, date(2026, 5, 4))
+        self.assertEqual(_params(got[0]["DTSTART"]), {"VALUE": "DATE"})
+
+    def test_utc_and_helsinki(self):
+        got = self.assertParity([
+            Event("UTC", datetime(2026, 10, 25, 1, 30, tzinfo=timezone.utc),
+                  datetime(2026, 10, 25, 2, 30, tzinfo=timezone.utc)),
+            Event("Helsinki", datetime(2026, 10, 25, 3, 30, tzinfo=HELSINKI),
+                  datetime(2026, 10, 25, 4, 30, tzinfo=HELSINKI)),
+            Event("Kesäaika", datetime(2026, 3, 29, 4, 0, tzinfo=HELSINKI)),
+            Event("Naiivi", datetime(2026, 2, 1, 9, 0), datetime(2026, 2, 1, 10, 0)),
+        ])
+        self.assertEqual(got[0]["DTSTART"].dt.utcoffset().total_seconds(), 0)
+        self.assertEqual(_params(got[0]["DTSTART"]), {})
+        self.assertEqual(_params(got[1]["DTSTART"]), {"TZID": "Europe/Helsinki"})
+        self.assertEqual(got[1]["DTSTART"].dt.utcoffset().total_seconds(), 2 * 3600)
+        self.assertEqual(got[2]["DTSTART"].dt.utcoffset().total_seconds(), 3 * 3600)
+        self.assertIsNone(got[3]["DTSTART"].dt.tzinfo)
+
+    def test_no_end(self):
+        got = self.assertParity([
+            Event("Ei loppua", datetime(2026, 4, 1, 17, 0, tzinfo=HELSINKI)),
+            Event("Ei loppua eikä paikkaa", datetime(2026, 4, 2, 17, 0, tzinfo=HELSINKI), url="https://x.fi/"),
+        ])
+        self.assertNotIn("DTEND", got[0])
+        self.assertNotIn("LOCATION", got[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
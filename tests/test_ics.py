@@ -0,0 +1,51 @@
+import io
+import unittest
+from datetime import datetime, timezone
+
+from src.collectors.ics import parse_ics
+
+# ICS-jäsentimen aikaikkuna: BuildWindow on puoliavoin [since, until), joten
+# tasan `until`-hetkellä alkava tapahtuma tai toistokerta jää pois.
+#
+#   python -m unittest tests.test_ics
+
+SINCE = datetime(2026, 1, 1, tzinfo=timezone.utc)
+UNTIL = datetime(2026, 2, 1, tzinfo=timezone.utc)
+
+
+def _ics(*vevents: str) -> io.BytesIO:
+    body = "".join(f"BEGIN:VEVENT\r\n{v}END:VEVENT\r\n" for v in vevents)
+    return io.BytesIO(f"BEGIN:VCALENDAR\r\nVERSION:2.0\r\n{body}END:VCALENDAR\r\n".encode("utf-8"))
+
+
+class IcsWindowTest(unittest.TestCase):
+    def _starts(self, *vevents: str) -> list:
+        return sorted(e.start for e in parse_ics(_ics(*vevents), since=SINCE, until=UNTIL))
+
+    def test_single_event_at_bounds(self):
+        starts = self._starts(
+            "UID:a\r\nSUMMARY:alku\r\nDTSTART:20260101T000000Z\r\n",
+            "UID:b\r\nSUMMARY:loppu\r\nDTSTART:20260201T000000Z\r\n",
+            "UID:c\r\nSUMMARY:ennen\r\nDTSTART:20260131T235959Z\r\n",
+        )
+        self.assertEqual(starts, [SINCE, datetime(2026, 1, 31, 23, 59, 59, tzinfo=timezone.utc)])
+
+    def test_recurrence_excludes_until(self):
+        # viikoittain torstaisin 8.1. alkaen; 29.1. on viimeinen ennen 1.2.,
+        # ja RDATE tasan `until`-hetkellä jää pois
+        starts = self._starts(
+            "UID:r\r\nSUMMARY:viikko\r\nDTSTART:20260108T000000Z\r\n"
+            "RRULE:FREQ=WEEKLY;COUNT=10\r\nRDATE:20260201T000000Z\r\n",
+        )
+        self.assertEqual([s.day for s in starts], [8, 15, 22, 29])
+        self.assertTrue(all(s < UNTIL for s in starts))
+
+    def test_daily_recurrence_stops_before_until(self):
+        starts = self._starts(
+            "UID:d\r\nSUMMARY:päivä\r\nDTSTART:20260130T000000Z\r\nRRULE:FREQ=DAILY;COUNT=5\r\n",
+        )
+        self.assertEqual([s.day for s in starts], [30, 31])
+
+
+if __name__ == "__main__":
+    unittest.main()
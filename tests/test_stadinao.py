@@ -0,0 +1,89 @@
+import unittest
+from pathlib import Path
+
+from src.collectors.stadinao import parse_stadinao_events
+from src.collectors.textscan import compile_pattern_sets, scan
+from src.registry import load_pattern_specs
+
+# Stadin AO -kerääjän päivä/aika-paritus (textscan.Scan.pairs) tarkkoina
+# (päivä, aika) -pareina. Sivut ovat stadinao.hel.fi:n rakenteen mukaan
+# käsin tehtyjä (accordion, alatunniste, hakuaikateksti), eivät
+# tallennettuja kopioita.
+#
+#   python -m unittest tests.test_stadinao
+
+PAGES = Path(__file__).resolve().parent.parent / "bench" / "pages"
+PATTERNS = compile_pattern_sets(load_pattern_specs())["stadinao"]
+
+
+def _page(*paragraphs: str, footer: str = "Sivua päivitetty 1.8.2025") -> str:
+    body = "".join(f"<p>{p}</p>" for p in paragraphs)
+    return (
+        '<html lang="fi"><body><main id="main-content"><h1>Avoimet ovet</h1>'
+        f'<div class="component component--accordion"><div class="accordion__content">{body}</div></div>'
+        f'</main><footer class="footer"><p>{footer}</p></footer></body></html>'
+    )
+
+
+class StadinaoPairsTest(unittest.TestCase):
+    def assertPairs(self, html: str, expected: list):
+        actual = [(dm.group(), tm.group() if tm else None) for dm, tm in scan(html, PATTERNS).pairs()]
+        self.assertEqual(actual, expected)
+
+    def assertEvents(self, html: str, expected: list):
+        events = parse_stadinao_events(html, "Stadin AO", "https://stadinao.hel.fi/", "Helsinki", PATTERNS)
+        actual = [(e.start.isoformat(timespec="minutes"), e.end.isoformat(timespec="minutes")) for e in events]
+        self.assertEqual(actual, expected)
+
+    def test_example_page(self):
+        html = (PAGES / "stadinao_avoimet_ovet.html").read_text(encoding="utf-8")
+        self.assertPairs(html, [
+            ("25.11.2025", "klo 9.00–14.30"),
+            ("10.12.2025", "klo 17.00–19.00"),
+            ("3.2.2026", "klo 10:00-13:00"),
+            ("4.2.2026", "klo 10:00-13:00"),
+            # "päättyy 17.3.2026" ohitetaan ja katkaisee parin toimiston aukioloaikaan
+            ("17.2.2026", None),
+        ])
+        self.assertEvents(html, [
+            ("2025-11-25T09:00", "2025-11-25T14:30"),
+            ("2025-12-10T17:00", "2025-12-10T19:00"),
+            ("2026-02-03T10:00", "2026-02-03T13:00"),
+            ("2026-02-04T10:00", "2026-02-04T13:00"),
+            ("2026-02-17T09:00", "2026-02-17T10:00"),
+        ])
+
+    def test_footer_and_deadline(self):
+        html = _page(
+            "<strong>Ti 25.11.2025</strong> Avoimet ovet klo 9.00–14.30",
+            "Kevään yhteishaku päättyy 17.3.2026 klo 15.00–16.00.",
+            "Hakulomakkeet viimeistään 20.3.2026.",
+            footer="Sivua päivitetty 1.8.2025 klo 12.00–12.30",
+        )
+        self.assertPairs(html, [("25.11.2025", "klo 9.00–14.30")])
+
+    def test_list_shares_time(self):
+        html = _page("Vierailupäivät <strong>3.2.2026</strong> ja <strong>4.2.2026</strong> klo 10:00-13:00.")
+        self.assertPairs(html, [("3.2.2026", "klo 10:00-13:00"), ("4.2.2026", "klo 10:00-13:00")])
+        self.assertEvents(html, [
+            ("2026-02-03T10:00", "2026-02-03T13:00"),
+            ("2026-02-04T10:00", "2026-02-04T13:00"),
+        ])
+
+    def test_time_in_next_sentence(self):
+        html = _page("Avoimet ovet 14.1.2026. Tervetuloa klo 10.30–12.00")
+        self.assertPairs(html, [("14.1.2026", "klo 10.30–12.00")])
+        self.assertEvents(html, [("2026-01-14T10:30", "2026-01-14T12:00")])
+
+    def test_deadline_time_drops_date(self):
+        # aika kuuluu määräaikaan: päivää ei oteta oletusajalla
+        html = _page(
+            "Avoimet ovet 14.1.2026. Haku päättyy klo 15.00–16.00.",
+            "Vierailupäivät 3.2.2026 ja 4.2.2026. Ilmoittautuminen päättyy klo 12.00–12.15.",
+        )
+        self.assertPairs(html, [])
+        self.assertEvents(html, [])
+
+
+if __name__ == "__main__":
+    unittest.main()